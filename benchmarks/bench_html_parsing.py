@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+HTML Parsing Benchmark
+Compares the original hand-coded extraction (html.parser over the whole
+page, one card.find() per field and fallback) with the compiled extraction
+plans used by the scanners (lxml pull parser that stops at the card limit,
+one pass per card) on the saved search pages in benchmarks/fixtures/.
+Reports median parse time, peak memory and cards/second per page, and
+checks both produce the same job fields.
+
+Peak memory is measured in a fresh process per page and mode: the peak
+RSS (VmHWM, or ru_maxrss where /proc is missing) after one extraction,
+next to the RSS before parsing (modules imported, page read). RSS covers
+lxml's and libxml2's C allocations, which tracemalloc cannot see.
+
+Usage:
+    python benchmarks/bench_html_parsing.py [--repeat 20]
+"""
+
+import argparse
+import os
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from scan_indeed import extract_indeed_jobs
+from scan_linkedin import extract_linkedin_jobs
+
+FIXTURES = os.path.join(ROOT, 'benchmarks', 'fixtures')
+LOCATION = 'Washington, DC'
+
+def legacy_linkedin(html, location, limit=15):
+    """The extraction scan_linkedin() used before compiled plans (baseline)"""
+    soup = BeautifulSoup(html, 'html.parser')
+    job_cards = soup.find_all('div', class_='base-card')
+    if not job_cards:
+        job_cards = soup.find_all('li', class_=lambda x: x and 'jobs-search-results__list-item' in x)
+
+    jobs = []
+    for card in job_cards[:limit]:
+        title_elem = card.find('h3', class_='base-search-card__title')
+        if not title_elem:
+            title_elem = card.find('a', class_=lambda x: x and 'job-card-list__title' in x)
+        if not title_elem:
+            continue
+        title = title_elem.get_text(strip=True)
+
+        company_elem = card.find('h4', class_='base-search-card__subtitle')
+        if not company_elem:
+            company_elem = card.find('a', class_=lambda x: x and 'job-card-container__company-name' in x)
+        company = company_elem.get_text(strip=True) if company_elem else 'Company not listed'
+
+        location_elem = card.find('span', class_='job-search-card__location')
+        job_location = location_elem.get_text(strip=True) if location_elem else location
+
+        link_elem = card.find('a', class_='base-card__full-link')
+        if not link_elem:
+            link_elem = card.find('a', href=lambda x: x and '/jobs/view/' in x)
+        if not link_elem:
+            continue
+        job_url = link_elem.get('href', '')
+        job_id_match = re.search(r'/jobs/view/(\d+)', job_url)
+        job_id = job_id_match.group(1) if job_id_match else job_url.split('/')[-1].split('?')[0]
+        if not job_url.startswith('http'):
+            job_url = 'https://www.linkedin.com' + job_url
+
+        time_elem = card.find('time', class_='job-search-card__listdate')
+        if not time_elem:
+            time_elem = card.find('time')
+        posted = time_elem.get('datetime', 'Recent') if time_elem else 'Recent'
+
+        jobs.append({
+            'id': f'linkedin_{job_id}', 'title': title, 'agency': company,
+            'location': job_location, 'url': job_url, 'salary': 'See posting',
+            'posted': posted, 'source': 'LinkedIn'
+        })
+    return jobs
+
+def legacy_indeed(html, location, limit=15):
+    """The extraction scan_indeed() used before compiled plans (baseline)"""
+    soup = BeautifulSoup(html, 'html.parser')
+    job_cards = soup.find_all('div', class_='job_seen_beacon')
+    if not job_cards:
+        job_cards = soup.find_all('td', class_='resultContent')
+
+    jobs = []
+    for card in job_cards[:limit]:
+        job_id = card.get('data-jk', '')
+        if not job_id:
+            link = card.find('a', id=lambda x: x and x.startswith('job_'))
+            if link:
+                job_id = link.get('id', '').replace('job_', '')
+        if not job_id:
+            continue
+
+        title_elem = card.find('h2', class_='jobTitle')
+        if not title_elem:
+            title_elem = card.find('a', class_='jcs-JobTitle')
+        if not title_elem:
+            continue
+        title = re.sub(r'^(new|New)\s*', '', title_elem.get_text(strip=True))
+
+        company_elem = card.find('span', class_='companyName')
+        if not company_elem:
+            company_elem = card.find('span', {'data-testid': 'company-name'})
+        company = company_elem.get_text(strip=True) if company_elem else 'Company not listed'
+
+        location_elem = card.find('div', class_='companyLocation')
+        job_location = location_elem.get_text(strip=True) if location_elem else location
+
+        salary_elem = card.find('div', class_='salary-snippet')
+        if not salary_elem:
+            salary_elem = card.find('span', class_='estimated-salary')
+        salary = salary_elem.get_text(strip=True) if salary_elem else 'See posting'
+
+        jobs.append({
+            'id': f'indeed_{job_id}', 'title': title, 'agency': company,
+            'location': job_location, 'url': f'https://www.indeed.com/viewjob?jk={job_id}',
+            'salary': salary, 'posted': 'Within 7 days', 'source': 'Indeed'
+        })
+    return jobs
+
+PAGES = [
+    ('LinkedIn', 'linkedin_search.html', legacy_linkedin, extract_linkedin_jobs),
+    ('Indeed', 'indeed_search.html', legacy_indeed, extract_indeed_jobs),
+]
+
+def time_parse(extract, html, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extract(html, LOCATION)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def max_rss():
+    """Peak RSS of this process in bytes"""
+    # On Linux ru_maxrss keeps the parent's peak across fork/exec, so a child
+    # would report this benchmark's own peak; VmHWM starts over at exec
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+def measure_memory(filename, mode):
+    """Child process: print peak RSS before and after one extraction"""
+    legacy, compiled = next((legacy, compiled) for _, name, legacy, compiled in PAGES if name == filename)
+    with open(os.path.join(FIXTURES, filename), 'r', encoding='utf-8') as f:
+        html = f.read()
+    before = max_rss()
+    (legacy if mode == 'legacy' else compiled)(html, LOCATION)
+    print(before, max_rss())
+
+def peak_memory(filename, mode):
+    """(RSS before parsing, peak RSS after) in bytes, measured in a fresh process"""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--measure-memory', filename, mode],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    before, after = map(int, output.split())
+    return before, after
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark HTML card extraction')
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs per mode (median is reported)')
+    parser.add_argument('--measure-memory', nargs=2, metavar=('PAGE', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure_memory:
+        measure_memory(*args.measure_memory)
+        return
+
+    print(f"{'page':<10} {'size':>8} {'mode':<8} {'median ms':>10} {'peak MB':>8} {'parse MB':>9} {'cards/s':>9}")
+    for source, filename, legacy, compiled in PAGES:
+        with open(os.path.join(FIXTURES, filename), 'r', encoding='utf-8') as f:
+            html = f.read()
+
+        expected = legacy(html, LOCATION)
+        jobs = compiled(html, LOCATION)
+        # Compare the fields the legacy code produced; scanners add parsed ones
+        if [{key: job.get(key) for key in old} for job, old in zip(jobs, expected)] != expected \
+                or len(jobs) != len(expected):
+            print(f"❌ {source}: compiled plan extracted different jobs")
+            sys.exit(1)
+
+        results = {}
+        for mode, extract in (('legacy', legacy), ('compiled', compiled)):
+            seconds = time_parse(extract, html, args.repeat)
+            before, peak = peak_memory(filename, mode)
+            results[mode] = (seconds, peak)
+            print(f"{source:<10} {len(html) / 1024:>6.0f}KB {mode:<8} {seconds * 1000:>10.1f} "
+                  f"{peak / 1024 / 1024:>8.1f} {(peak - before) / 1024 / 1024:>+9.1f} {len(jobs) / seconds:>9.0f}")
+
+        speedup = results['legacy'][0] / results['compiled'][0]
+        print(f"{'':<10} {'':>8} → {speedup:.1f}x faster, peak RSS "
+              f"{results['legacy'][1] / 1024 / 1024:.1f} → {results['compiled'][1] / 1024 / 1024:.1f} MB")
+
+if __name__ == '__main__':
+    main()
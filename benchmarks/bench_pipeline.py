@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark
+Times every CPU-bound stage of a run offline, on the recorded responses
+in benchmarks/fixtures/ (USAJobs SearchResult JSON, LinkedIn and Indeed
+result pages, a Notion data source query), at 10, 1k and 100k jobs:
+
+    usajobs_map      map_usajobs_item over SearchResultItems
+    linkedin_extract LinkedIn card extraction (one page per 15 jobs)
+    indeed_extract   Indeed card extraction (one page per 15 jobs)
+    dedupe_by_id     within-scanner dedup, 10% repeated IDs
+    seen_filter      SeenStore.filter_new against a store holding half the IDs
+    score_priority   scoring.score_priority (push_to_notion's calculate_priority)
+    classify_type    scoring.classify_type
+    email_html       notify.build_email_html
+    discord_pack     discord_webhook job_embed + pack_embeds
+    notion_mirror    NotionMirror.replace_pages + hashes() on query results
+
+Each stage runs until --min-time seconds have passed (at least once) and
+the median is reported. Results are written as JSON with the commit they
+were measured on, so two commits can be compared:
+
+    python benchmarks/bench_pipeline.py                       # writes benchmarks/results/<commit>.json
+    python benchmarks/bench_pipeline.py --sizes 10 1000 --stages usajobs_map email_html
+    python benchmarks/bench_pipeline.py --compare benchmarks/results/abc1234.json
+"""
+
+import argparse
+import atexit
+import json
+import math
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+import discord_webhook
+import scoring
+from main import dedupe_by_id
+from notify import build_email_html
+from notion_mirror import NotionMirror
+from scan_indeed import extract_indeed_jobs
+from scan_linkedin import extract_linkedin_jobs
+from scan_usajobs import map_usajobs_item
+from seen_store import SeenStore
+
+FIXTURES = os.path.join(ROOT, 'benchmarks', 'fixtures')
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+DEFAULT_SIZES = [10, 1000, 100000]
+LOCATION = 'Washington, DC'
+CARDS_PER_PAGE = 15
+
+# A stage this much slower than the baseline is flagged by --compare
+REGRESSION_THRESHOLD = 1.10
+
+def load_fixture(name):
+    path = os.path.join(FIXTURES, name)
+    if name.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def usajobs_items(n):
+    """n SearchResultItems, cycling the fixture with unique IDs"""
+    base = load_fixture('usajobs_search.json')['SearchResult']['SearchResultItems']
+    items = []
+    for i in range(n):
+        item = dict(base[i % len(base)])
+        item['MatchedObjectId'] = f"{item['MatchedObjectId']}-{i}"
+        items.append(item)
+    return items
+
+def sample_jobs(n):
+    """n scored-ready Jobs: half USAJobs, a quarter each LinkedIn and Indeed"""
+    templates = [map_usajobs_item(item) for item in usajobs_items(25)]
+    templates += extract_linkedin_jobs(load_fixture('linkedin_search.html'), LOCATION)
+    templates += extract_indeed_jobs(load_fixture('indeed_search.html'), LOCATION)
+    jobs = []
+    for i in range(n):
+        job = templates[i % len(templates)].copy()
+        job['id'] = f"{job['id']}-{i}"
+        jobs.append(job)
+    return jobs
+
+# Each stage: setup(n) -> state (untimed), run(state) (timed)
+
+def setup_extract(filename):
+    def setup(n):
+        return load_fixture(filename), math.ceil(n / CARDS_PER_PAGE)
+    return setup
+
+def run_extract(extract):
+    def run(state):
+        html, pages = state
+        for _ in range(pages):
+            extract(html, LOCATION)
+    return run
+
+def setup_seen_filter(n):
+    tmp = tempfile.mkdtemp(prefix='bench-seen-')
+    atexit.register(shutil.rmtree, tmp, ignore_errors=True)
+    store = SeenStore(os.path.join(tmp, 'seen_jobs.db'))
+    ids = [f"job-{i}" for i in range(n)]
+    store.record(ids[::2])
+    return store, ids
+
+def setup_notion(n):
+    base = load_fixture('notion_query.json')['results']
+    pages = []
+    for i in range(n):
+        page = dict(base[i % len(base)])
+        page['id'] = f"{page['id']}-{i}"
+        pages.append(page)
+    return NotionMirror(':memory:'), pages
+
+def run_notion(state):
+    mirror, pages = state
+    mirror.replace_pages(pages)
+    mirror.hashes()
+
+def run_discord(jobs):
+    discord_webhook.pack_embeds([discord_webhook.job_embed(job) for job in jobs])
+
+STAGES = {
+    'usajobs_map': (usajobs_items, lambda items: [map_usajobs_item(item) for item in items]),
+    'linkedin_extract': (setup_extract('linkedin_search.html'), run_extract(extract_linkedin_jobs)),
+    'indeed_extract': (setup_extract('indeed_search.html'), run_extract(extract_indeed_jobs)),
+    'dedupe_by_id': (lambda n: (lambda jobs: jobs + jobs[:n // 10])(sample_jobs(n)), dedupe_by_id),
+    'seen_filter': (setup_seen_filter, lambda state: state[0].filter_new(state[1])),
+    'score_priority': (sample_jobs, lambda jobs: [scoring.score_priority(job) for job in jobs]),
+    'classify_type': (sample_jobs, lambda jobs: [scoring.classify_type(job) for job in jobs]),
+    'email_html': (sample_jobs, build_email_html),
+    'discord_pack': (sample_jobs, run_discord),
+    'notion_mirror': (setup_notion, run_notion),
+}
+
+def measure(run, state, min_time):
+    """Run until min_time has passed (at least once); return per-run timings"""
+    timings = []
+    total = 0.0
+    while not timings or total < min_time:
+        start = time.perf_counter()
+        run(state)
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        total += elapsed
+    return timings
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+
+def compare(results, baseline_path):
+    """Print each stage's median against a previous results file"""
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+    before = {(r['stage'], r['size']): r for r in baseline['results']}
+    print(f"\nvs {baseline['meta']['commit']} ({baseline_path}):")
+    regressions = 0
+    for r in results:
+        old = before.get((r['stage'], r['size']))
+        if not old:
+            continue
+        ratio = r['median_s'] / old['median_s'] if old['median_s'] else float('inf')
+        flag = '  ⚠ slower' if ratio > REGRESSION_THRESHOLD else ''
+        regressions += bool(flag)
+        print(f"  {r['stage']:<17} {r['size']:>7}  {old['median_s'] * 1000:>10.2f} → "
+              f"{r['median_s'] * 1000:>10.2f} ms  ({ratio:.2f}x){flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the pipeline stages on recorded fixtures')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='job counts to run each stage at')
+    parser.add_argument('--stages', nargs='+', choices=sorted(STAGES), default=list(STAGES), help='stages to run')
+    parser.add_argument('--min-time', type=float, default=0.5, help='seconds to keep repeating each measurement')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', metavar='BASELINE', help='earlier results file to compare against')
+    args = parser.parse_args(argv)
+
+    commit, dirty = git_commit()
+    results = []
+    print(f"{'stage':<17} {'jobs':>7} {'runs':>5} {'median ms':>11} {'µs/job':>9} {'jobs/s':>11}")
+    for stage in args.stages:
+        setup, run = STAGES[stage]
+        for size in args.sizes:
+            state = setup(size)
+            timings = measure(run, state, args.min_time)
+            median = statistics.median(timings)
+            results.append({
+                'stage': stage,
+                'size': size,
+                'runs': len(timings),
+                'median_s': median,
+                'min_s': min(timings),
+                'us_per_job': median / size * 1e6,
+                'jobs_per_s': size / median if median else None,
+            })
+            print(f"{stage:<17} {size:>7} {len(timings):>5} {median * 1000:>11.2f} "
+                  f"{median / size * 1e6:>9.2f} {size / median:>11.0f}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}{'-dirty' if dirty else ''}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'meta': {
+                'commit': commit,
+                'dirty': dirty,
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'min_time': args.min_time,
+            },
+            'results': results,
+        }, f, indent=2)
+    print(f"\n✓ Results written to {output}")
+
+    if args.compare and compare(results, args.compare):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
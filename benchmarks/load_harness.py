@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+End-to-End Load Harness
+Runs the real entry points - main.py, then scripts/push_to_notion.py -
+exactly as the workflow does, but against local stand-ins for USAJobs,
+LinkedIn, Indeed, Notion, a Discord webhook and SMTP (see standins.py).
+Nothing in the pipeline is patched: the stand-ins are wired in through
+HTTP_HOST_OVERRIDES, DISCORD_WEBHOOK and SMTP_HOST/SMTP_PORT/SMTP_SSL, and
+each run happens in a fresh working directory, so data/ starts empty.
+
+Reports per stage: wall time, peak RSS of the pipeline process, and the
+requests every stand-in served (with injected 429/5xx counts).
+
+Usage:
+    python benchmarks/load_harness.py --volume 500
+    python benchmarks/load_harness.py --volume 200 --latency 0.05 --rate-429 0.05 --rate-5xx 0.02
+    python benchmarks/load_harness.py --set notion.volume=5000 --set discord.latency=0.2 --output load.json
+    python benchmarks/load_harness.py --unthrottled   # lift rate_limit.HOST_LIMITS inside the run
+    python benchmarks/load_harness.py --profile --keep   # per-stage profiles in <workdir>/data/profile/
+
+--set takes <service>.<setting>=<value> for any service in SERVICES and
+any setting in standins.DEFAULT_PROFILE; the global flags set every service.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from standins import (DEFAULT_PROFILE, DiscordStandIn, IndeedStandIn, LinkedInStandIn,
+                      NotionStandIn, SMTPStandIn, USAJobsStandIn)
+
+# service name: (stand-in class, host it replaces or None)
+SERVICES = {
+    'usajobs': (USAJobsStandIn, 'data.usajobs.gov'),
+    'linkedin': (LinkedInStandIn, 'www.linkedin.com'),
+    'indeed': (IndeedStandIn, 'www.indeed.com'),
+    'notion': (NotionStandIn, 'api.notion.com'),
+    'discord': (DiscordStandIn, None),
+    'smtp': (SMTPStandIn, None),
+}
+
+STAGES = [
+    ('scan', os.path.join(ROOT, 'main.py')),
+    ('notion', os.path.join(ROOT, 'scripts', 'push_to_notion.py')),
+]
+
+# Runs a script with rate_limit.HOST_LIMITS emptied first (--unthrottled)
+UNTHROTTLED = (
+    "import os, runpy, sys; sys.path[:0] = [os.path.dirname({script!r}), {root!r}]; import rate_limit; "
+    "rate_limit.HOST_LIMITS.clear(); sys.argv = [{script!r}] + {args!r}; "
+    "runpy.run_path({script!r}, run_name='__main__')"
+)
+
+def parse_setting(text):
+    """'notion.volume=5000' -> ('notion', 'volume', 5000.0)"""
+    name, sep, value = text.partition('=')
+    service, dot, key = name.partition('.')
+    if not sep or not dot or service not in SERVICES or key not in DEFAULT_PROFILE:
+        raise argparse.ArgumentTypeError(
+            f"expected <service>.<setting>=<value> with service in {', '.join(SERVICES)} "
+            f"and setting in {', '.join(DEFAULT_PROFILE)}"
+        )
+    return service, key, float(value)
+
+def build_profiles(args):
+    base = {
+        'volume': args.volume,
+        'latency': args.latency,
+        'rate_429': args.rate_429,
+        'rate_5xx': args.rate_5xx,
+        'payload_kb': args.payload_kb,
+    }
+    profiles = {name: dict(base) for name in SERVICES}
+    for service, key, value in args.set or []:
+        profiles[service][key] = int(value) if key == 'volume' else value
+    return profiles
+
+def start_standins(profiles, seed):
+    servers = {}
+    for n, (name, (cls, _)) in enumerate(SERVICES.items()):
+        servers[name] = cls(profiles[name], seed=seed + n).start()
+    return servers
+
+def pipeline_env(servers):
+    overrides = ','.join(f'{host}={servers[name].base_url}'
+                         for name, (_, host) in SERVICES.items() if host)
+    env = dict(os.environ)
+    env.update({
+        'HTTP_HOST_OVERRIDES': overrides,
+        'USAJOBS_API_KEY': 'load-test',
+        'USAJOBS_EMAIL': 'load-test@example.com',
+        'GMAIL_USER': 'load-test@example.com',
+        'GMAIL_APP_PASSWORD': 'load-test',
+        'NOTIFY_EMAIL': env.get('NOTIFY_EMAIL_LOAD', 'alerts@example.com'),
+        'SMTP_HOST': '127.0.0.1',
+        'SMTP_PORT': str(servers['smtp'].port),
+        'SMTP_SSL': '0',
+        'DISCORD_WEBHOOK': f"{servers['discord'].base_url}/api/webhooks/1/load-test",
+        'NOTION_TOKEN': 'load-test',
+        'NOTION_DB_ID': NotionStandIn.database_id,
+        'PYTHONUNBUFFERED': '1',
+    })
+    return env
+
+def snapshot(servers):
+    return {name: dict(server.stats) for name, server in servers.items()}
+
+def diff(before, after):
+    return {
+        name: {key: value - before[name].get(key, 0) for key, value in stats.items()
+               if value - before[name].get(key, 0)}
+        for name, stats in after.items()
+    }
+
+def run_stage(name, script, workdir, env, unthrottled, timeout, args=()):
+    """Run one entry point to completion; returns its measurements"""
+    if unthrottled:
+        command = [sys.executable, '-c', UNTHROTTLED.format(root=ROOT, script=script, args=list(args))]
+    else:
+        command = [sys.executable, script, *args]
+    log_path = os.path.join(workdir, f'{name}.log')
+    start = time.monotonic()
+    with open(log_path, 'w') as log:
+        process = subprocess.Popen(command, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+        deadline = start + timeout
+        while True:
+            pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+            if pid:
+                break
+            if time.monotonic() > deadline:
+                process.kill()
+                pid, status, usage = os.wait4(process.pid, 0)
+                break
+            time.sleep(0.05)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return {
+        'seconds': time.monotonic() - start,
+        'exit_code': process.returncode,
+        'peak_rss_mb': usage.ru_maxrss / 1024,  # kilobytes on Linux
+        'cpu_seconds': usage.ru_utime + usage.ru_stime,
+        'log': log_path,
+    }
+
+def print_report(results):
+    print(f"\n{'stage':<8} {'wall s':>8} {'cpu s':>7} {'peak MB':>8} {'exit':>5}")
+    for stage in results['stages']:
+        print(f"{stage['stage']:<8} {stage['seconds']:>8.2f} {stage['cpu_seconds']:>7.2f} "
+              f"{stage['peak_rss_mb']:>8.1f} {stage['exit_code']:>5}")
+    print(f"{'total':<8} {results['total_seconds']:>8.2f}")
+
+    for stage in results['stages']:
+        print(f"\nRequests during {stage['stage']}:")
+        for service, counts in stage['requests'].items():
+            if counts:
+                print(f"   {service:<9} " + ', '.join(f"{key} {value}" for key, value in counts.items()))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the pipeline end to end against local stand-in services')
+    parser.add_argument('--volume', type=int, default=DEFAULT_PROFILE['volume'],
+                        help='results per search term / cards per page / existing Notion pages')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='fraction of requests answered 429')
+    parser.add_argument('--rate-5xx', type=float, default=0.0, help='fraction of requests answered 503')
+    parser.add_argument('--payload-kb', type=float, default=0, help='filler added to every response body')
+    parser.add_argument('--set', type=parse_setting, action='append', metavar='SERVICE.KEY=VALUE',
+                        help='per-service override, e.g. notion.volume=5000 (repeatable)')
+    parser.add_argument('--seed', type=int, default=1, help='seed for fault injection')
+    parser.add_argument('--unthrottled', action='store_true', help="disable the pipeline's per-host rate limits")
+    parser.add_argument('--profile', action='store_true', help='run both stages with --profile')
+    parser.add_argument('--timeout', type=float, default=900, help='seconds before a stage is killed')
+    parser.add_argument('--keep', action='store_true', help='keep the working directory (logs, data/)')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    profiles = build_profiles(args)
+    servers = start_standins(profiles, args.seed)
+    workdir = tempfile.mkdtemp(prefix='load-harness-')
+    env = pipeline_env(servers)
+    print(f"🧪 Load run in {workdir}")
+    for name, server in servers.items():
+        address = server.base_url if hasattr(server, 'base_url') else f"smtp://127.0.0.1:{server.port}"
+        print(f"   {name:<9} {address}  {profiles[name]}")
+
+    results = {'profiles': profiles, 'unthrottled': args.unthrottled, 'stages': []}
+    try:
+        total_start = time.monotonic()
+        for name, script in STAGES:
+            print(f"\n▶ {name}: {os.path.relpath(script, ROOT)}")
+            before = snapshot(servers)
+            stage = run_stage(name, script, workdir, env, args.unthrottled, args.timeout,
+                              ['--profile'] if args.profile else ())
+            stage['stage'] = name
+            stage['requests'] = diff(before, snapshot(servers))
+            results['stages'].append(stage)
+            print(f"   exit {stage['exit_code']} after {stage['seconds']:.1f}s (log: {stage['log']})")
+            if stage['exit_code'] != 0:
+                with open(stage['log'], 'r') as f:
+                    print(''.join(f.readlines()[-15:]))
+        results['total_seconds'] = time.monotonic() - total_start
+    finally:
+        for server in servers.values():
+            server.stop()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+            for stage in results['stages']:
+                stage.pop('log', None)
+
+    print_report(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Results written to {args.output}")
+
+if __name__ == '__main__':
+    main()
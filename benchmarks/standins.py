@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+"""
+Local Stand-In Servers
+In-process fakes of every service a run talks to, for load testing:
+
+    USAJobsStandIn    GET /api/search (SearchResult JSON, paged)
+    LinkedInStandIn   GET /jobs/search (result page HTML)
+    IndeedStandIn     GET /jobs (result page HTML)
+    NotionStandIn     databases, data_sources (+ /query) and pages endpoints
+    DiscordStandIn    POST /api/webhooks/<id>/<token>, with a real rate-limit bucket
+    SMTPStandIn       plain SMTP with AUTH PLAIN/LOGIN
+
+Each takes a profile dict (see DEFAULT_PROFILE):
+    volume      results per search term / cards per page / pages pre-seeded in Notion
+    latency     seconds added to every response (SMTP: every command)
+    rate_429    fraction of requests answered 429 (SMTP: 421 on MAIL FROM)
+    rate_5xx    fraction of requests answered 503 (SMTP: 451 on MAIL FROM)
+    payload_kb  filler added to every response body
+    retry_after seconds advertised on 429 responses
+
+Postings are generated deterministically from the search and the
+result's position, so repeated runs see the same IDs, as they would in production.
+Every server counts what it served in .stats.
+"""
+
+import base64
+import copy
+import json
+import math
+import os
+import random
+import socketserver
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+DEFAULT_PROFILE = {
+    'volume': 50,
+    'latency': 0.0,
+    'rate_429': 0.0,
+    'rate_5xx': 0.0,
+    'payload_kb': 0,
+    'retry_after': 1.0,
+}
+
+# Vocabulary for synthetic postings
+TITLE_LEVELS = ['', 'Senior ', 'Supervisory ', 'Lead ', 'Regional ', 'Associate ']
+TITLE_AREAS = ['Grants', 'Capital Grants', 'Financial Assistance', 'Formula Grants',
+               'Discretionary Grants', 'Infrastructure Grants', 'Research Awards', 'Grant Compliance']
+TITLE_ROLES = ['Management Specialist', 'Program Manager', 'Analyst', 'Officer', 'Consultant', 'Coordinator']
+AGENCIES = ['Federal Transit Administration', 'Federal Highway Administration', 'Bureau of Reclamation',
+            'Health Resources and Services Administration', 'Federal Emergency Management Agency',
+            'National Oceanic and Atmospheric Administration', 'U.S. Army Corps of Engineers',
+            'Veterans Health Administration', 'Economic Development Administration',
+            'Office of Justice Programs', 'Environmental Protection Agency', 'National Science Foundation',
+            'Department of Energy', 'Administration for Children and Families', 'Rural Utilities Service',
+            'Maritime Administration', 'Indian Health Service', 'Census Bureau']
+CITIES = ['Washington, DC', 'Atlanta, GA', 'Denver, CO', 'Seattle, WA', 'Chicago, IL', 'Boston, MA',
+          'Dallas, TX', 'San Francisco, CA', 'Kansas City, MO', 'Philadelphia, PA', 'Remote', 'New York, NY']
+GRADES = [(7, 9, 51332, 82446), (9, 11, 68405, 107590), (11, 12, 82764, 128956),
+          (12, 13, 99200, 153354), (13, 14, 117962, 181216), (14, 15, 139395, 191900)]
+
+
+def posting(namespace, key, index):
+    """Deterministic synthetic posting fields for (namespace, key, index)"""
+    rng = random.Random(zlib.crc32(f'{namespace}|{key}|{index}'.encode()))
+    low, high, pay_min, pay_max = rng.choice(GRADES)
+    return {
+        'id': f'{zlib.crc32(f"{namespace}|{key}".encode()) % 100000:05d}{index:06d}',
+        'title': f'{rng.choice(TITLE_LEVELS)}{rng.choice(TITLE_AREAS)} {rng.choice(TITLE_ROLES)}',
+        'agency': rng.choice(AGENCIES),
+        'location': rng.choice(CITIES),
+        'low_grade': low,
+        'high_grade': high,
+        'pay_min': pay_min,
+        'pay_max': pay_max,
+        'posted': (datetime(2025, 7, 31) - timedelta(hours=index)).strftime('%Y-%m-%dT%H:%M:%S.0000'),
+    }
+
+
+def _load_fixture(name):
+    with open(os.path.join(FIXTURES, name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class StandInServer(ThreadingHTTPServer):
+    """An HTTP stand-in on 127.0.0.1 (ephemeral port) with fault injection"""
+
+    daemon_threads = True
+    name = 'stand-in'
+
+    def __init__(self, profile=None, seed=0):
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        self.profile = dict(DEFAULT_PROFILE, **(profile or {}))
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'ok': 0, '429': 0, '5xx': 0, 'bytes_out': 0}
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.server_port}'
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name=f'standin-{self.name}', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def count(self, key, n=1):
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + n
+
+    def draw_fault(self):
+        """None, 429 or 503 for the next request, per the profile's rates"""
+        with self.lock:
+            roll = self.random.random()
+        if roll < self.profile['rate_429']:
+            return 429
+        if roll < self.profile['rate_429'] + self.profile['rate_5xx']:
+            return 503
+        return None
+
+    def route(self, method, path, query, body):
+        """(status, payload, headers); payload is a dict (JSON), str (HTML) or None"""
+        return 404, {'message': 'not found'}, {}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real services
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def _handle(self, method):
+        server = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        server.count('requests')
+
+        if server.profile['latency']:
+            time.sleep(server.profile['latency'])
+
+        fault = server.draw_fault()
+        if fault == 429:
+            server.count('429')
+            retry_after = server.profile['retry_after']
+            self._send(429, {'message': 'rate limited', 'retry_after': retry_after},
+                       {'Retry-After': f'{retry_after:g}'})
+            return
+        if fault == 503:
+            server.count('5xx')
+            self._send(503, {'message': 'service unavailable'}, {})
+            return
+
+        parts = urlsplit(self.path)
+        try:
+            body = json.loads(raw) if raw else {}
+        except ValueError:
+            body = {}
+        status, payload, headers = server.route(method, parts.path, parse_qs(parts.query), body)
+        if status < 400:
+            server.count('ok')
+        self._send(status, payload, headers)
+
+    def _send(self, status, payload, headers):
+        pad = int(self.server.profile['payload_kb'] * 1024)
+        if payload is None:
+            data, content_type = b'', None
+        elif isinstance(payload, str):
+            if pad:
+                payload += f'<!-- {"x" * pad} -->'
+            data, content_type = payload.encode('utf-8'), 'text/html; charset=utf-8'
+        else:
+            if pad:
+                payload = dict(payload, _padding='x' * pad)
+            data, content_type = json.dumps(payload).encode('utf-8'), 'application/json'
+
+        self.send_response(status)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
+        self.server.count('bytes_out', len(data))
+
+
+class USAJobsStandIn(StandInServer):
+    """USAJobs search API; `volume` results per keyword, newest first"""
+
+    name = 'usajobs'
+
+    def __init__(self, profile=None, seed=0):
+        super().__init__(profile, seed)
+        fixture = _load_fixture('usajobs_search.json')
+        self.templates = fixture['SearchResult']['SearchResultItems']
+
+    def item(self, term, index):
+        p = posting('usajobs', term, index)
+        item = copy.deepcopy(self.templates[index % len(self.templates)])
+        item['MatchedObjectId'] = p['id']
+        d = item['MatchedObjectDescriptor']
+        d['PositionTitle'] = p['title']
+        d['OrganizationName'] = p['agency']
+        d['PositionLocationDisplay'] = p['location']
+        d['PositionURI'] = f"https://www.usajobs.gov:443/job/{p['id']}"
+        d['PositionRemuneration'][0].update(MinimumRange=f"{p['pay_min']}.0", MaximumRange=f"{p['pay_max']}.0")
+        d['UserArea']['Details'].update(LowGrade=str(p['low_grade']), HighGrade=str(p['high_grade']))
+        d['PublicationStartDate'] = p['posted']
+        return item
+
+    def route(self, method, path, query, body):
+        if path != '/api/search':
+            return super().route(method, path, query, body)
+        term = query.get('Keyword', [''])[0]
+        per_page = int(query.get('ResultsPerPage', ['25'])[0])
+        page = int(query.get('Page', ['1'])[0])
+        total = self.profile['volume']
+        indexes = range((page - 1) * per_page, min(page * per_page, total))
+        items = [self.item(term, i) for i in indexes]
+        return 200, {
+            'LanguageCode': 'EN',
+            'SearchParameters': {},
+            'SearchResult': {
+                'SearchResultCount': len(items),
+                'SearchResultCountAll': total,
+                'SearchResultItems': items,
+                'UserArea': {'NumberOfPages': str(max(1, math.ceil(total / per_page))), 'IsRadialSearch': False},
+            },
+        }, {}
+
+
+class LinkedInStandIn(StandInServer):
+    """LinkedIn public job search page with `volume` cards"""
+
+    name = 'linkedin'
+    path = '/jobs/search'
+
+    def card(self, p):
+        return (
+            '<li><div class="base-card">'
+            f'<a class="base-card__full-link" href="https://www.linkedin.com/jobs/view/{p["id"]}?trk=public_jobs"></a>'
+            f'<h3 class="base-search-card__title">{p["title"]}</h3>'
+            f'<h4 class="base-search-card__subtitle">{p["agency"]}</h4>'
+            f'<span class="job-search-card__location">{p["location"]}</span>'
+            f'<time class="job-search-card__listdate" datetime="{p["posted"][:10]}">recently</time>'
+            '</div></li>'
+        )
+
+    def search_key(self, query):
+        return f"{query.get('keywords', [''])[0]}|{query.get('location', [''])[0]}"
+
+    def route(self, method, path, query, body):
+        if path != self.path:
+            return super().route(method, path, query, body)
+        key = self.search_key(query)
+        cards = ''.join(self.card(posting(self.name, key, i)) for i in range(self.profile['volume']))
+        return 200, f'<html><body><ul class="jobs-search__results-list">{cards}</ul></body></html>', {}
+
+
+class IndeedStandIn(LinkedInStandIn):
+    """Indeed search page with `volume` cards"""
+
+    name = 'indeed'
+    path = '/jobs'
+
+    def card(self, p):
+        salary = f"${p['pay_min']:,} - ${p['pay_max']:,} a year"
+        return (
+            f'<div class="job_seen_beacon" data-jk="{p["id"]}">'
+            f'<h2 class="jobTitle"><a class="jcs-JobTitle" id="job_{p["id"]}"><span>{p["title"]}</span></a></h2>'
+            f'<span class="companyName">{p["agency"]}</span>'
+            f'<div class="companyLocation">{p["location"]}</div>'
+            f'<div class="salary-snippet">{salary}</div>'
+            '</div>'
+        )
+
+    def search_key(self, query):
+        return f"{query.get('q', [''])[0]}|{query.get('l', [''])[0]}"
+
+
+class NotionStandIn(StandInServer):
+    """
+    Notion API for one database with one data source, holding pages in
+    memory. `volume` pages exist before the run. Queries honor start_cursor,
+    page_size, the Job Hash equals filter and the last_edited_time filter.
+    """
+
+    name = 'notion'
+    database_id = 'load-test-database'
+    data_source_id = 'load-test-data-source'
+
+    def __init__(self, profile=None, seed=0):
+        super().__init__(profile, seed)
+        templates = _load_fixture('notion_query.json')['results']
+        self.pages = []
+        for i in range(self.profile['volume']):
+            page = copy.deepcopy(templates[i % len(templates)])
+            page['id'] = str(uuid.UUID(int=i + 1))
+            page['properties']['Job Hash']['rich_text'][0]['plain_text'] = f'seed-{i:08d}'
+            self.pages.append(page)
+
+    @staticmethod
+    def _plain(prop):
+        return ''.join(part.get('plain_text', '') for part in prop.get('rich_text', prop.get('title', [])))
+
+    def _create_page(self, body):
+        properties = copy.deepcopy(body.get('properties', {}))
+        for prop in properties.values():
+            for part in prop.get('rich_text', []) + prop.get('title', []):
+                part.setdefault('plain_text', part.get('text', {}).get('content', ''))
+        now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        page = {'object': 'page', 'id': str(uuid.uuid4()), 'created_time': now, 'last_edited_time': now,
+                'parent': body.get('parent', {}), 'archived': False, 'in_trash': False,
+                'properties': properties}
+        with self.lock:
+            self.pages.append(page)
+        return page
+
+    def _query(self, body):
+        with self.lock:
+            pages = list(self.pages)
+        flt = body.get('filter') or {}
+        if flt.get('property') == 'Job Hash':
+            wanted = flt.get('rich_text', {}).get('equals')
+            pages = [p for p in pages if self._plain(p['properties'].get('Job Hash', {})) == wanted]
+        elif flt.get('timestamp') == 'last_edited_time':
+            since = flt.get('last_edited_time', {}).get('on_or_after', '')
+            pages = [p for p in pages if p['last_edited_time'] >= since]
+        start = int(body.get('start_cursor') or 0)
+        size = min(100, int(body.get('page_size') or 100))
+        batch = pages[start:start + size]
+        more = start + size < len(pages)
+        return {'object': 'list', 'results': batch, 'has_more': more,
+                'next_cursor': str(start + size) if more else None, 'type': 'page_or_data_source'}
+
+    def route(self, method, path, query, body):
+        if method == 'GET' and path == f'/v1/databases/{self.database_id}':
+            return 200, {'object': 'database', 'id': self.database_id,
+                         'data_sources': [{'id': self.data_source_id, 'name': 'Jobs'}]}, {}
+        if method == 'GET' and path == f'/v1/data_sources/{self.data_source_id}':
+            properties = self.pages[0]['properties'] if self.pages else {}
+            return 200, {'object': 'data_source', 'id': self.data_source_id,
+                         'properties': {name: {'type': prop.get('type')} for name, prop in properties.items()}}, {}
+        if method == 'POST' and path == f'/v1/data_sources/{self.data_source_id}/query':
+            self.count('queries')
+            return 200, self._query(body), {}
+        if method == 'POST' and path == '/v1/pages':
+            self.count('pages_created')
+            return 200, self._create_page(body), {}
+        return super().route(method, path, query, body)
+
+
+class DiscordStandIn(StandInServer):
+    """
+    Discord webhook with Discord's per-webhook bucket (`bucket_limit`
+    requests per `bucket_window` seconds); going over it gets a real 429
+    """
+
+    name = 'discord'
+    bucket_limit = 5
+    bucket_window = 2.0
+
+    def __init__(self, profile=None, seed=0):
+        super().__init__(profile, seed)
+        self.window_start = 0.0
+        self.window_used = 0
+
+    def route(self, method, path, query, body):
+        if method != 'POST' or not path.startswith('/api/webhooks/'):
+            return super().route(method, path, query, body)
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_start >= self.bucket_window:
+                self.window_start, self.window_used = now, 0
+            reset_after = self.bucket_window - (now - self.window_start)
+            over = self.window_used >= self.bucket_limit
+            if not over:
+                self.window_used += 1
+            remaining = max(0, self.bucket_limit - self.window_used)
+        headers = {'X-RateLimit-Limit': str(self.bucket_limit), 'X-RateLimit-Remaining': str(remaining),
+                   'X-RateLimit-Reset-After': f'{reset_after:.3f}'}
+        if over:
+            self.count('bucket_429')
+            return 429, {'message': 'You are being rate limited.', 'retry_after': round(reset_after, 3),
+                         'global': False}, headers
+        self.count('messages')
+        self.count('embeds', len(body.get('embeds', [])))
+        return 204, None, headers
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """
+    Minimal SMTP server (EHLO, AUTH PLAIN/LOGIN, MAIL, RCPT, DATA, RSET,
+    NOOP, QUIT) that accepts and discards mail. Faults are injected as
+    421/451 replies to MAIL FROM.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+    name = 'smtp'
+
+    def __init__(self, profile=None, seed=0):
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+        self.profile = dict(DEFAULT_PROFILE, **(profile or {}))
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'connections': 0, 'logins': 0, 'messages': 0, 'bytes_in': 0, 'rejected': 0}
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    start = StandInServer.start
+    stop = StandInServer.stop
+    count = StandInServer.count
+    draw_fault = StandInServer.draw_fault
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+
+    def reply(self, line):
+        if self.server.profile['latency']:
+            time.sleep(self.server.profile['latency'])
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def readline(self):
+        """One command line, or None when the client hung up"""
+        raw = self.rfile.readline()
+        return raw.decode('utf-8', 'replace').rstrip('\r\n') if raw else None
+
+    def handle(self):
+        server = self.server
+        server.count('connections')
+        self.reply('220 localhost ESMTP stand-in')
+        while True:
+            line = self.readline()
+            if line is None:
+                return
+            verb = line.split(' ', 1)[0].upper()
+            if verb in ('EHLO', 'HELO'):
+                self.wfile.write(b'250-localhost\r\n250-AUTH PLAIN LOGIN\r\n250-SIZE 35882577\r\n')
+                self.reply('250 8BITMIME')
+            elif verb == 'AUTH':
+                self.auth(line.split(' ')[1:])
+            elif verb == 'MAIL':
+                fault = server.draw_fault()
+                if fault:
+                    server.count('rejected')
+                    self.reply('421 4.7.0 Try again later' if fault == 429 else '451 4.3.0 Temporary failure')
+                    if fault == 429:
+                        return
+                else:
+                    self.reply('250 OK')
+            elif verb in ('RCPT', 'RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                size = 0
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b'.\r\n', b'.\n'):
+                        break
+                    size += len(data)
+                server.count('bytes_in', size)
+                server.count('messages')
+                self.reply('250 OK queued')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+    def auth(self, args):
+        mechanism = args[0].upper() if args else ''
+        if mechanism == 'PLAIN' and len(args) < 2:
+            self.reply('334 ')
+            self.readline()
+        elif mechanism == 'LOGIN':
+            for prompt in ('Username:', 'Password:'):
+                self.reply('334 ' + base64.b64encode(prompt.encode()).decode())
+                self.readline()
+        elif mechanism != 'PLAIN':
+            self.reply('504 Unrecognized authentication type')
+            return
+        self.server.count('logins')
+        self.reply('235 2.7.0 Authentication successful')
+
+
+HTTP_STAND_INS = {
+    'usajobs': USAJobsStandIn,
+    'linkedin': LinkedInStandIn,
+    'indeed': IndeedStandIn,
+    'notion': NotionStandIn,
+    'discord': DiscordStandIn,
+}
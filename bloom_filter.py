@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Scalable Bloom Filter
+Compact, probabilistic set of job IDs used in front of the exact seen
+store. A "not present" answer is always right; a "maybe present" answer
+must be confirmed against the store. New slices are added as the filter
+fills, each with a tighter error rate, so the overall false-positive
+rate stays under the configured target however many IDs are added.
+"""
+
+import hashlib
+import json
+import math
+import os
+
+# Each new slice is GROWTH times bigger and has TIGHTENING times the error rate
+GROWTH = 2
+TIGHTENING = 0.5
+
+FILE_MAGIC = b'SBF1\n'
+
+class BloomSlice:
+    """Fixed-size Bloom filter over a bytearray"""
+
+    def __init__(self, capacity, error_rate, bits=None, count=0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # Optimal bit count and hash count for capacity/error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.count = count
+
+    def _positions(self, h1, h2):
+        # Kirsch-Mitzenmacher double hashing
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def contains(self, h1, h2):
+        bits = self.bits
+        for pos in self._positions(h1, h2):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def add(self, h1, h2):
+        bits = self.bits
+        for pos in self._positions(h1, h2):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def is_full(self):
+        return self.count >= self.capacity
+
+    def current_error_rate(self):
+        """Expected false-positive rate at the current fill level"""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+def _hashes(item):
+    digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+class ScalableBloomFilter:
+    """
+    Growing Bloom filter with a bounded overall false-positive rate
+
+    initial_capacity: IDs the first slice holds before a new one is added
+    error_rate:       target false-positive rate across all slices
+    """
+
+    def __init__(self, initial_capacity=10000, error_rate=0.001):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.slices = []
+
+    def __contains__(self, item):
+        h1, h2 = _hashes(item)
+        return any(s.contains(h1, h2) for s in self.slices)
+
+    def __len__(self):
+        return sum(s.count for s in self.slices)
+
+    def add(self, item):
+        """Add an item; returns False if it was (probably) already present"""
+        h1, h2 = _hashes(item)
+        if any(s.contains(h1, h2) for s in self.slices):
+            return False
+        if not self.slices or self.slices[-1].is_full():
+            self._add_slice()
+        self.slices[-1].add(h1, h2)
+        return True
+
+    def _add_slice(self):
+        i = len(self.slices)
+        # Geometric series keeps the summed error under error_rate
+        error = self.error_rate * (1 - TIGHTENING) * TIGHTENING ** i
+        self.slices.append(BloomSlice(self.initial_capacity * GROWTH ** i, error))
+
+    def memory_bytes(self):
+        return sum(len(s.bits) for s in self.slices)
+
+    def current_error_rate(self):
+        """Expected false-positive rate for a lookup right now"""
+        miss = 1.0
+        for s in self.slices:
+            miss *= 1 - s.current_error_rate()
+        return 1 - miss
+
+    def save(self, path, meta=None):
+        """Write the filter atomically: header line of JSON, then raw slice bits"""
+        header = {
+            'initial_capacity': self.initial_capacity,
+            'error_rate': self.error_rate,
+            'slices': [{'capacity': s.capacity, 'error_rate': s.error_rate, 'count': s.count}
+                       for s in self.slices],
+            'meta': meta or {},
+        }
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(FILE_MAGIC)
+            f.write(json.dumps(header).encode('utf-8') + b'\n')
+            for s in self.slices:
+                f.write(s.bits)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a filter written by save(); returns (filter, meta)
+        Raises ValueError if the file is not a filter or was cut short
+        """
+        with open(path, 'rb') as f:
+            if f.readline() != FILE_MAGIC:
+                raise ValueError(f"{path} is not a bloom filter file")
+            header = json.loads(f.readline())
+            bloom = cls(header['initial_capacity'], header['error_rate'])
+            for info in header['slices']:
+                s = BloomSlice(info['capacity'], info['error_rate'], count=info['count'])
+                bits = f.read(len(s.bits))
+                if len(bits) != len(s.bits):
+                    raise ValueError(f"{path} is truncated: slice {len(bloom.slices)} has "
+                                     f"{len(bits)} of {len(s.bits)} bytes")
+                s.bits = bytearray(bits)
+                bloom.slices.append(s)
+            if f.read(1):
+                raise ValueError(f"{path} has data after the last slice")
+        return bloom, header.get('meta', {})
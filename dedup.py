@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Cross-Source Near-Duplicate Detection
+The same role is often posted on USAJobs, LinkedIn and Indeed under
+different IDs and with slightly different wording. Each posting's title,
+agency and location are normalized (case, punctuation, common
+abbreviations, agency aliases, state names). Two postings can only be
+duplicates when their normalized agency and location are equal - that
+pair is the posting's block - and their titles are similar: the title is
+turned into a set of character 4-grams whose MinHash signature is indexed
+with LSH banding, keyed by block, so a posting is only compared with the
+few earlier postings in its block that share a band - never with every
+other posting.
+
+Each shingle's NUM_HASHES 16-bit hash values are cut from a single
+SHAKE-128 digest (cached, since postings share most of their 4-grams),
+and the per-position minimum is taken with map(min, zip(...)), so
+signatures are built without a Python-level loop per hash function.
+Candidates sharing a band are confirmed when their estimated Jaccard
+similarity reaches SIMILARITY_THRESHOLD.
+
+Blocking on the exact normalized agency trades recall for speed and
+precision. AGENCY_ALIASES only folds department names, so a USAJobs
+posting under a sub-agency ("Federal Emergency Management Agency") and
+the same role posted on LinkedIn under the department ("Department of
+Homeland Security") land in different blocks and are never compared.
+Catching those would mean blocking on location alone and treating
+agency similarity as part of the confirmation, at the cost of comparing
+every posting in a city with every other.
+
+Matching is not transitive: a posting joins the cluster whose
+representative (its first posting) it is most similar to, so a chain of
+postings that are each a little different never merges into one cluster.
+Each cluster is reduced to one canonical record (official source first,
+then the record with the most detail), which lists the other IDs in
+'duplicate_ids'. Postings archived in the last DEDUP_ARCHIVE_DAYS days
+(default 90) are indexed too, so a role notified last week under its
+USAJobs ID isn't announced again today under its LinkedIn ID.
+Set DEDUP=0 to turn the stage off.
+
+Usage:
+    python dedup.py archive [--since 2025-01-01]   # cluster the archive and report
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+import time
+from array import array
+from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import eq
+
+import job_archive
+from job_record import Job
+
+# 16 bands of 8 rows: titles ~0.7 similar share a band about 60% of the
+# time, ~0.8 similar 95%, ~0.4 similar about 1%. Postings at another agency
+# or in another city never share a bucket (see block()).
+NUM_HASHES = 128
+BANDS = 16
+ROWS = NUM_HASHES // BANDS
+
+# Estimated Jaccard similarity of the title 4-gram sets needed to call two postings the same
+SIMILARITY_THRESHOLD = 0.7
+
+# Band collisions verified per lookup, most collisions first
+MAX_CANDIDATES = 16
+
+SHINGLE_SIZE = 4
+
+# Distinct shingles whose hash values are kept in memory (about 320 bytes each);
+# postings share most of their 4-grams, so this avoids rehashing them
+SHINGLE_CACHE_SIZE = 1 << 16
+DEFAULT_ARCHIVE_DAYS = 90
+
+# Lower number wins when picking a cluster's canonical record
+SOURCE_PRIORITY = {'USAJobs': 0, 'LinkedIn': 1, 'Indeed': 2}
+
+ABBREVIATIONS = {
+    'sr': 'senior', 'jr': 'junior', 'mgr': 'manager', 'mgmt': 'management',
+    'mngmt': 'management', 'admin': 'administrator', 'asst': 'assistant',
+    'assoc': 'associate', 'spec': 'specialist', 'dir': 'director',
+    'dept': 'department', 'govt': 'government', 'fed': 'federal',
+    'prog': 'program', 'coord': 'coordinator', 'ii': '2', 'iii': '3', 'iv': '4',
+}
+
+STOPWORDS = {'the', 'of', 'and', 'for', 'a', 'an', 'in', 'at', 'to', 'us', 'u', 's'}
+
+# Agency wording that differs between USAJobs and the job boards
+AGENCY_PREFIXES = re.compile(
+    r'^(?:(?:u s|us|united states)\s+)?(?:department(?: of)?(?: the)?\s+)?'
+)
+AGENCY_ALIASES = {
+    'veterans affairs': 'va', 'veterans health administration': 'va',
+    'general services administration': 'gsa',
+    'homeland security': 'dhs', 'health human services': 'hhs',
+    'defense': 'dod', 'transportation': 'dot', 'energy': 'doe',
+    'agency international development': 'usaid',
+}
+
+US_STATES = {
+    'alabama': 'al', 'alaska': 'ak', 'arizona': 'az', 'arkansas': 'ar', 'california': 'ca',
+    'colorado': 'co', 'connecticut': 'ct', 'delaware': 'de', 'district columbia': 'dc',
+    'florida': 'fl', 'georgia': 'ga', 'hawaii': 'hi', 'idaho': 'id', 'illinois': 'il',
+    'indiana': 'in', 'iowa': 'ia', 'kansas': 'ks', 'kentucky': 'ky', 'louisiana': 'la',
+    'maine': 'me', 'maryland': 'md', 'massachusetts': 'ma', 'michigan': 'mi',
+    'minnesota': 'mn', 'mississippi': 'ms', 'missouri': 'mo', 'montana': 'mt',
+    'nebraska': 'ne', 'nevada': 'nv', 'new hampshire': 'nh', 'new jersey': 'nj',
+    'new mexico': 'nm', 'new york': 'ny', 'north carolina': 'nc', 'north dakota': 'nd',
+    'ohio': 'oh', 'oklahoma': 'ok', 'oregon': 'or', 'pennsylvania': 'pa',
+    'rhode island': 'ri', 'south carolina': 'sc', 'south dakota': 'sd', 'tennessee': 'tn',
+    'texas': 'tx', 'utah': 'ut', 'vermont': 'vt', 'virginia': 'va', 'washington state': 'wa',
+    'west virginia': 'wv', 'wisconsin': 'wi', 'wyoming': 'wy',
+}
+_STATE_PATTERN = re.compile(r'\b(' + '|'.join(sorted(US_STATES, key=len, reverse=True)) + r')\b')
+_LOCATION_NOISE = re.compile(r'\b(?:united states|usa|remote|hybrid|on site|onsite)\b')
+
+_PARENTHETICAL = re.compile(r'\([^)]*\)|\[[^\]]*\]')
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+_stats = {'postings': 0, 'archived': 0, 'clusters': 0, 'dropped': 0, 'comparisons': 0, 'seconds': 0.0}
+
+def is_enabled():
+    return os.getenv('DEDUP', '1') != '0'
+
+def get_archive_days():
+    try:
+        return int(os.getenv('DEDUP_ARCHIVE_DAYS', DEFAULT_ARCHIVE_DAYS))
+    except ValueError:
+        return DEFAULT_ARCHIVE_DAYS
+
+def _words(text):
+    words = _NON_WORD.sub(' ', _PARENTHETICAL.sub(' ', (text or '').lower())).split()
+    return [ABBREVIATIONS.get(w, w) for w in words if w not in STOPWORDS]
+
+def normalize_title(title):
+    return ' '.join(_words(title))
+
+def normalize_agency(agency):
+    name = AGENCY_PREFIXES.sub('', ' '.join(_words(agency)))
+    return AGENCY_ALIASES.get(name, name)
+
+def normalize_location(location):
+    text = _NON_WORD.sub(' ', (location or '').lower())
+    text = text.replace('district of columbia', 'district columbia')
+    text = _LOCATION_NOISE.sub(' ', text)
+    text = _STATE_PATTERN.sub(lambda m: US_STATES[m.group(1)], text)
+    return ' '.join(text.split())
+
+def block(job):
+    """Normalized (agency, location); only postings with equal blocks are compared"""
+    return normalize_agency(job.get('agency')), normalize_location(job.get('location'))
+
+def shingles(job):
+    """Character 4-grams of the normalized title"""
+    text = normalize_title(job.get('title'))
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+@lru_cache(maxsize=SHINGLE_CACHE_SIZE)
+def _shingle_hashes(feature):
+    """NUM_HASHES 16-bit hash values of one shingle, cut from a single SHAKE-128 digest"""
+    return array('H', hashlib.shake_128(feature.encode()).digest(NUM_HASHES * 2))
+
+def signature(features):
+    """MinHash signature of a set of strings: the minimum of each hash function, as array('H')"""
+    return array('H', map(min, zip(*map(_shingle_hashes, features))))
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(map(eq, a, b)) / NUM_HASHES
+
+class NearDuplicateIndex:
+    """
+    LSH index over title signatures, bucketed per block. Only one
+    representative per cluster is indexed, so heavily reposted roles don't
+    grow their buckets, and at most MAX_CANDIDATES band collisions are
+    verified per lookup.
+    """
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self.ids = []
+        self.signatures = []
+        self.blocks = []
+        # hash of (block, band, band values) -> position, or list of positions
+        self.buckets = {}
+        self.comparisons = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def band_keys(self, sig, block):
+        return [hash((block, band, sig[band * ROWS:(band + 1) * ROWS].tobytes())) for band in range(BANDS)]
+
+    def match(self, sig, block, keys=None):
+        """Positions of indexed postings in block similar to sig, most similar first"""
+        hits = {}
+        for key in keys or self.band_keys(sig, block):
+            hit = self.buckets.get(key)
+            if hit is None:
+                continue
+            for pos in (hit if isinstance(hit, list) else (hit,)):
+                hits[pos] = hits.get(pos, 0) + 1
+        if not hits:
+            return []
+
+        candidates = sorted(hits, key=hits.get, reverse=True)[:MAX_CANDIDATES]
+        self.comparisons += len(candidates)
+        scored = []
+        for pos in candidates:
+            # A hash collision between blocks is not a match
+            if self.blocks[pos] != block:
+                continue
+            score = similarity(sig, self.signatures[pos])
+            if score >= self.threshold:
+                scored.append((score, pos))
+        scored.sort(key=lambda hit: (-hit[0], hit[1]))
+        return [pos for _, pos in scored]
+
+    def add(self, job_id, sig, block, keys=None):
+        """Index a signature and return its position"""
+        pos = len(self.ids)
+        self.ids.append(job_id)
+        self.signatures.append(sig)
+        self.blocks.append(block)
+        for key in keys or self.band_keys(sig, block):
+            hit = self.buckets.get(key)
+            if hit is None:
+                self.buckets[key] = pos
+            elif isinstance(hit, list):
+                hit.append(pos)
+            else:
+                self.buckets[key] = [hit, pos]
+        return pos
+
+    def add_if_new(self, job_id, sig, block):
+        """Index sig unless it matches an indexed posting; returns the matches, best first"""
+        keys = self.band_keys(sig, block)
+        matches = self.match(sig, block, keys)
+        if not matches:
+            self.add(job_id, sig, block, keys)
+        return matches
+
+def canonical_rank(job):
+    """Sort key for picking a cluster's canonical record (smallest wins)"""
+    detail = sum(1 for key in ('salary', 'location', 'posted')
+                 if job.get(key) and job[key] not in ('See posting', 'Recent'))
+    return (SOURCE_PRIORITY.get(job.get('source'), len(SOURCE_PRIORITY)), -detail)
+
+def cluster(jobs, index=None):
+    """
+    Group near-duplicate jobs. Returns (clusters, archived) where clusters is
+    a list of lists of positions into jobs (first-seen order), and archived
+    is the set of cluster numbers that matched a posting already in index.
+    Each job joins the cluster of the representative it is most similar to;
+    representatives are added to index as they are found.
+    """
+    index = NearDuplicateIndex() if index is None else index
+    clusters = []
+    archived = set()
+    # index position -> cluster number
+    cluster_at = {}
+
+    for i, job in enumerate(jobs):
+        matches = index.add_if_new(job.get('id'), signature(shingles(job)), block(job))
+        if not matches:
+            cluster_at[len(index) - 1] = len(clusters)
+            clusters.append([i])
+            continue
+        n = cluster_at.get(matches[0])
+        if n is None:
+            # First posting this run of a role already in the archive
+            n = cluster_at[matches[0]] = len(clusters)
+            clusters.append([])
+            archived.add(n)
+        clusters[n].append(i)
+
+    return clusters, archived
+
+def load_archive_index(days=None):
+    """Index of postings archived in the last `days` days (0 = none)"""
+    days = get_archive_days() if days is None else days
+    index = NearDuplicateIndex()
+    if days <= 0:
+        return index
+    since = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+    try:
+        for job in job_archive.query(since=since):
+            index.add_if_new(job.get('id'), signature(shingles(job)), block(job))
+    except Exception as e:
+        print(f"   ⚠ Could not index archive for dedup: {e}")
+    return index
+
+def select_new_jobs(all_jobs, new_ids, index=None):
+    """
+    Canonical jobs worth notifying about: one per cluster of near-duplicates,
+    for clusters where every posting is new this run and none was archived
+    before. Canonical records list the other postings in 'duplicate_ids'.
+    """
+    if not is_enabled():
+        return [j for j in all_jobs if j['id'] in new_ids]
+
+    start = time.perf_counter()
+    index = load_archive_index() if index is None else index
+    archived_count = len(index)
+
+    clusters, archived = cluster(all_jobs, index)
+    selected = []
+    for n, members in enumerate(clusters):
+        if n in archived or any(all_jobs[i]['id'] not in new_ids for i in members):
+            continue
+        group = [all_jobs[i] for i in members]
+        best = min(group, key=canonical_rank)
+        duplicate_ids = [j['id'] for j in group if j['id'] != best['id']]
+        if duplicate_ids:
+            best = Job(best, duplicate_ids=duplicate_ids)
+        selected.append(best)
+
+    new_count = sum(1 for j in all_jobs if j['id'] in new_ids)
+    _stats['postings'] += len(all_jobs)
+    _stats['archived'] += archived_count
+    _stats['clusters'] += sum(1 for members in clusters if len(members) > 1)
+    _stats['dropped'] += new_count - len(selected)
+    _stats['comparisons'] += index.comparisons
+    _stats['seconds'] += time.perf_counter() - start
+    return selected
+
+def dedup_stats():
+    """Counters: postings, archived, clusters, dropped, comparisons, seconds, postings_per_second"""
+    stats = dict(_stats)
+    total = stats['postings'] + stats['archived']
+    stats['postings_per_second'] = total / stats['seconds'] if stats['seconds'] else 0.0
+    return stats
+
+def print_dedup_stats():
+    s = dedup_stats()
+    if not s['postings']:
+        return
+    print("\n🧬 Near-duplicate detection:")
+    print(f"   {s['postings']} postings against {s['archived']} archived in {s['seconds'] * 1000:.0f} ms "
+          f"({s['postings_per_second']:.0f} postings/s, {s['comparisons']} comparisons)")
+    print(f"   {s['clusters']} multi-posting clusters, {s['dropped']} new postings suppressed as duplicates")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Near-duplicate detection over the job archive')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('archive', help='cluster archived postings and report throughput')
+    p.add_argument('--since', help='YYYY-MM-DD (inclusive)')
+    p.add_argument('--until', help='YYYY-MM-DD (inclusive)')
+    p.add_argument('--show', type=int, default=10, help='largest clusters to print')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'archive':
+        start = time.perf_counter()
+        jobs = list(job_archive.query(since=args.since, until=args.until))
+        loaded = time.perf_counter()
+        if not jobs:
+            print("ℹ️  No archived postings in range")
+            return 0
+        clusters, _ = cluster(jobs)
+        elapsed = time.perf_counter() - loaded
+
+        groups = sorted((c for c in clusters if len(c) > 1), key=len, reverse=True)
+        duplicates = sum(len(c) - 1 for c in groups)
+        print(f"📦 {len(jobs)} postings loaded in {loaded - start:.1f}s")
+        print(f"🧬 {len(groups)} clusters, {duplicates} duplicates, "
+              f"clustered in {elapsed:.2f}s ({len(jobs) / elapsed:.0f} postings/s)")
+        for members in groups[:args.show]:
+            best = min((jobs[i] for i in members), key=canonical_rank)
+            sources = sorted({jobs[i].get('source', '?') for i in members})
+            print(f"   {len(members)}x {best['title']} - {best.get('agency')} ({', '.join(sources)})")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
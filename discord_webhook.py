@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Discord Webhook Transport
+Posts jobs as embeds, packed up to Discord's limits (10 embeds and 6000
+characters of embed text per message), and paces itself with the
+webhook's rate-limit bucket: X-RateLimit-Remaining / -Reset-After on
+every response, and retry_after on a 429. Large batches are delivered
+in full instead of being cut off or dropped.
+
+A webhook POST is not idempotent, so a message is only sent again when
+Discord cannot have accepted it: a 429, or a connection that never
+opened. A 5xx may come after the message was posted and is not retried,
+so an alert is never duplicated.
+"""
+
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+import http_client
+import metrics
+from resilience import NO_RETRY, RetryPolicy
+
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+MAX_TITLE = 256
+MAX_DESCRIPTION = 4096
+MAX_FIELD_VALUE = 1024
+
+# Tries per message when Discord answers 429 or the connection fails to open
+MAX_ATTEMPTS = 5
+
+# Backoff between connection attempts (429s wait for retry_after instead)
+CONNECT_RETRY = RetryPolicy(attempts=MAX_ATTEMPTS)
+
+# Never sleep longer than this for a single rate-limit wait
+MAX_WAIT = 60.0
+
+SOURCE_COLORS = {
+    'USAJobs': 0x0066CC,
+    'LinkedIn': 0x0A66C2,
+    'Indeed': 0x2164F3,
+}
+DEFAULT_COLOR = 0x888888
+
+def _clip(text, limit):
+    text = str(text)
+    return text if len(text) <= limit else text[:limit - 1] + '…'
+
+def job_embed(job):
+    """One embed for a job, with every part clipped to Discord's limits"""
+    embed = {
+        'title': _clip(job['title'], MAX_TITLE),
+        'description': _clip(f"{job['agency']} | {job['location']}", MAX_DESCRIPTION),
+        'color': SOURCE_COLORS.get(job.get('source'), DEFAULT_COLOR),
+        'fields': [
+            {'name': '💰 Salary', 'value': _clip(job.get('salary') or 'See posting', MAX_FIELD_VALUE), 'inline': True},
+            {'name': '📅 Posted', 'value': _clip(job.get('posted') or 'Recently', MAX_FIELD_VALUE), 'inline': True},
+            {'name': '📌 Source', 'value': _clip(job.get('source') or 'Unknown', MAX_FIELD_VALUE), 'inline': True},
+        ],
+    }
+    if job.get('priority'):
+        embed['fields'].insert(0, {
+            'name': '⭐ Priority',
+            'value': _clip(f"{job['priority']} • {job.get('type', 'Federal General')}", MAX_FIELD_VALUE),
+            'inline': True,
+        })
+    if str(job.get('url', '')).startswith('http'):
+        embed['url'] = job['url']
+    return embed
+
+def embed_chars(embed):
+    """Characters Discord counts toward the per-message embed total"""
+    total = len(embed.get('title', '')) + len(embed.get('description', ''))
+    for field in embed.get('fields', ()):
+        total += len(field['name']) + len(field['value'])
+    total += len(embed.get('footer', {}).get('text', ''))
+    total += len(embed.get('author', {}).get('name', ''))
+    return total
+
+def pack_embeds(embeds):
+    """Group embeds into messages within the count and total-size limits"""
+    messages, current, size = [], [], 0
+    for embed in embeds:
+        chars = embed_chars(embed)
+        if current and (len(current) >= MAX_EMBEDS_PER_MESSAGE or size + chars > MAX_EMBED_CHARS_PER_MESSAGE):
+            messages.append(current)
+            current, size = [], 0
+        current.append(embed)
+        size += chars
+    if current:
+        messages.append(current)
+    return messages
+
+class DiscordWebhook:
+    """A webhook URL plus the state of its rate-limit bucket"""
+
+    def __init__(self, url):
+        self.url = url
+        self.host = urlsplit(url).hostname
+        self.remaining = None
+        self.reset_at = 0.0
+        self.stats = {'requests': 0, 'rate_limited': 0, 'waited': 0.0}
+
+    def _wait_for_bucket(self):
+        if self.remaining == 0:
+            wait = min(MAX_WAIT, self.reset_at - time.monotonic())
+            if wait > 0:
+                self.stats['waited'] += wait
+                metrics.inc('sleep_seconds_total', wait, reason='discord_rate_limit', host=self.host)
+                time.sleep(wait)
+
+    def _update_bucket(self, response):
+        headers = response.headers
+        try:
+            if 'X-RateLimit-Remaining' in headers:
+                self.remaining = int(headers['X-RateLimit-Remaining'])
+            if 'X-RateLimit-Reset-After' in headers:
+                self.reset_at = time.monotonic() + float(headers['X-RateLimit-Reset-After'])
+        except ValueError:
+            pass
+
+    @staticmethod
+    def _retry_after(response):
+        try:
+            return float(response.json().get('retry_after'))
+        except (ValueError, TypeError, AttributeError):
+            pass
+        try:
+            return float(response.headers.get('Retry-After'))
+        except (ValueError, TypeError):
+            return 1.0
+
+    def send(self, payload):
+        """
+        Post one message, waiting out the bucket and retrying 429s and
+        connections that never opened. Returns the final response.
+        """
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            self._wait_for_bucket()
+            try:
+                response = http_client.post(self.url, json=payload, timeout=10, retry=NO_RETRY)
+            except requests.exceptions.RequestException as e:
+                if not CONNECT_RETRY.should_retry(attempt, idempotent=False, error=e):
+                    raise
+                wait = CONNECT_RETRY.delay(attempt - 1)
+                metrics.inc('sleep_seconds_total', wait, reason='retry', host=self.host)
+                time.sleep(wait)
+                continue
+            self.stats['requests'] += 1
+            self._update_bucket(response)
+
+            if response.status_code == 429:
+                self.stats['rate_limited'] += 1
+                wait = min(MAX_WAIT, self._retry_after(response))
+                self.stats['waited'] += wait
+                metrics.inc('sleep_seconds_total', wait, reason='discord_rate_limit', host=self.host)
+                time.sleep(wait)
+                continue
+
+            return response
+        return response
+
+def send_jobs(url, new_jobs, heading=None):
+    """
+    Send every job as embeds, heading as the first message's text.
+    Returns (messages sent, messages failed, webhook stats).
+    """
+    webhook = DiscordWebhook(url)
+    sent = failed = 0
+    for n, embeds in enumerate(pack_embeds([job_embed(job) for job in new_jobs])):
+        payload = {'embeds': embeds}
+        if heading and n == 0:
+            payload['content'] = heading
+        try:
+            response = webhook.send(payload)
+        except requests.exceptions.RequestException as e:
+            # May or may not have been posted; either way, go on with the rest
+            print(f"   ⚠ Discord request failed: {e}")
+            failed += 1
+            continue
+        if response.status_code in (200, 204):
+            sent += 1
+        else:
+            print(f"   ⚠ Discord returned {response.status_code}")
+            failed += 1
+    return sent, failed, webhook.stats
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Card Extraction Engine
+Each HTML source is described by a spec (plain data, kept next to its
+scanner): which elements are job cards, and for every field an ordered
+list of fallback selectors plus post-processing steps. A spec is compiled
+once per process into an ExtractionPlan:
+
+- selectors become element matchers grouped by tag, so every card is
+  extracted in a single walk over its elements, instead of one search per
+  field and fallback
+- the page is fed to lxml's pull parser in chunks and parsing stops as
+  soon as `limit` cards from the primary card selector are complete
+
+Selectors are a small CSS subset, one compound selector each:
+    tag   tag.class   tag[attr]   tag[attr=v]   tag[attr*=v]   tag[attr^=v]   :self
+`.class` matches one whole class; [class*=v] matches a substring of the
+class attribute. `:self` is the card element itself; every other selector
+only matches descendants.
+
+Field spec keys:
+    select    list of (selector, attribute); attribute None means the text
+    from      derive the value from an earlier field instead of selecting
+    post      list of post-processor names, e.g. 'remove:job_'
+    default   used when nothing matches; formatted with the context
+    required  skip the card when the field has no value
+The spec's 'output' maps job keys to templates formatted with the
+context and extracted fields.
+"""
+
+import re
+import threading
+import time
+
+from lxml import etree
+
+import metrics
+from job_record import Job
+
+FEED_CHUNK = 16 * 1024
+
+_SELECTOR = re.compile(r'^(?P<tag>[a-zA-Z0-9*]+)?(?P<rest>(?:\.[\w-]+|\[[^\]]+\])*)$')
+_PART = re.compile(r'\.(?P<cls>[\w-]+)|\[(?P<attr>[\w-]+)(?:(?P<op>[*^]?=)(?P<value>[^\]]*))?\]')
+
+POST_PROCESSORS = {
+    'strip_new_badge': lambda value, arg: re.sub(r'^(new|New)\s*', '', value),
+    'remove': lambda value, arg: value.replace(arg, ''),
+    'absolute_url': lambda value, arg: value if value.startswith('http') else arg + value,
+    # First group of the regex, else the last URL path segment without a query
+    'regex_or_last_segment': lambda value, arg: (
+        m.group(1) if (m := re.search(arg, value)) else value.split('/')[-1].split('?')[0]
+    ),
+}
+
+def compile_selector(selector):
+    """
+    Turn a selector string into (tag, test) where tag is the element name
+    (or '*') and test(el) checks the remaining conditions
+    """
+    if selector == ':self':
+        return '*', lambda el: True
+
+    match = _SELECTOR.match(selector)
+    if not match:
+        raise ValueError(f"Unsupported selector: {selector!r}")
+
+    tag = match.group('tag') or '*'
+    checks = []
+    for part in _PART.finditer(match.group('rest')):
+        if part.group('cls'):
+            cls = part.group('cls')
+            checks.append(lambda el, cls=cls: cls in (el.get('class') or '').split())
+            continue
+        attr, op, value = part.group('attr'), part.group('op'), (part.group('value') or '').strip('"\'')
+        if op is None:
+            checks.append(lambda el, attr=attr: el.get(attr) is not None)
+        elif op == '=':
+            checks.append(lambda el, attr=attr, value=value: el.get(attr) == value)
+        elif op == '*=':
+            checks.append(lambda el, attr=attr, value=value: value in (el.get(attr) or ''))
+        elif op == '^=':
+            checks.append(lambda el, attr=attr, value=value: (el.get(attr) or '').startswith(value))
+
+    return tag, lambda el: all(check(el) for check in checks)
+
+def element_text(el):
+    """Same result as BeautifulSoup's get_text(strip=True)"""
+    return ''.join(s.strip() for s in el.itertext())
+
+def _compile_post(names):
+    steps = []
+    for name in names or ():
+        key, _, arg = name.partition(':')
+        if key not in POST_PROCESSORS:
+            raise ValueError(f"Unknown post-processor: {key!r}")
+        steps.append((POST_PROCESSORS[key], arg))
+    return steps
+
+class ExtractionPlan:
+    """A compiled spec: fast card detection plus one-pass field extraction"""
+
+    def __init__(self, spec):
+        self.source = spec['source']
+        self.output = spec['output']
+
+        self.card_matchers = [compile_selector(s) for s in spec['cards']]
+
+        # Fields in spec order: (name, from, post steps, default, required)
+        # Dispatch table: tag -> [(field, alt index, test, attribute, is_self)]
+        self.fields = []
+        self.dispatch = {}
+        for name, field in spec['fields'].items():
+            self.fields.append((
+                name,
+                field.get('from'),
+                _compile_post(field.get('post')),
+                field.get('default'),
+                field.get('required', False),
+            ))
+            for alt, (selector, attribute) in enumerate(field.get('select', ())):
+                tag, test = compile_selector(selector)
+                self.dispatch.setdefault(tag, []).append(
+                    (name, alt, test, attribute, selector == ':self')
+                )
+        # Selectors without a tag are checked against every element
+        self.wildcard = self.dispatch.pop('*', [])
+        for entries in self.dispatch.values():
+            entries.extend(self.wildcard)
+
+        self.stats = {'pages': 0, 'cards': 0, 'jobs': 0, 'seconds': 0.0}
+        self._stats_lock = threading.Lock()
+
+    def find_cards(self, html, limit):
+        """
+        Feed the page to lxml in chunks and return up to `limit` cards.
+        Stops parsing once the primary card selector has `limit` complete
+        cards; otherwise falls back through the other card selectors.
+        """
+        if not html or not html.strip():
+            # A blank (e.g. throttled) page simply has no cards
+            return []
+        primary_tag, primary_test = self.card_matchers[0]
+        parser = etree.HTMLPullParser(
+            events=('end',), tag=None if primary_tag == '*' else primary_tag
+        )
+        cards = []
+        try:
+            for start in range(0, len(html), FEED_CHUNK):
+                parser.feed(html[start:start + FEED_CHUNK])
+                for _, el in parser.read_events():
+                    if primary_test(el):
+                        cards.append(el)
+                        if len(cards) >= limit:
+                            return cards
+            root = parser.close()
+        except etree.XMLSyntaxError:
+            # Nothing lxml could build a document from
+            return cards
+        if cards or root is None:
+            return cards
+
+        for tag, test in self.card_matchers[1:]:
+            cards = [el for el in root.iter(None if tag == '*' else tag) if test(el)][:limit]
+            if cards:
+                return cards
+        return []
+
+    def extract_card(self, card, context):
+        """Extract one job from a card element in a single walk, or None to skip it"""
+        best = {}
+        for el in card.iter():
+            tag = el.tag
+            if not isinstance(tag, str):
+                continue  # comments and processing instructions
+            for name, alt, test, attribute, is_self in self.dispatch.get(tag, self.wildcard):
+                if (el is card) != is_self:
+                    continue
+                found = best.get(name)
+                if found is not None and found[0] <= alt:
+                    continue
+                if attribute and not el.get(attribute):
+                    continue
+                if test(el):
+                    best[name] = (alt, el.get(attribute) if attribute else element_text(el))
+
+        values = dict(context)
+        for name, source, post, default, required in self.fields:
+            if source:
+                value = values.get(source)
+            else:
+                value = best[name][1] if name in best else None
+
+            if value is not None:
+                for step, arg in post:
+                    value = step(value, arg)
+            elif default is not None:
+                value = default.format(**values)
+            elif required:
+                return None
+            values[name] = value
+
+        return Job({key: template.format(**values) for key, template in self.output.items()})
+
+    def extract(self, html, context, limit):
+        """Extract up to `limit` jobs from a search results page"""
+        start = time.perf_counter()
+        cards = self.find_cards(html, limit)
+        jobs = []
+        for card in cards:
+            try:
+                job = self.extract_card(card, context)
+            except Exception:
+                continue
+            if job is not None:
+                jobs.append(job)
+
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self.stats['pages'] += 1
+            self.stats['cards'] += len(cards)
+            self.stats['jobs'] += len(jobs)
+            self.stats['seconds'] += elapsed
+        metrics.inc('parse_seconds_total', elapsed, source=self.source)
+        return jobs
+
+_plans = {}
+_plans_lock = threading.Lock()
+
+def get_plan(spec):
+    """Compile a spec the first time it is used; later calls reuse the plan"""
+    plan = _plans.get(spec['source'])
+    if plan is None:
+        with _plans_lock:
+            plan = _plans.get(spec['source'])
+            if plan is None:
+                plan = _plans[spec['source']] = ExtractionPlan(spec)
+    return plan
+
+def extraction_stats():
+    """Per-source counters: pages, cards, jobs, seconds and cards_per_second"""
+    stats = {}
+    for source, plan in _plans.items():
+        s = dict(plan.stats)
+        s['cards_per_second'] = s['cards'] / s['seconds'] if s['seconds'] else 0.0
+        stats[source] = s
+    return stats
+
+def print_extraction_stats():
+    stats = extraction_stats()
+    if not stats:
+        return
+    print("\n🧩 Card extraction:")
+    for source, s in sorted(stats.items()):
+        print(f"   {source}: {s['jobs']} jobs from {s['cards']} cards on {s['pages']} pages "
+              f"in {s['seconds'] * 1000:.0f} ms ({s['cards_per_second']:.0f} cards/s)")
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+On-disk HTTP Response Cache
+Sits between the scanners and http_client. Responses are stored in a
+SQLite file keyed by normalized URL + query parameters, plus a hash of
+the request headers that change the answer (the USAJobs API key and
+User-Agent), so a different key or identity never sees another's page.
+Entries with an ETag or Last-Modified are revalidated with a conditional
+request (a 304 reuses the stored body). Entries without validators are
+served until they go stale: after the response's Cache-Control max-age
+if it sent one, otherwise after HTTP_CACHE_HTML_TTL for HTML pages
+(LinkedIn and Indeed send no validators, and listings change within the
+hour) or HTTP_CACHE_TTL for anything else. Responses marked no-store, or
+no-cache without a validator, are not stored. Total size is capped with
+least-recently-used eviction.
+
+Settings (environment variables):
+    HTTP_CACHE=0              disable the cache entirely
+    HTTP_CACHE_TTL            seconds to trust an entry with no validators (default 3600)
+    HTTP_CACHE_HTML_TTL       the same for HTML pages (default 300)
+    HTTP_CACHE_MAX_MB         size cap before LRU eviction (default 50)
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+import http_client
+
+CACHE_FILE = 'data/http_cache.db'
+DEFAULT_TTL = 3600
+DEFAULT_HTML_TTL = 300
+DEFAULT_MAX_MB = 50
+
+# Response headers worth keeping with the body
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'Date')
+
+# Request headers that can change the response; part of the cache key
+KEYED_HEADERS = ('Authorization-Key', 'User-Agent')
+
+_MAX_AGE = re.compile(r'\bmax-age\s*=\s*"?(\d+)')
+
+_stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stored': 0, 'evicted': 0, 'bytes_saved': 0}
+_lock = threading.Lock()
+_conn = None
+
+def is_enabled():
+    return os.getenv('HTTP_CACHE', '1') != '0'
+
+def get_ttl():
+    try:
+        return float(os.getenv('HTTP_CACHE_TTL', DEFAULT_TTL))
+    except ValueError:
+        return DEFAULT_TTL
+
+def get_html_ttl():
+    try:
+        return float(os.getenv('HTTP_CACHE_HTML_TTL', DEFAULT_HTML_TTL))
+    except ValueError:
+        return DEFAULT_HTML_TTL
+
+def get_max_bytes():
+    try:
+        return int(float(os.getenv('HTTP_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024)
+    except ValueError:
+        return DEFAULT_MAX_MB * 1024 * 1024
+
+def normalize_url(url, params=None):
+    """
+    Cache key for a GET: scheme and host lowercased, fragment dropped,
+    query string merged with params and sorted so argument order doesn't matter
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        items = params.items() if isinstance(params, dict) else params
+        query.extend((str(k), str(v)) for k, v in items if v is not None)
+    return urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path or '/',
+        urlencode(sorted(query)),
+        ''
+    ))
+
+def cache_key(url, params=None, headers=None):
+    """
+    normalize_url(), plus a digest of the KEYED_HEADERS the request sends.
+    The digest keeps the API key itself out of the cache file.
+    """
+    key = normalize_url(url, params)
+    headers = {k.lower(): v for k, v in (headers or {}).items()}
+    keyed = [(h, headers[h.lower()]) for h in KEYED_HEADERS if headers.get(h.lower())]
+    if keyed:
+        digest = hashlib.sha256(json.dumps(keyed).encode('utf-8')).hexdigest()[:16]
+        key += f' #{digest}'
+    return key
+
+def _max_age(cache_control):
+    match = _MAX_AGE.search(cache_control or '')
+    return int(match.group(1)) if match else None
+
+def _lifetime(headers, ttl):
+    """Seconds a validator-less entry stays fresh"""
+    max_age = _max_age(headers.get('Cache-Control'))
+    if max_age is not None:
+        return max_age
+    if ttl is not None:
+        return ttl
+    if 'html' in headers.get('Content-Type', '').lower():
+        return get_html_ttl()
+    return get_ttl()
+
+def _connect():
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        conn = sqlite3.connect(CACHE_FILE, check_same_thread=False)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        _conn = conn
+    return _conn
+
+def _count(name, amount=1):
+    _stats[name] += amount
+
+def _build_response(url, status, headers, body):
+    """Rebuild a requests.Response so callers can't tell it came from disk"""
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers)
+    response._content = body
+    response.url = url
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+def _lookup(key):
+    with _lock:
+        row = _connect().execute(
+            "SELECT status, headers, body, stored_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+    if row is None:
+        return None
+    status, headers, body, stored_at = row
+    return status, json.loads(headers), body, stored_at
+
+def _touch(key, refreshed=False):
+    now = time.time()
+    with _lock:
+        if refreshed:
+            _connect().execute(
+                "UPDATE responses SET last_used = ?, stored_at = ? WHERE key = ?", (now, now, key)
+            )
+        else:
+            _connect().execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        _connect().commit()
+
+def _store(key, response):
+    cache_control = response.headers.get('Cache-Control', '').lower()
+    if 'no-store' in cache_control:
+        return
+    has_validator = 'ETag' in response.headers or 'Last-Modified' in response.headers
+    if not has_validator and ('no-cache' in cache_control or _max_age(cache_control) == 0):
+        # Would have to be refetched every time, with nothing to revalidate against
+        return
+
+    headers = {h: response.headers[h] for h in KEPT_HEADERS if h in response.headers}
+    body = response.content
+    now = time.time()
+    with _lock:
+        conn = _connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, response.status_code, json.dumps(headers), body, len(body), now, now)
+        )
+        _count('stored')
+        _evict(conn)
+        conn.commit()
+
+def _evict(conn):
+    """Drop least-recently-used entries until the cache fits its size cap"""
+    max_bytes = get_max_bytes()
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    if total <= max_bytes:
+        return
+    for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+        conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+        _count('evicted')
+        total -= size
+        if total <= max_bytes:
+            break
+
+def cached_get(url, params=None, headers=None, ttl=None, **kwargs):
+    """
+    Drop-in for http_client.get that serves repeat requests from disk
+    Only 200 responses are stored; anything else passes straight through.
+    ttl overrides the configured lifetime of entries without validators
+    (a max-age sent by the server still wins).
+    """
+    if not is_enabled():
+        return http_client.get(url, params=params, headers=headers, **kwargs)
+
+    key = cache_key(url, params, headers)
+    entry = _lookup(key)
+
+    request_headers = dict(headers or {})
+    if entry is not None:
+        status, stored_headers, body, stored_at = entry
+        etag = stored_headers.get('ETag')
+        last_modified = stored_headers.get('Last-Modified')
+
+        if not etag and not last_modified:
+            if time.time() - stored_at < _lifetime(stored_headers, ttl):
+                _touch(key)
+                with _lock:
+                    _count('hits')
+                    _count('bytes_saved', len(body))
+                return _build_response(normalize_url(url, params), status, stored_headers, body)
+        else:
+            if etag:
+                request_headers['If-None-Match'] = etag
+            if last_modified:
+                request_headers['If-Modified-Since'] = last_modified
+
+    response = http_client.get(url, params=params, headers=request_headers, **kwargs)
+
+    if entry is not None and response.status_code == 304:
+        _touch(key, refreshed=True)
+        with _lock:
+            _count('revalidated')
+            _count('bytes_saved', len(body))
+        return _build_response(normalize_url(url, params), status, stored_headers, body)
+
+    with _lock:
+        _count('misses')
+    if response.status_code == 200:
+        _store(key, response)
+    return response
+
+def cache_stats():
+    """Counters for this process: hits, misses, revalidated, stored, evicted, bytes_saved"""
+    with _lock:
+        return dict(_stats)
+
+def print_cache_stats():
+    stats = cache_stats()
+    if not any(stats.values()):
+        return
+    print("\n🗄 HTTP cache:")
+    print(f"   {stats['hits']} hits, {stats['revalidated']} revalidated (304), {stats['misses']} misses")
+    print(f"   {stats['bytes_saved'] / 1024:.1f} KB served from cache, {stats['evicted']} entries evicted")
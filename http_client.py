@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Client
+One pooled session for every scanner, Notion and Discord call, so requests
+to the same host reuse keep-alive connections instead of paying a new
+TCP+TLS handshake each time
+
+HTTP_HOST_OVERRIDES sends a host's requests to another base URL, e.g. the
+local stand-in servers of benchmarks/load_harness.py:
+    HTTP_HOST_OVERRIDES="data.usajobs.gov=http://127.0.0.1:8001,api.notion.com=http://127.0.0.1:8002"
+Rate limiting and statistics still use the original host name.
+"""
+
+import importlib.util
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import metrics
+import rate_limit
+from resilience import DEFAULT_RETRY, IDEMPOTENT_METHODS
+
+# (connect, read) seconds, used when a caller doesn't pass its own timeout
+DEFAULT_TIMEOUT = (5, 15)
+
+# Number of hosts to keep pools for, and connections kept per host
+POOL_HOSTS = 16
+POOL_MAXSIZE = 10
+
+# Brotli is only advertised when urllib3 can decode it (brotli is in
+# requirements.txt; brotlicffi works too)
+if any(importlib.util.find_spec(name) for name in ('brotli', 'brotlicffi')):
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+else:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+def parse_host_overrides(value):
+    """{host: base URL} from 'host=base,host=base'"""
+    overrides = {}
+    for entry in (value or '').split(','):
+        host, sep, base = entry.strip().partition('=')
+        if sep and host.strip() and base.strip():
+            overrides[host.strip()] = base.strip().rstrip('/')
+    return overrides
+
+HOST_OVERRIDES = parse_host_overrides(os.getenv('HTTP_HOST_OVERRIDES'))
+
+_stats = {}
+_stats_lock = threading.Lock()
+_session = None
+_session_lock = threading.Lock()
+
+# Host the calling thread's request() is for, so connections opened to an
+# override address are counted under the original host
+_requesting = threading.local()
+
+def _host_stats(host):
+    stats = _stats.get(host)
+    if stats is None:
+        stats = _stats.setdefault(host, {'requests': 0, 'opened': 0, 'retries': 0})
+    return stats
+
+def _record_open(host):
+    with _stats_lock:
+        _host_stats(host)['opened'] += 1
+
+def _record_request(host):
+    with _stats_lock:
+        _host_stats(host)['requests'] += 1
+
+def _record_retry(host):
+    with _stats_lock:
+        _host_stats(host)['retries'] += 1
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _record_open(getattr(_requesting, 'host', None) or self.host)
+        return super()._new_conn()
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _record_open(getattr(_requesting, 'host', None) or self.host)
+        return super()._new_conn()
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose per-host pools count every new connection they open"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CountingHTTPConnectionPool,
+            'https': _CountingHTTPSConnectionPool,
+        }
+
+def get_session():
+    """Return the process-wide session, creating it on first use"""
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = PooledAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_MAXSIZE)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+                _session = session
+    return _session
+
+def _target_url(url, host):
+    """url with its scheme and host replaced when the host is overridden"""
+    base = HOST_OVERRIDES.get(host)
+    if base is None:
+        return url
+    parts = urlsplit(url)
+    return base + parts.path + (f'?{parts.query}' if parts.query else '')
+
+def _send(method, url, host, kwargs):
+    _requesting.host = host
+    try:
+        return get_session().request(method, url, **kwargs)
+    finally:
+        _requesting.host = None
+
+def request(method, url, retry=DEFAULT_RETRY, idempotent=None, **kwargs):
+    """
+    Send a request through the shared session
+    Takes the same arguments as requests.request; timeout defaults to DEFAULT_TIMEOUT.
+    Waits on the host's rate limiter first and reports the response back to it.
+    Transient failures are retried with jittered backoff per `retry`; pass
+    idempotent=True for a POST that is safe to repeat (e.g. a query).
+    """
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    host = urlsplit(url).hostname
+    url = _target_url(url, host)
+    if idempotent is None:
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+
+    attempt = 0
+    while True:
+        attempt += 1
+        rate_limit.acquire(host)
+        _record_request(host)
+        start = time.perf_counter()
+        try:
+            response = _send(method, url, host, kwargs)
+        except requests.exceptions.RequestException as e:
+            metrics.inc('http_requests_total', host=host, status='error')
+            if not retry.should_retry(attempt, idempotent, error=e):
+                raise
+        else:
+            if metrics.ENABLED:
+                metrics.observe('http_request_duration_seconds', time.perf_counter() - start, host=host)
+                metrics.inc('http_requests_total', host=host, status=str(response.status_code))
+                metrics.inc('http_response_bytes_total', len(response.content), host=host)
+            rate_limit.observe(host, response)
+            if not retry.should_retry(attempt, idempotent, status_code=response.status_code):
+                return response
+            response.close()
+        _record_retry(host)
+        delay = retry.delay(attempt - 1)
+        metrics.inc('sleep_seconds_total', delay, reason='retry', host=host)
+        time.sleep(delay)
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
+
+def connection_stats():
+    """
+    Per-host counters: {host: {'requests', 'opened', 'reused', 'retries'}}
+    reused is the number of requests that didn't need a new connection
+    """
+    with _stats_lock:
+        return {
+            host: {
+                'requests': s['requests'],
+                'opened': s['opened'],
+                'reused': max(0, s['requests'] - s['opened']),
+                'retries': s['retries'],
+            }
+            for host, s in _stats.items()
+        }
+
+def print_connection_stats():
+    """Log one line per host with connections opened vs reused"""
+    stats = connection_stats()
+    if not stats:
+        return
+    print("\n🔌 HTTP connections:")
+    for host, s in sorted(stats.items()):
+        line = f"   {host}: {s['requests']} requests, {s['opened']} opened, {s['reused']} reused"
+        if s['retries']:
+            line += f", {s['retries']} retried"
+        print(line)
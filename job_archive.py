@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Job Archive
+Stores archived jobs as daily gzip-compressed JSONL segments
+(data/archive/jobs-YYYY-MM-DD.jsonl.gz) with a sidecar index.json that
+records, per segment, the job count, which sources and agencies it
+contains and the segment's size on disk, plus the names of legacy files
+already imported by migrate. Queries use the index to open only the
+segments that can match, then stream records line by line.
+
+The segment is written before the index, so a crash in between leaves
+the index behind. Each command compares the recorded sizes with the
+files and rescans any segment that doesn't match (or isn't listed).
+
+Usage:
+    python job_archive.py query --agency "army" --since 2025-07-01 --until 2025-09-30
+    python job_archive.py query --source USAJobs --title "grants" --count
+    python job_archive.py query --min-grade 13 --min-salary 120000
+    python job_archive.py migrate            # import old data/jobs_archive_*.json files
+    python job_archive.py stats
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import sys
+from datetime import datetime
+
+from job_record import Job
+from salary import add_salary_fields, annual_salary
+
+ARCHIVE_DIR = 'data/archive'
+INDEX_FILE = os.path.join(ARCHIVE_DIR, 'index.json')
+LEGACY_PATTERN = 'data/jobs_archive_*.json'
+
+def segment_name(day):
+    return f'jobs-{day}.jsonl.gz'
+
+def segment_day(name):
+    return name[len('jobs-'):-len('.jsonl.gz')]
+
+def load_index():
+    try:
+        with open(INDEX_FILE, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'segments': {}}
+
+def save_index(index):
+    """Write the index atomically so a crash never leaves it half-written"""
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    tmp = INDEX_FILE + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    os.replace(tmp, INDEX_FILE)
+
+def _new_entry(day):
+    return {'date': day, 'count': 0, 'sources': {}, 'agencies': {}}
+
+def _count_job(entry, job):
+    source = job.get('source', 'Unknown')
+    agency = (job.get('agency') or 'Unknown').lower()
+    entry['sources'][source] = entry['sources'].get(source, 0) + 1
+    entry['agencies'][agency] = entry['agencies'].get(agency, 0) + 1
+    entry['count'] += 1
+
+def scan_segment(name):
+    """Index entry for a segment, counted from its records"""
+    path = os.path.join(ARCHIVE_DIR, name)
+    entry = _new_entry(segment_day(name))
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            _count_job(entry, json.loads(line))
+    entry['bytes'] = os.path.getsize(path)
+    return entry
+
+def refresh_index(index):
+    """
+    Bring the index in line with the segment files: rescan segments whose
+    size differs from the recorded one (or that aren't listed) and drop
+    entries whose file is gone. Returns the names that changed.
+    """
+    on_disk = {os.path.basename(p): os.path.getsize(p)
+               for p in glob.glob(os.path.join(ARCHIVE_DIR, segment_name('*')))}
+    changed = []
+    for name, size in sorted(on_disk.items()):
+        if index['segments'].get(name, {}).get('bytes') != size:
+            index['segments'][name] = scan_segment(name)
+            changed.append(name)
+    for name in set(index['segments']) - set(on_disk):
+        del index['segments'][name]
+        changed.append(name)
+    return changed
+
+def current_index():
+    """load_index(), repaired by refresh_index() and saved if it was stale"""
+    index = load_index()
+    if refresh_index(index):
+        save_index(index)
+    return index
+
+def append_jobs(jobs, when=None, imported_from=None):
+    """
+    Append jobs to the segment for `when` (default now) and update the index
+    Each gzip append adds a new member, which readers stream through transparently.
+    imported_from names a legacy file, recorded in the same index update.
+    """
+    if not jobs and not imported_from:
+        return
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    index = load_index()
+    refresh_index(index)
+    if jobs:
+        when = when or datetime.now()
+        day = when.strftime('%Y-%m-%d')
+        archived_at = when.isoformat(timespec='seconds')
+        name = segment_name(day)
+        path = os.path.join(ARCHIVE_DIR, name)
+        entry = index['segments'].setdefault(name, _new_entry(day))
+
+        with gzip.open(path, 'at', encoding='utf-8') as f:
+            for job in jobs:
+                record = dict(job)
+                record.setdefault('archived_at', archived_at)
+                f.write(json.dumps(record, separators=(',', ':')) + '\n')
+                _count_job(entry, job)
+        entry['bytes'] = os.path.getsize(path)
+
+    if imported_from:
+        index.setdefault('migrated', []).append(imported_from)
+    save_index(index)
+
+def select_segments(index, since=None, until=None, source=None, agency=None):
+    """Names of segments whose date range and index entries could match"""
+    agency = agency.lower() if agency else None
+    names = []
+    for name, entry in sorted(index['segments'].items()):
+        if since and entry['date'] < since:
+            continue
+        if until and entry['date'] > until:
+            continue
+        if source and source not in entry['sources']:
+            continue
+        if agency and not any(agency in a for a in entry['agencies']):
+            continue
+        names.append(name)
+    return names
+
+def query(since=None, until=None, source=None, agency=None, title=None,
+          min_salary=None, min_grade=None):
+    """
+    Yield archived jobs matching every given filter
+    since/until are YYYY-MM-DD archive dates (inclusive); agency and title
+    are case-insensitive substrings; source is an exact match; min_salary
+    is a yearly amount and min_grade a GS grade (jobs without the field
+    never match)
+    """
+    index = current_index()
+    agency = agency.lower() if agency else None
+    title = title.lower() if title else None
+
+    for name in select_segments(index, since, until, source, agency):
+        with gzip.open(os.path.join(ARCHIVE_DIR, name), 'rt', encoding='utf-8') as f:
+            for line in f:
+                job = Job.from_dict(json.loads(line))
+                if source and job.get('source') != source:
+                    continue
+                if agency and agency not in (job.get('agency') or '').lower():
+                    continue
+                if title and title not in (job.get('title') or '').lower():
+                    continue
+                if min_salary is not None or min_grade is not None:
+                    # Segments archived before salary parsing lack the fields
+                    add_salary_fields(job)
+                    salary, grade = annual_salary(job), job.get('gs_grade')
+                    if min_salary is not None and (salary is None or salary < min_salary):
+                        continue
+                    if min_grade is not None and (grade is None or grade < min_grade):
+                        continue
+                yield job
+
+def migrate_legacy(remove=False):
+    """
+    Import per-run data/jobs_archive_<timestamp>.json files into segments,
+    dated by the timestamp in the filename. Files already imported (listed
+    in the index) are skipped, so running it again adds nothing.
+    Returns (files, jobs) imported.
+    """
+    migrated = set(current_index().get('migrated', []))
+    files = 0
+    total = 0
+    for path in sorted(glob.glob(LEGACY_PATTERN)):
+        name = os.path.basename(path)
+        if name in migrated:
+            if remove:
+                os.remove(path)
+            continue
+        stamp = name[len('jobs_archive_'):-len('.json')]
+        try:
+            when = datetime.strptime(stamp, '%Y%m%d_%H%M%S')
+            with open(path, 'r') as f:
+                jobs = json.load(f)
+        except (ValueError, OSError) as e:
+            print(f"   ⚠ Skipping {path}: {e}")
+            continue
+        append_jobs(jobs, when, imported_from=name)
+        files += 1
+        total += len(jobs)
+        if remove:
+            os.remove(path)
+    return files, total
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Query the segmented job archive')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    q = commands.add_parser('query', help='stream matching jobs as JSON lines')
+    q.add_argument('--since', help='first archive date, YYYY-MM-DD')
+    q.add_argument('--until', help='last archive date, YYYY-MM-DD')
+    q.add_argument('--source', help='exact source name, e.g. USAJobs')
+    q.add_argument('--agency', help='agency substring (case-insensitive)')
+    q.add_argument('--title', help='title substring (case-insensitive)')
+    q.add_argument('--min-salary', type=int, help='minimum yearly salary (top of range), e.g. 120000')
+    q.add_argument('--min-grade', type=int, help='minimum GS grade, e.g. 13')
+    q.add_argument('--count', action='store_true', help='print only the number of matches')
+
+    m = commands.add_parser('migrate', help='import old per-run jobs_archive_*.json files')
+    m.add_argument('--remove', action='store_true', help='delete each file after importing it')
+
+    commands.add_parser('stats', help='summarize segments from the index')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'query':
+        matches = query(args.since, args.until, args.source, args.agency, args.title,
+                        args.min_salary, args.min_grade)
+        if args.count:
+            print(sum(1 for _ in matches))
+        else:
+            for job in matches:
+                sys.stdout.write(json.dumps(job.to_dict()) + '\n')
+
+    elif args.command == 'migrate':
+        files, jobs = migrate_legacy(args.remove)
+        print(f"✓ Imported {jobs} jobs from {files} archive files")
+
+    elif args.command == 'stats':
+        segments = current_index()['segments']
+        print(f"{len(segments)} segments, {sum(e['count'] for e in segments.values())} jobs")
+        for name, entry in sorted(segments.items()):
+            sources = ', '.join(f"{s}: {n}" for s, n in sorted(entry['sources'].items()))
+            print(f"  {entry['date']}  {entry['count']:>6} jobs  ({sources})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Job Records
+One compact type for a job posting, shared by the scanners, the main
+pipeline and the archive. A Job stores its fields in __slots__ instead of
+a per-posting dict, and interns the short values that repeat across
+thousands of postings (source, agency, location, placeholders such as
+'See posting'), so a full archive or a large backfill held in memory
+costs far less than the equivalent list of dicts.
+
+Jobs behave like the dicts they replace - job['title'], job.get('salary'),
+'gs_grade' in job, job['priority'] = 'High', dict(job) - so code written
+against dicts keeps working, and plain dicts are still accepted wherever
+a job is expected. A field that was never set is absent, as with a dict.
+
+JSON files are unchanged: to_dict()/from_dict() convert both ways, and
+json_default lets json.dump write Jobs directly:
+
+    json.dump(jobs, f, default=json_default)
+"""
+
+import sys
+from collections.abc import MutableMapping
+
+USAJOBS = sys.intern('USAJobs')
+LINKEDIN = sys.intern('LinkedIn')
+INDEED = sys.intern('Indeed')
+
+# Known fields, in the order they are written out
+FIELDS = (
+    'id', 'title', 'agency', 'location', 'url', 'salary',
+    'salary_min', 'salary_max', 'salary_period', 'gs_grade',
+    'posted', 'closes', 'grade', 'description', 'source',
+    'priority', 'type', 'duplicate_ids', 'archived_at',
+)
+_FIELD_SET = frozenset(FIELDS)
+
+# Fields whose values repeat across postings; their strings are interned
+# so every job shares one copy. Unique values (id, url, description) are not.
+INTERNED_FIELDS = frozenset((
+    'title', 'agency', 'location', 'salary', 'salary_period', 'posted',
+    'closes', 'grade', 'source', 'priority', 'type',
+))
+
+_intern = sys.intern
+
+
+class Job(MutableMapping):
+    """A job posting with dict-style access. Unknown keys go to `extra`."""
+
+    __slots__ = FIELDS + ('extra',)
+
+    def __init__(self, fields=None, **kwargs):
+        for source in (fields, kwargs):
+            if source:
+                for key, value in source.items():
+                    self[key] = value
+
+    @classmethod
+    def from_dict(cls, data):
+        """A Job from a dict (e.g. a JSON record); a Job is returned as is"""
+        return data if isinstance(data, cls) else cls(data)
+
+    def to_dict(self):
+        """The job as a plain dict with keys in FIELDS order, extras last"""
+        data = {}
+        for key in FIELDS:
+            try:
+                data[key] = getattr(self, key)
+            except AttributeError:
+                pass
+        try:
+            data.update(self.extra)
+        except AttributeError:
+            pass
+        return data
+
+    def copy(self):
+        return Job(self.to_dict())
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        try:
+            return self.extra[key]
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key in _FIELD_SET:
+            if key in INTERNED_FIELDS and type(value) is str:
+                value = _intern(value)
+            setattr(self, key, value)
+            return
+        try:
+            self.extra[key] = value
+        except AttributeError:
+            self.extra = {key: value}
+
+    def __delitem__(self, key):
+        if key in _FIELD_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            return
+        try:
+            del self.extra[key]
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        if key in _FIELD_SET:
+            return hasattr(self, key)
+        try:
+            return key in self.extra
+        except AttributeError:
+            return False
+
+    def get(self, key, default=None):
+        # Overridden for speed; the pipeline calls this constantly
+        if key in _FIELD_SET:
+            return getattr(self, key, default)
+        try:
+            return self.extra.get(key, default)
+        except AttributeError:
+            return default
+
+    def __iter__(self):
+        # Same order as to_dict(), without building it
+        for key in FIELDS:
+            if hasattr(self, key):
+                yield key
+        try:
+            yield from self.extra
+        except AttributeError:
+            pass
+
+    def __len__(self):
+        count = sum(1 for key in FIELDS if hasattr(self, key))
+        try:
+            return count + len(self.extra)
+        except AttributeError:
+            return count
+
+    def __repr__(self):
+        return f"Job({self.to_dict()!r})"
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+
+def json_default(obj):
+    """json.dump default= hook that writes Jobs as their dicts"""
+    if isinstance(obj, Job):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def to_jobs(records):
+    """Jobs from an iterable of dicts (e.g. a loaded JSON list)"""
+    return [Job.from_dict(record) for record in records]
@@ -2,126 +2,282 @@
 """
 Grants Job Monitor - Main Orchestrator
 Scans USAJobs, Indeed, and LinkedIn for grants management opportunities
+
+    python main.py              # one scan, as the workflow runs it
+    python main.py --profile    # also write CPU/memory profiles per stage to data/profile/
 """
 
+import argparse
 import json
 import os
+import queue
+import threading
+import time
 from datetime import datetime
-from scan_usajobs import scan_usajobs
-# from scan_indeed import scan_indeed
+from scan_usajobs import scan_usajobs, load_watermarks, save_watermarks
+from scan_indeed import scan_indeed
 from scan_linkedin import scan_linkedin
-from notify import send_email_notification, send_discord_notification
+from notify import dispatch_notifications
+from seen_store import open_seen_store
+import job_archive
+import metrics
+import profiling
+from job_record import json_default
+import http_cache
+import http_client
+import dedup
+from scoring import score_jobs, rank_jobs
+from extraction import print_extraction_stats
+from rate_limit import print_limiter_stats
+
+# (name, emoji, scanner, enabled, default deadline in seconds)
+# Deadlines can be overridden with SCAN_DEADLINE_<NAME>, e.g. SCAN_DEADLINE_LINKEDIN=90
+SOURCES = [
+    ('USAJobs', '📋', scan_usajobs, True, 120),
+    ('Indeed', '🔎', scan_indeed, False, 150),
+    ('LinkedIn', '💼', scan_linkedin, True, 150),
+]
 
 def load_seen_jobs():
-    """Load previously seen job IDs from storage"""
-    try:
-        with open('data/seen_jobs.json', 'r') as f:
-            data = json.load(f)
-            return set(data.get('job_ids', []))
-    except FileNotFoundError:
-        return set()
-    except Exception as e:
-        print(f"Error loading seen jobs: {e}")
-        return set()
+    """Open the seen-job store (imports data/seen_jobs.json on first use)"""
+    return open_seen_store()
 
-def save_seen_jobs(seen_ids):
-    """Save job IDs to prevent duplicate notifications"""
+def save_seen_jobs(seen_ids, job_ids):
+    """Record job IDs to prevent duplicate notifications; returns True if saved"""
     try:
-        os.makedirs('data', exist_ok=True)
-        with open('data/seen_jobs.json', 'w') as f:
-            json.dump({
-                'job_ids': list(seen_ids),
-                'last_updated': datetime.now().isoformat()
-            }, f, indent=2)
+        seen_ids.record(job_ids)
     except Exception as e:
         print(f"Error saving seen jobs: {e}")
+        return False
+    return True
 
 def save_job_archive(all_jobs):
-    """Archive all found jobs for reference"""
+    """Archive all found jobs to today's compressed segment in data/archive/"""
     try:
-        os.makedirs('data', exist_ok=True)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        with open(f'data/jobs_archive_{timestamp}.json', 'w') as f:
-            json.dump(all_jobs, f, indent=2)
+        job_archive.append_jobs(all_jobs)
     except Exception as e:
         print(f"Error archiving jobs: {e}")
 
-def main():
+def get_source_deadline(name, default):
+    """Per-source wall-clock budget in seconds (SCAN_DEADLINE_<NAME> overrides)"""
+    value = os.getenv(f'SCAN_DEADLINE_{name.upper()}')
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        print(f"   ⚠ Ignoring invalid SCAN_DEADLINE_{name.upper()}={value!r}")
+        return default
+
+def dedupe_by_id(jobs):
+    """Keep the first job seen for each ID"""
+    seen = set()
+    unique = []
+    for job in jobs:
+        if job['id'] not in seen:
+            seen.add(job['id'])
+            unique.append(job)
+    return unique
+
+def run_scanners(sources=SOURCES, options=None):
+    """
+    Run every enabled scanner at the same time, each with its own deadline.
+    Results are merged in the order sources finish. A source that misses its
+    deadline contributes whatever it had collected so far and is reported as
+    partial. options maps a source name to extra keyword arguments for its
+    scanner. Returns (all_jobs, report) where report maps source name to
+    {'status': 'ok' | 'partial' | 'error', 'count': int, 'seconds': float}.
+    """
+    options = options or {}
+    finished = queue.Queue()
+    pending = {}
+    start = time.monotonic()
+    
+    for name, emoji, scanner, enabled, default_deadline in sources:
+        if not enabled:
+            continue
+        
+        seconds = get_source_deadline(name, default_deadline)
+        deadline = start + seconds
+        sink = []
+        scanner = profiling.wrap(scanner)
+        
+        def run(name=name, scanner=scanner, sink=sink, deadline=deadline):
+            try:
+                kwargs = options.get(name, {})
+                finished.put((name, scanner(results=sink, deadline=deadline, **kwargs), None))
+            except Exception as e:
+                finished.put((name, None, e))
+        
+        print(f"\n{emoji} Scanning {name} (deadline {seconds:.0f}s)...")
+        # Daemon threads so a hung source can never keep the process alive
+        threading.Thread(target=run, name=f'scan-{name}', daemon=True).start()
+        pending[name] = (deadline, sink)
+    
+    all_jobs = []
+    report = {}
+    
+    while pending:
+        next_deadline = min(deadline for deadline, _ in pending.values())
+        try:
+            name, results, error = finished.get(timeout=max(0, next_deadline - time.monotonic()))
+        except queue.Empty:
+            now = time.monotonic()
+            for name, (deadline, sink) in list(pending.items()):
+                if deadline > now:
+                    continue
+                del pending[name]
+                partial = dedupe_by_id(list(sink))
+                all_jobs.extend(partial)
+                report[name] = {'status': 'partial', 'count': len(partial), 'seconds': now - start}
+                print(f"   ⏱ {name} missed its deadline - keeping {len(partial)} partial results")
+            continue
+        
+        if name not in pending:
+            # Already reported as partial; a late finish is ignored
+            continue
+        deadline, _ = pending.pop(name)
+        now = time.monotonic()
+        elapsed = now - start
+        
+        if error is not None:
+            report[name] = {'status': 'error', 'count': 0, 'seconds': elapsed}
+            print(f"   ❌ {name} error: {error}")
+            continue
+        
+        all_jobs.extend(results)
+        # A scanner that returns after its deadline stopped early on its own
+        status = 'partial' if now >= deadline else 'ok'
+        report[name] = {'status': status, 'count': len(results), 'seconds': elapsed}
+        print(f"   {name} found: {len(results)} jobs ({elapsed:.1f}s){' - partial' if status == 'partial' else ''}")
+    
+    return all_jobs, report
+
+def scan_sources(options=None):
+    """
+    run_scanners() over SOURCES. Profiled runs scan one source at a time,
+    each as its own stage, so memory growth is not mixed between sources.
+    """
+    if not profiling.ENABLED:
+        return run_scanners(options=options)
+    all_jobs, report = [], {}
+    for source in SOURCES:
+        if not source[3]:
+            continue
+        with profiling.stage(f'scan:{source[0]}'):
+            jobs, source_report = run_scanners([source], options)
+        all_jobs.extend(jobs)
+        report.update(source_report)
+    return all_jobs, report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scan job boards for grants management openings')
+    parser.add_argument('--profile', action='store_true',
+                        help='profile each stage (cProfile + tracemalloc) into data/profile/')
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.enable()
+    
     print("=" * 60)
     print("🔍 GRANTS JOB MONITOR - Starting Scan")
     print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 60)
     
-    # Scan all platforms
-    all_jobs = []
-    
-    print("\n📋 Scanning USAJobs.gov...")
-    try:
-        usajobs_results = scan_usajobs()
-        all_jobs.extend(usajobs_results)
-        print(f"   Found: {len(usajobs_results)} jobs")
-    except Exception as e:
-        print(f"   ❌ USAJobs error: {e}")
+    with metrics.stage('load_seen'):
+        seen_ids = load_seen_jobs()
+    usajobs_watermarks = load_watermarks()
     
-#     print("\n🔎 Scanning Indeed...")
-#     try:
-#         indeed_results = scan_indeed()
-#         all_jobs.extend(indeed_results)
-#         print(f"   Found: {len(indeed_results)} jobs")
-#     except Exception as e:
-#         print(f"   ❌ Indeed error: {e}")
+    # Scan all platforms concurrently
+    with metrics.stage('scan'):
+        all_jobs, report = scan_sources(options={
+            'USAJobs': {'seen_ids': seen_ids, 'watermarks': usajobs_watermarks},
+        })
+    for name, r in report.items():
+        metrics.inc('stage_seconds', r['seconds'], stage=f'scan:{name}')
+        metrics.inc('jobs_total', r['count'], source=name, outcome='parsed')
     
-    print("\n💼 Scanning LinkedIn...")
-    try:
-        linkedin_results = scan_linkedin()
-        all_jobs.extend(linkedin_results)
-        print(f"   Found: {len(linkedin_results)} jobs")
-    except Exception as e:
-        print(f"   ❌ LinkedIn error: {e}")
+    partial = [name for name, r in report.items() if r['status'] == 'partial']
+    if partial:
+        print(f"\n⚠ Partial results from: {', '.join(partial)}")
     
     print(f"\n📊 Total jobs found: {len(all_jobs)}")
     
-    # Filter for new jobs
-    seen_ids = load_seen_jobs()
-    new_jobs = [j for j in all_jobs if j['id'] not in seen_ids]
+    # Filter for new jobs, one per cluster of cross-source near-duplicates
+    with metrics.stage('filter_seen'), profiling.stage('filter_seen'):
+        new_ids = seen_ids.filter_new(j['id'] for j in all_jobs)
+    with metrics.stage('dedup'), profiling.stage('dedup'):
+        new_jobs = dedup.select_new_jobs(all_jobs, new_ids)
+    
+    # Priority and type once, for notifications, the archive and Notion
+    with metrics.stage('score'), profiling.stage('score'):
+        new_jobs = rank_jobs(score_jobs(new_jobs))
     
+    if metrics.ENABLED:
+        new_counts = {}
+        for job in new_jobs:
+            new_counts[job['source']] = new_counts.get(job['source'], 0) + 1
+        for name, r in report.items():
+            source_new = sum(1 for j in all_jobs if j['source'] == name and j['id'] in new_ids)
+            metrics.inc('jobs_total', r['count'] - source_new, source=name, outcome='seen')
+            metrics.inc('jobs_total', source_new - new_counts.get(name, 0), source=name, outcome='duplicate')
+            metrics.inc('jobs_total', new_counts.get(name, 0), source=name, outcome='new')
+    
+    notifications = None
     if new_jobs:
         print(f"✨ NEW JOBS: {len(new_jobs)}")
         print("\nNew opportunities:")
         for job in new_jobs[:5]:  # Show first 5
-            print(f"  • {job['title']} at {job['agency']}")
+            print(f"  • [{job['priority']}] {job['title']} at {job['agency']}")
         if len(new_jobs) > 5:
             print(f"  ... and {len(new_jobs) - 5} more")
         
-        # Send notifications
+        # Send notifications in the background while the run's data is saved
         print("\n📧 Sending notifications...")
-        try:
-            send_email_notification(new_jobs)
-            print("   ✓ Email sent")
-        except Exception as e:
-            print(f"   ⚠ Email failed: {e}")
-        
-        try:
-            send_discord_notification(new_jobs)
-            print("   ✓ Discord sent")
-        except Exception as e:
-            print(f"   ⚠ Discord skipped (webhook not configured)")
-        
-        # Update seen jobs
-        new_ids = {j['id'] for j in new_jobs}
-        seen_ids.update(new_ids)
-        save_seen_jobs(seen_ids)
+        with profiling.stage('notify'):
+            notifications = dispatch_notifications(new_jobs)
+            if profiling.ENABLED:
+                # Wait inside the stage so the sends' allocations are not
+                # counted towards the archive
+                notifications.wait()
         
         # Archive results
-        save_job_archive(new_jobs)
+        with metrics.stage('archive'), profiling.stage('archive'):
+            save_job_archive(new_jobs)
 
-        # Save for Notion integration
-        with open('jobs_output.json', 'w') as f:
-            json.dump(new_jobs, f, indent=2)
+            # Save for Notion integration
+            with open('jobs_output.json', 'w') as f:
+                json.dump(new_jobs, f, indent=2, default=json_default)
 
     else:
                 print("✓ No new jobs this scan (all previously seen)")
     
+    # Insert new IDs and bump last-seen on the rest in one transaction
+    with metrics.stage('save_seen'), profiling.stage('save_seen'):
+        saved = save_seen_jobs(seen_ids, [j['id'] for j in all_jobs])
+    # Only now is everything below the new watermarks recorded; a partial
+    # scan may have advanced a term past jobs that never reached all_jobs
+    if saved and report.get('USAJobs', {}).get('status') == 'ok':
+        save_watermarks(usajobs_watermarks)
+    seen_ids.print_bloom_report()
+    seen_ids.close()
+    
+    if notifications is not None:
+        # Only the time spent waiting here; sends overlap the steps above
+        with metrics.stage('notify_wait'):
+            notifications.print_report()
+    
+    http_client.print_connection_stats()
+    http_cache.print_cache_stats()
+    print_extraction_stats()
+    print_limiter_stats()
+    dedup.print_dedup_stats()
+    
+    if metrics.write('scan'):
+        print("\n📈 Metrics written to data/metrics.json and data/metrics.prom")
+    profile = profiling.write('scan')
+    if profile:
+        print(f"🔬 Profile written to {profile[0]} and {profile[1]}")
+    
     print("\n" + "=" * 60)
     print("✅ Scan complete")
     print("=" * 60)
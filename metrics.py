@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Run Metrics
+Counters, latency histograms and stage timings for one run, written at
+the end as JSON and Prometheus text format:
+
+    data/metrics.json, data/metrics.prom                 main.py
+    data/notion_metrics.json, data/notion_metrics.prom   scripts/push_to_notion.py
+
+What is recorded (names are prefixed grants_monitor_ in the .prom file):
+    stage_seconds{stage}                        wall time per pipeline stage
+    http_requests_total{host,status}            requests sent (status 'error' = no response)
+    http_request_duration_seconds{host}         latency histogram
+    http_response_bytes_total{host}             response body bytes received
+    sleep_seconds_total{reason,host}            time spent sleeping (rate limits, retries)
+    parse_seconds_total{source}                 time spent parsing responses
+    jobs_total{source,outcome}                  jobs parsed / new / duplicate / skipped
+    notion_pages_total{outcome}                 Notion pages created / skipped / failed
+    notifications_total{channel,status}         notification sends
+    notification_duration_seconds{channel}      send latency histogram
+
+Set METRICS=0 to turn recording and the files off. Every recording call
+then returns on its first line, so instrumented code costs a function
+call and nothing else.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+ENABLED = os.getenv('METRICS', '1') != '0'
+
+PREFIX = 'grants_monitor_'
+
+# Histogram upper bounds in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HELP = {
+    'stage_seconds': 'Wall time spent in each pipeline stage',
+    'http_requests_total': 'HTTP requests sent, by host and response status',
+    'http_request_duration_seconds': 'HTTP request latency',
+    'http_response_bytes_total': 'HTTP response body bytes received',
+    'sleep_seconds_total': 'Time spent sleeping for rate limits and retries',
+    'parse_seconds_total': 'Time spent parsing search responses',
+    'jobs_total': 'Jobs by source and outcome',
+    'notion_pages_total': 'Notion pages by outcome',
+    'notifications_total': 'Notification sends by channel and status',
+    'notification_duration_seconds': 'Notification send latency',
+}
+
+# Metrics reported as gauges rather than counters
+GAUGES = {'stage_seconds'}
+
+_counters = {}
+_histograms = {}
+_lock = threading.Lock()
+_started = time.time()
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+def inc(name, value=1, **labels):
+    """Add value to a counter"""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def observe(name, value, **labels):
+    """Record one value (seconds) in a histogram"""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        counts = _histograms.get(key)
+        if counts is None:
+            # One slot per bucket, one for +Inf, then the running sum
+            counts = _histograms[key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+        counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        counts[-1] += value
+
+class _Stage:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        inc('stage_seconds', time.perf_counter() - self.start, stage=self.name)
+        return False
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NO_STAGE = _NoStage()
+
+def stage(name):
+    """Context manager adding the block's wall time to stage_seconds{stage=name}"""
+    return _Stage(name) if ENABLED else _NO_STAGE
+
+def reset():
+    global _started
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        _started = time.time()
+
+def snapshot():
+    """Everything recorded so far as plain data"""
+    with _lock:
+        counters = [
+            {'name': name, 'labels': dict(labels), 'value': value}
+            for (name, labels), value in sorted(_counters.items())
+        ]
+        histograms = []
+        for (name, labels), counts in sorted(_histograms.items()):
+            cumulative, buckets = 0, {}
+            for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), counts):
+                cumulative += count
+                buckets['+Inf' if bound == float('inf') else f'{bound:g}'] = cumulative
+            histograms.append({'name': name, 'labels': dict(labels), 'buckets': buckets,
+                               'sum': counts[-1], 'count': cumulative})
+    return {'counters': counters, 'histograms': histograms}
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+def prometheus_text(job, data):
+    """Prometheus text exposition format for a snapshot()"""
+    lines = []
+    described = set()
+
+    def describe(name, kind):
+        if name not in described:
+            described.add(name)
+            lines.append(f'# HELP {PREFIX}{name} {HELP.get(name, name)}')
+            lines.append(f'# TYPE {PREFIX}{name} {kind}')
+
+    for c in data['counters']:
+        describe(c['name'], 'gauge' if c['name'] in GAUGES else 'counter')
+        lines.append(f"{PREFIX}{c['name']}{_labels(dict(c['labels'], job=job))} {c['value']:g}")
+    for h in data['histograms']:
+        describe(h['name'], 'histogram')
+        labels = dict(h['labels'], job=job)
+        for bound, count in h['buckets'].items():
+            lines.append(f"{PREFIX}{h['name']}_bucket{_labels(dict(labels, le=bound))} {count}")
+        lines.append(f"{PREFIX}{h['name']}_sum{_labels(labels)} {h['sum']:g}")
+        lines.append(f"{PREFIX}{h['name']}_count{_labels(labels)} {h['count']}")
+    return '\n'.join(lines) + '\n'
+
+def write(job, base='data/metrics'):
+    """Write <base>.json and <base>.prom; returns the paths, or None when disabled"""
+    if not ENABLED:
+        return None
+    data = snapshot()
+    finished = time.time()
+    os.makedirs(os.path.dirname(base) or '.', exist_ok=True)
+    with open(f'{base}.json', 'w') as f:
+        json.dump({
+            'job': job,
+            'started': datetime.fromtimestamp(_started).isoformat(timespec='seconds'),
+            'finished': datetime.fromtimestamp(finished).isoformat(timespec='seconds'),
+            'duration_seconds': finished - _started,
+            **data,
+        }, f, indent=2)
+    with open(f'{base}.prom', 'w') as f:
+        f.write(prometheus_text(job, data))
+    return f'{base}.json', f'{base}.prom'
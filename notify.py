@@ -2,32 +2,85 @@
 """
 Notification Handler
 Sends job alerts via email (Gmail) or Discord webhook
+
+dispatch_notifications() sends to every configured channel at once on
+background threads, so the caller can keep working (archive, seen store)
+and collect per-channel latency and failures afterwards. All email in a
+run goes through one authenticated SMTP session.
+
+SMTP_HOST / SMTP_PORT point email at another server (default Gmail,
+smtp.gmail.com:465); SMTP_SSL=0 uses a plain connection, e.g. for the
+stand-in server in benchmarks/load_harness.py.
 """
 
 import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
-import requests
+import discord_webhook
+import metrics
+import profiling
 
-def send_email_notification(new_jobs):
+SMTP_HOST = os.getenv('SMTP_HOST', 'smtp.gmail.com')
+SMTP_PORT = int(os.getenv('SMTP_PORT', 465))
+SMTP_SSL = os.getenv('SMTP_SSL', '1') != '0'
+
+class SMTPSession:
     """
-    Send HTML email via Gmail SMTP
-    Requires Gmail App Password (not regular password)
-    Setup: https://myaccount.google.com/apppasswords
+    One SMTP connection (SSL unless SMTP_SSL=0), logged in on first use and reused for every
+    message until close(). A connection the server dropped is reopened once.
     """
+
+    def __init__(self, user, password, host=SMTP_HOST, port=SMTP_PORT, use_ssl=SMTP_SSL):
+        self.user = user
+        self.password = password
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.logins = 0
+        self.sent = 0
+        self._server = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        connect = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        server = connect(self.host, self.port, timeout=30)
+        server.login(self.user, self.password)
+        self.logins += 1
+        self._server = server
+
+    def send(self, msg):
+        with self._lock:
+            if self._server is None:
+                self._connect()
+            try:
+                self._server.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                self._connect()
+                self._server.send_message(msg)
+            self.sent += 1
+
+    def close(self):
+        with self._lock:
+            if self._server is not None:
+                try:
+                    self._server.quit()
+                except smtplib.SMTPException:
+                    pass
+                self._server = None
+
+def email_configured():
+    return all([os.getenv('GMAIL_USER'), os.getenv('GMAIL_APP_PASSWORD'), os.getenv('NOTIFY_EMAIL')])
+
+def discord_configured():
+    return bool(os.getenv('DISCORD_WEBHOOK'))
+
+def build_email_html(new_jobs):
+    """HTML body of the alert email"""
     
-    sender = os.getenv('GMAIL_USER')
-    password = os.getenv('GMAIL_APP_PASSWORD')
-    recipient = os.getenv('NOTIFY_EMAIL')
-    
-    if not all([sender, password, recipient]):
-        print("   ⚠ Email credentials not configured")
-        return
-    
-    subject = f"🎯 {len(new_jobs)} New Grants Jobs Found"
-    
-    # Build HTML email
     html = f"""
     <html>
     <head>
@@ -68,7 +121,8 @@ def send_email_notification(new_jobs):
                     <strong>{job['agency']}</strong><br>
                     📍 {job['location']}<br>
                     💰 {job['salary']}<br>
-                    📅 Posted: {job.get('posted', 'Recently')}
+                    📅 Posted: {job.get('posted', 'Recently')}<br>
+                    ⭐ Priority: {job.get('priority', 'Unscored')} • {job.get('type', 'Federal General')}
                 </p>
                 <a href="{job['url']}" class="job-link">View Job →</a>
             </div>
@@ -85,29 +139,57 @@ def send_email_notification(new_jobs):
     </body>
     </html>
     """
+    return html
+
+def send_email_notification(new_jobs, session=None):
+    """
+    Send HTML email via Gmail SMTP
+    Requires Gmail App Password (not regular password)
+    Setup: https://myaccount.google.com/apppasswords
+
+    NOTIFY_EMAIL may list several addresses separated by commas; each gets
+    its own message over the same SMTP session. Pass `session` to reuse a
+    session across calls; otherwise one is opened and closed here.
+    """
+    
+    sender = os.getenv('GMAIL_USER')
+    password = os.getenv('GMAIL_APP_PASSWORD')
+    recipient = os.getenv('NOTIFY_EMAIL')
+    
+    if not all([sender, password, recipient]):
+        print("   ⚠ Email credentials not configured")
+        return
     
-    # Create message
-    msg = MIMEMultipart('alternative')
-    msg['Subject'] = subject
-    msg['From'] = sender
-    msg['To'] = recipient
+    subject = f"🎯 {len(new_jobs)} New Grants Jobs Found"
+    html = build_email_html(new_jobs)
+    recipients = [r.strip() for r in recipient.split(',') if r.strip()]
     
-    msg.attach(MIMEText(html, 'html'))
+    own_session = session is None
+    if own_session:
+        session = SMTPSession(sender, password)
     
     # Send email
     try:
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as server:
-            server.login(sender, password)
-            server.send_message(msg)
-        print(f"   ✓ Email sent to {recipient}")
+        for address in recipients:
+            msg = MIMEMultipart('alternative')
+            msg['Subject'] = subject
+            msg['From'] = sender
+            msg['To'] = address
+            msg.attach(MIMEText(html, 'html'))
+            session.send(msg)
+        print(f"   ✓ Email sent to {', '.join(recipients)}")
     except Exception as e:
         print(f"   ❌ Email error: {e}")
         raise
+    finally:
+        if own_session:
+            session.close()
 
 def send_discord_notification(new_jobs):
     """
     Send notification to Discord webhook
     Setup: Server Settings → Integrations → Webhooks → New Webhook
+    Jobs go out as embeds, 10 per message, paced by the webhook's rate limit
     """
     
     webhook_url = os.getenv('DISCORD_WEBHOOK')
@@ -116,41 +198,75 @@ def send_discord_notification(new_jobs):
         # Not an error - Discord is optional
         return
     
-    # Discord has 2000 char limit per message, so we'll split if needed
-    chunks = []
-    current_chunk = f"**🎯 {len(new_jobs)} New Grants Jobs Found**\n\n"
+    sent, failed, stats = discord_webhook.send_jobs(
+        webhook_url, new_jobs, heading=f"**🎯 {len(new_jobs)} New Grants Jobs Found**"
+    )
     
-    for job in new_jobs[:20]:  # Limit to 20 jobs
-        job_text = f"**{job['title']}**\n"
-        job_text += f"{job['agency']} | {job['location']}\n"
-        job_text += f"💰 {job['salary']} | 📅 {job.get('posted', 'Recently')}\n"
-        job_text += f"{job['url']}\n\n"
-        
-        # Check if adding this job would exceed limit
-        if len(current_chunk) + len(job_text) > 1900:
-            chunks.append(current_chunk)
-            current_chunk = job_text
+    if stats['rate_limited'] or stats['waited']:
+        print(f"   🚦 Discord: waited {stats['waited']:.1f}s for rate limits "
+              f"({stats['rate_limited']} 429 responses)")
+    if failed:
+        raise RuntimeError(f"{failed} of {sent + failed} Discord messages failed")
+    print(f"   ✓ Discord notification sent ({len(new_jobs)} jobs in {sent} messages)")
+
+class NotificationDispatch:
+    """
+    Notifications in flight: each configured channel sends on its own
+    thread. wait() blocks until all are done and returns, per channel,
+    {'status': 'sent' | 'failed', 'seconds': latency, 'error': message}.
+    """
+
+    def __init__(self, new_jobs):
+        self.smtp = None
+        channels = []
+        if email_configured():
+            self.smtp = SMTPSession(os.getenv('GMAIL_USER'), os.getenv('GMAIL_APP_PASSWORD'))
+            channels.append(('Email', lambda jobs: send_email_notification(jobs, session=self.smtp)))
+        if discord_configured():
+            channels.append(('Discord', send_discord_notification))
+
+        self.results = {}
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(channels)), thread_name_prefix='notify')
+        self._futures = {
+            name: self._pool.submit(profiling.wrap(self._send), name, send, new_jobs)
+            for name, send in channels
+        }
+
+    @staticmethod
+    def _send(name, send, new_jobs):
+        start = time.perf_counter()
+        try:
+            send(new_jobs)
+        except Exception as e:
+            result = {'status': 'failed', 'seconds': time.perf_counter() - start, 'error': str(e)}
         else:
-            current_chunk += job_text
-    
-    if current_chunk:
-        chunks.append(current_chunk)
-    
-    # Send each chunk
-    try:
-        for chunk in chunks:
-            response = requests.post(
-                webhook_url,
-                json={'content': chunk},
-                timeout=10
-            )
-            if response.status_code != 204:
-                print(f"   ⚠ Discord returned {response.status_code}")
-        
-        print(f"   ✓ Discord notification sent")
-        
-    except Exception as e:
-        print(f"   ⚠ Discord error: {e}")
+            result = {'status': 'sent', 'seconds': time.perf_counter() - start, 'error': None}
+        metrics.inc('notifications_total', channel=name, status=result['status'])
+        metrics.observe('notification_duration_seconds', result['seconds'], channel=name)
+        return result
+
+    def wait(self):
+        for name, future in self._futures.items():
+            self.results[name] = future.result()
+        self._pool.shutdown()
+        if self.smtp is not None:
+            self.smtp.close()
+        return self.results
+
+    def print_report(self):
+        results = self.wait()
+        print("\n📨 Notifications:")
+        if not results:
+            print("   ⚠ No notification channels configured")
+        for name, r in results.items():
+            if r['status'] == 'sent':
+                print(f"   ✓ {name}: sent in {r['seconds']:.2f}s")
+            else:
+                print(f"   ❌ {name}: failed after {r['seconds']:.2f}s - {r['error']}")
+
+def dispatch_notifications(new_jobs):
+    """Start sending to every configured channel and return without waiting"""
+    return NotificationDispatch(new_jobs)
 
 if __name__ == '__main__':
     # Test notification with dummy job
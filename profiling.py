@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Stage Profiling
+CPU and memory profiles per pipeline stage, for runs started with
+--profile (main.py, scripts/push_to_notion.py). Each stage runs under
+cProfile with a tracemalloc snapshot taken on the way in and out; work a
+stage hands to worker threads is profiled through wrap() and counted
+towards the stage that submitted it. At the end of the run write() leaves:
+
+    data/profile/<job>_report.txt   per stage: wall time, peak traced memory,
+                                    top functions by cumulative time and
+                                    top allocation sites (net growth)
+    data/profile/<job>.pstats       every stage combined, for pstats/snakeviz
+
+    python -m pstats data/profile/scan.pstats
+
+Tracing every allocation slows a stage several times over, so compare
+stages within one report rather than against normal runs. Stages do not
+nest (cProfile allows one profiler per thread). Profiling is
+off unless enable() is called: stage() then returns a shared no-op and
+wrap() returns the function it was given, so there is nothing to pay.
+"""
+
+import cProfile
+import contextvars
+import functools
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+ENABLED = False
+
+# Functions and allocation sites listed per stage
+TOP = 25
+
+# Frames kept per allocation. The report only uses the innermost one, and
+# each extra frame makes allocation-heavy stages (MinHash) markedly slower
+TRACE_FRAMES = 1
+
+_stages = []
+_current = contextvars.ContextVar('profiling_stage', default=None)
+_thread = threading.local()
+
+# Allocations made by the profilers themselves
+_IGNORE = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, cProfile.__file__),
+    tracemalloc.Filter(False, pstats.__file__),
+    tracemalloc.Filter(False, __file__),
+)
+
+def enable():
+    """Turn profiling on for the rest of the process"""
+    global ENABLED
+    ENABLED = True
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACE_FRAMES)
+
+def _snapshot():
+    return tracemalloc.take_snapshot().filter_traces(_IGNORE)
+
+class _Stage:
+    def __init__(self, name):
+        self.name = name
+        self.profiles = []
+        self.seconds = 0.0
+        self.peak = 0
+        self.allocations = []
+        self._lock = threading.Lock()
+
+    def add(self, profile):
+        with self._lock:
+            self.profiles.append(profile)
+
+    def __enter__(self):
+        if getattr(_thread, 'active', False):
+            raise RuntimeError(f"profiling stage {self.name!r} started inside another stage")
+        self._token = _current.set(self)
+        self._before = _snapshot()
+        tracemalloc.reset_peak()
+        self._profile = cProfile.Profile()
+        self._start = time.perf_counter()
+        _thread.active = True
+        self._profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self._profile.disable()
+        _thread.active = False
+        self.seconds = time.perf_counter() - self._start
+        self.peak = tracemalloc.get_traced_memory()[1]
+        _current.reset(self._token)
+        self.add(self._profile)
+        diffs = _snapshot().compare_to(self._before, 'lineno')
+        self.allocations = sorted((d for d in diffs if d.size_diff > 0),
+                                  key=lambda d: d.size_diff, reverse=True)[:TOP]
+        del self._before
+        _stages.append(self)
+        return False
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NO_STAGE = _NoStage()
+
+def stage(name):
+    """Context manager profiling the block (and work it wraps) as one stage"""
+    return _Stage(name) if ENABLED else _NO_STAGE
+
+def wrap(fn):
+    """
+    fn, profiled into the current stage wherever it runs - for callables
+    handed to threads or pools. Returns fn itself outside a stage.
+    """
+    stage = _current.get() if ENABLED else None
+    if stage is None:
+        return fn
+
+    @functools.wraps(fn)
+    def profiled(*args, **kwargs):
+        if getattr(_thread, 'active', False):
+            # Called on a thread that is already being profiled
+            return fn(*args, **kwargs)
+        token = _current.set(stage)
+        profile = cProfile.Profile()
+        _thread.active = True
+        profile.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
+            _thread.active = False
+            _current.reset(token)
+            stage.add(profile)
+
+    return profiled
+
+def _size(size):
+    if size >= 1024 * 1024:
+        return f"{size / 1024 / 1024:.1f} MB"
+    return f"{size / 1024:.1f} KB"
+
+def report(stages=None):
+    """The per-stage report as text"""
+    stages = _stages if stages is None else stages
+    out = io.StringIO()
+    for s in stages:
+        out.write(f"{'=' * 78}\n{s.name}: {s.seconds:.2f}s wall, peak traced memory {_size(s.peak)}, "
+                  f"{len(s.profiles) - 1} call(s) on worker threads\n{'=' * 78}\n")
+        out.write("\nTop functions by cumulative time:\n")
+        stats = pstats.Stats(*s.profiles, stream=out)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP)
+        out.write("Top allocation sites (net growth during the stage):\n")
+        if not s.allocations:
+            out.write("   (none)\n")
+        for diff in s.allocations:
+            frame = diff.traceback[0]
+            out.write(f"   {_size(diff.size_diff):>9}  {diff.count_diff:>+8} blocks  "
+                      f"{frame.filename}:{frame.lineno}\n")
+        out.write("\n")
+    return out.getvalue()
+
+def write(job, directory='data/profile'):
+    """Write <job>_report.txt and <job>.pstats; returns the paths, or None when disabled"""
+    if not ENABLED or not _stages:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    report_path = os.path.join(directory, f'{job}_report.txt')
+    stats_path = os.path.join(directory, f'{job}.pstats')
+    with open(report_path, 'w') as f:
+        f.write(report())
+    pstats.Stats(*(p for s in _stages for p in s.profiles)).dump_stats(stats_path)
+    return report_path, stats_path
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Per-Host Rate Limiter
+A token bucket per host, used by http_client for every request. Each
+bucket allows a short burst and then refills at the host's rate. Throttling
+responses (429, LinkedIn's 999) halve the rate, a Retry-After header
+pauses the host until it expires, and successful responses slowly win the
+rate back. Hosts not listed in HOST_LIMITS are not limited.
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import metrics
+
+# host: (requests per second, burst size)
+HOST_LIMITS = {
+    'www.linkedin.com': (0.5, 3),
+    'www.indeed.com': (0.5, 3),
+    'data.usajobs.gov': (5.0, 6),
+    # Notion allows an average of 3 requests/second per integration
+    'api.notion.com': (3.0, 3),
+}
+
+# Status codes that mean "slow down"
+THROTTLE_STATUSES = {429, 999}
+
+# Never slow a host below this fraction of its configured rate
+MIN_RATE_FACTOR = 1 / 16
+
+# Rate regained per successful response, as a fraction of the configured rate
+RECOVERY_STEP = 0.1
+
+# Cap on how long a single Retry-After is honored
+MAX_RETRY_AFTER = 300
+
+def parse_retry_after(value):
+    """Retry-After as seconds (accepts delta-seconds or an HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """Token bucket with AIMD rate adjustment and Retry-After pauses"""
+
+    def __init__(self, rate, burst):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+        # waited: all time spent waiting; paused: the part of it caused by Retry-After
+        self.stats = {'requests': 0, 'waited': 0.0, 'paused': 0.0, 'max_wait': 0.0, 'throttled': 0,
+                      'waiting_requests': 0}
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Take a token and return how long the caller must sleep before sending"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            paced = max(0.0, -self.tokens / self.rate)
+            wait = max(paced, self.paused_until - now)
+            self.stats['requests'] += 1
+            self.stats['waited'] += wait
+            self.stats['paused'] += wait - paced
+            self.stats['max_wait'] = max(self.stats['max_wait'], wait)
+            if wait > 0:
+                self.stats['waiting_requests'] += 1
+            return wait
+
+    def observe(self, status_code, retry_after=None):
+        """Adapt to a response: back off on throttling, recover slowly otherwise"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if status_code in THROTTLE_STATUSES:
+                self.stats['throttled'] += 1
+                self.rate = max(self.base_rate * MIN_RATE_FACTOR, self.rate / 2)
+                # Drop queued burst capacity so the slowdown applies right away
+                self.tokens = min(self.tokens, 0.0)
+            elif status_code < 400:
+                self.rate = min(self.base_rate, self.rate + self.base_rate * RECOVERY_STEP)
+            if retry_after is not None:
+                self.paused_until = max(self.paused_until, now + min(retry_after, MAX_RETRY_AFTER))
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+def get_bucket(host):
+    """Bucket for a host, or None if the host is not rate limited"""
+    bucket = _buckets.get(host)
+    if bucket is None and host in HOST_LIMITS:
+        with _buckets_lock:
+            bucket = _buckets.get(host)
+            if bucket is None:
+                bucket = _buckets[host] = TokenBucket(*HOST_LIMITS[host])
+    return bucket
+
+def acquire(host):
+    """Block until a request to host may be sent; returns seconds waited"""
+    bucket = get_bucket(host)
+    if bucket is None:
+        return 0.0
+    wait = bucket.reserve()
+    if wait > 0:
+        metrics.inc('sleep_seconds_total', wait, reason='rate_limit', host=host)
+        time.sleep(wait)
+    return wait
+
+def observe(host, response):
+    """Feed a response back to the host's bucket"""
+    bucket = get_bucket(host)
+    if bucket is None:
+        return
+    retry_after = None
+    if response.status_code in THROTTLE_STATUSES or response.status_code == 503:
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+    bucket.observe(response.status_code, retry_after)
+
+def limiter_stats():
+    """Per-host counters: requests, waited, paused, max_wait, throttled, current rate"""
+    stats = {}
+    for host, bucket in list(_buckets.items()):
+        with bucket.lock:
+            stats[host] = dict(bucket.stats, rate=bucket.rate, base_rate=bucket.base_rate)
+    return stats
+
+def print_limiter_stats():
+    stats = limiter_stats()
+    if not stats:
+        return
+    print("\n🚦 Rate limiting:")
+    for host, s in sorted(stats.items()):
+        line = (f"   {host}: waited {s['waited']:.1f}s over {s['waiting_requests']}/{s['requests']} requests"
+                f" (max {s['max_wait']:.1f}s)")
+        if s['throttled']:
+            line += f", throttled {s['throttled']}x, now {s['rate']:.2f}/{s['base_rate']:.2f} req/s"
+        if s['paused']:
+            line += f", {s['paused']:.1f}s paused by Retry-After"
+        print(line)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Retries and Circuit Breakers
+RetryPolicy: capped exponential backoff with full jitter, used by
+http_client for every request. Idempotent requests are retried on network
+errors and 429/5xx; other requests only when the server cannot have acted
+on them (429, or a connection that never opened).
+
+CircuitBreaker: one per source. After BREAKER_THRESHOLD consecutive failed
+queries the breaker opens and the rest of that source's queries are skipped
+for the run. An open (or still half-open) breaker is saved to
+data/circuit_breakers.json with the time it opened, so the next run starts
+half-open: a single probe query decides whether the source is back (close)
+or still down (open again, skip the rest). The failure count is not saved;
+a closed breaker starts each run from zero.
+"""
+
+import json
+import os
+import random
+import threading
+from datetime import datetime
+
+import requests
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+BREAKER_FILE = 'data/circuit_breakers.json'
+BREAKER_THRESHOLD = 3
+
+class RetryPolicy:
+    """
+    attempts:   total tries, including the first
+    base_delay: backoff before the first retry, doubled each time
+    max_delay:  cap on any single backoff
+    """
+
+    def __init__(self, attempts=3, base_delay=0.5, max_delay=8.0):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, retry_number):
+        """Full jitter: uniform between 0 and the capped exponential backoff"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry_number))
+
+    def should_retry(self, attempt, idempotent, status_code=None, error=None):
+        """attempt is 1-based; pass the response status or the raised exception"""
+        if attempt >= self.attempts:
+            return False
+        if error is not None:
+            if idempotent:
+                return isinstance(error, requests.exceptions.RequestException)
+            # The request never reached the server, so it is safe to send again
+            return isinstance(error, requests.exceptions.ConnectTimeout)
+        if idempotent:
+            return status_code in RETRYABLE_STATUSES
+        return status_code == 429
+
+DEFAULT_RETRY = RetryPolicy()
+NO_RETRY = RetryPolicy(attempts=1)
+
+_breaker_file_lock = threading.Lock()
+
+def _load_breaker_file():
+    try:
+        with open(BREAKER_FILE, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"   ⚠ Error loading circuit breaker state: {e}")
+        return {}
+
+class CircuitBreaker:
+    """Per-source breaker: closed -> open after N failures -> half-open next run"""
+
+    def __init__(self, source, threshold=BREAKER_THRESHOLD, state='closed', failures=0, opened_at=None):
+        self.source = source
+        self.threshold = threshold
+        self.state = state
+        self.failures = failures
+        self.opened_at = opened_at
+        self.skipped = 0
+        self._probing = False
+        self._lock = threading.Condition()
+
+    @classmethod
+    def load(cls, source, threshold=BREAKER_THRESHOLD):
+        """Restore saved state; a breaker left open last run comes back half-open"""
+        with _breaker_file_lock:
+            saved = _load_breaker_file().get(source, {})
+        state = saved.get('state', 'closed')
+        if state not in ('open', 'half_open'):
+            return cls(source, threshold)
+        print(f"   🔌 {source} circuit was open last run - probing with one query")
+        return cls(source, threshold, 'half_open', opened_at=saved.get('opened_at'))
+
+    def allow(self):
+        """
+        Whether the next query may run. While half-open, one probe goes
+        through and concurrent callers wait for its outcome. A caller that
+        was allowed must end with record_success(), record_failure() or
+        release().
+        """
+        with self._lock:
+            while self.state == 'half_open' and self._probing:
+                self._lock.wait()
+            if self.state == 'closed':
+                return True
+            if self.state == 'half_open':
+                self._probing = True
+                return True
+            self.skipped += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != 'closed':
+                print(f"   🔌 {self.source} circuit closed - source is responding")
+            self.state = 'closed'
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+            self._lock.notify_all()
+
+    def release(self):
+        """
+        End a query without an outcome (e.g. it raised an unexpected error).
+        A half-open probe is handed to the next waiting caller; otherwise
+        this does nothing.
+        """
+        with self._lock:
+            if self._probing:
+                self._probing = False
+                self._lock.notify_all()
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == 'half_open' or (self.state == 'closed' and self.failures >= self.threshold):
+                self.state = 'open'
+                self.opened_at = datetime.now().isoformat()
+                print(f"   🔌 {self.source} circuit opened after {self.failures} failures - "
+                      f"skipping its remaining queries")
+            self._lock.notify_all()
+
+    def save(self):
+        """Write this source's state into the shared breaker file atomically"""
+        with _breaker_file_lock:
+            data = _load_breaker_file()
+            data[self.source] = {
+                'state': self.state,
+                'updated': datetime.now().isoformat(),
+            }
+            if self.state != 'closed':
+                data[self.source]['opened_at'] = self.opened_at
+            try:
+                os.makedirs(os.path.dirname(BREAKER_FILE), exist_ok=True)
+                tmp = BREAKER_FILE + '.tmp'
+                with open(tmp, 'w') as f:
+                    json.dump(data, f, indent=2)
+                os.replace(tmp, BREAKER_FILE)
+            except Exception as e:
+                print(f"   ⚠ Error saving circuit breaker state: {e}")
+        if self.skipped:
+            print(f"   🔌 {self.source}: skipped {self.skipped} queries (circuit open)")
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Salary and Grade Parsing
+Turns salary display strings and grade codes into numbers once, when a
+scanner builds a job, so downstream code compares numbers instead of
+re-parsing text:
+
+    salary_min, salary_max   amounts as written (None when not given)
+    salary_period            'year', 'month', 'biweekly', 'week', 'day' or 'hour'
+    gs_grade                 highest GS grade mentioned (e.g. 13 for "GS-12/13")
+
+Parsers are memoized, since the same strings ("See posting", common
+ranges) repeat across a run. The examples below double as tests:
+
+    python -m doctest salary.py
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+SalaryRange = namedtuple('SalaryRange', 'min max period')
+NO_SALARY = SalaryRange(None, None, None)
+
+# Multipliers to a yearly amount (2087 is OPM's paid hours per year)
+ANNUAL_FACTORS = {'year': 1, 'month': 12, 'biweekly': 26, 'week': 52, 'day': 260, 'hour': 2087}
+
+# USAJobs PositionRemuneration RateIntervalCode values
+RATE_INTERVAL_CODES = {
+    'PA': 'year', 'PM': 'month', 'BW': 'biweekly', 'PW': 'week', 'PD': 'day', 'PH': 'hour',
+}
+
+# Pay plans that use the GS grade scale
+GS_PAY_PLANS = {'GS', 'GG', 'GL'}
+
+# A 'k' suffix only counts as a whole word, so "$150,000 Kansas City" stays 150000
+_AMOUNT = re.compile(r'\$\s*(\d[\d,]*(?:\.\d+)?)(?:\s*([kK])\b)?')
+_PERIOD_WORDS = [
+    ('hour', re.compile(r'\b(?:an?|per|/)\s*(?:hour|hr)\b|\bhourly\b', re.I)),
+    ('biweekly', re.compile(r'\bbi-?weekly\b', re.I)),
+    ('week', re.compile(r'\b(?:an?|per|/)\s*(?:week|wk)\b|\bweekly\b', re.I)),
+    ('day', re.compile(r'\b(?:an?|per|/)\s*day\b|\bdaily\b', re.I)),
+    ('month', re.compile(r'\b(?:an?|per|/)\s*(?:month|mo)\b|\bmonthly\b', re.I)),
+    ('year', re.compile(r'\b(?:an?|per|/)\s*(?:year|yr|annum)\b|\bannual(?:ly)?\b', re.I)),
+]
+_UP_TO = re.compile(r'\bup\s+to\b', re.I)
+# A lower bound only: "From $60,000", "Starting at $60,000", "$60,000+"
+_FLOOR = re.compile(r'\bfrom\b|\bstarting\s+at\b|\d[kK]?\+', re.I)
+_GRADE = re.compile(r'\bG[SGL][-\s]?(\d{1,2})(?:\s*(?:-|/|–|to)\s*(?:G[SGL][-\s]?)?(\d{1,2}))?\b', re.I)
+_SERIES_GRADE = re.compile(r'\bG[SGL]-\d{4}-(\d{1,2})\b', re.I)
+
+# Below this an amount with no stated period is taken as hourly
+HOURLY_GUESS_LIMIT = 1000
+
+def _amount(number, thousands):
+    value = float(number.replace(',', ''))
+    if thousands:
+        value *= 1000
+    return int(value) if value.is_integer() else value
+
+@lru_cache(maxsize=4096)
+def parse_salary(text):
+    """
+    Parse a salary display string
+
+    >>> parse_salary('$85,000 - $110,000')
+    SalaryRange(min=85000, max=110000, period='year')
+    >>> parse_salary('$45 - $55 an hour')
+    SalaryRange(min=45, max=55, period='hour')
+    >>> parse_salary('$85K - $110K a year')
+    SalaryRange(min=85000, max=110000, period='year')
+    >>> parse_salary('Up to $32.50/hr')
+    SalaryRange(min=None, max=32.5, period='hour')
+    >>> parse_salary('From $6,000 a month')
+    SalaryRange(min=6000, max=None, period='month')
+    >>> parse_salary('$120K+')
+    SalaryRange(min=120000, max=None, period='year')
+    >>> parse_salary('$38.75')
+    SalaryRange(min=38.75, max=38.75, period='hour')
+    >>> parse_salary('See posting')
+    SalaryRange(min=None, max=None, period=None)
+    """
+    if not text or '$' not in text:
+        return NO_SALARY
+
+    amounts = [_amount(m.group(1), m.group(2)) for m in _AMOUNT.finditer(text)]
+    if not amounts:
+        return NO_SALARY
+
+    period = next((name for name, pattern in _PERIOD_WORDS if pattern.search(text)), None)
+    if period is None:
+        period = 'hour' if max(amounts) < HOURLY_GUESS_LIMIT else 'year'
+
+    if len(amounts) >= 2:
+        low, high = sorted(amounts[:2])
+        return SalaryRange(low, high, period)
+    if _UP_TO.search(text):
+        return SalaryRange(None, amounts[0], period)
+    if _FLOOR.search(text):
+        return SalaryRange(amounts[0], None, period)
+    return SalaryRange(amounts[0], amounts[0], period)
+
+def parse_amount(value):
+    """
+    A numeric amount from the USAJobs API (number or numeric string)
+
+    >>> parse_amount('85000.0'), parse_amount(72.5), parse_amount('Not listed')
+    (85000, 72.5, None)
+    """
+    try:
+        value = float(str(value).replace(',', '').replace('$', ''))
+    except (TypeError, ValueError):
+        return None
+    return int(value) if value.is_integer() else value
+
+@lru_cache(maxsize=4096)
+def parse_grade(text):
+    """
+    Highest GS grade in a string, or None
+
+    >>> parse_grade('GS-12/13'), parse_grade('Grants Specialist (GS-0501-14)'), parse_grade('gs 9 to 11')
+    (13, 14, 11)
+    >>> parse_grade('Senior Manager') is None
+    True
+    """
+    if not text:
+        return None
+    grades = [int(g) for m in _GRADE.finditer(text) for g in m.groups() if g]
+    # Series-then-grade form: GS-0501-14
+    grades += [int(g) for g in _SERIES_GRADE.findall(text)]
+    grades = [g for g in grades if 1 <= g <= 15]
+    return max(grades) if grades else None
+
+def format_salary(low, high, period):
+    """
+    Display string for a parsed range
+
+    >>> format_salary(85000, 110000, 'year')
+    '$85,000 - $110,000'
+    >>> format_salary(45, 45, 'hour')
+    '$45.00 per hour'
+    >>> format_salary(120000, None, 'year')
+    '$120,000+'
+    """
+    if low is None and high is None:
+        return 'Not listed'
+    fmt = (lambda v: f"${v:,.2f}") if period == 'hour' else (lambda v: f"${v:,.0f}")
+    text = fmt(low if low is not None else high)
+    if low is not None and high is not None and high != low:
+        text += f" - {fmt(high)}"
+    elif low is None:
+        text = f"Up to {text}"
+    elif high is None:
+        text += '+'
+    if period not in (None, 'year'):
+        text += f" per {period.replace('biweekly', 'pay period')}"
+    return text
+
+def annual_salary(job):
+    """
+    The top of a job's salary range as a yearly amount, or None
+
+    >>> annual_salary({'salary_min': 40, 'salary_max': 50, 'salary_period': 'hour'})
+    104350
+    """
+    amount = job.get('salary_max') or job.get('salary_min')
+    if amount is None:
+        return None
+    return round(amount * ANNUAL_FACTORS.get(job.get('salary_period') or 'year', 1))
+
+def add_salary_fields(job, grade_text=None):
+    """
+    Fill salary_min/max/period and gs_grade from the display strings,
+    leaving fields a scanner already set alone. Returns the job.
+    """
+    if 'salary_min' not in job:
+        low, high, period = parse_salary(job.get('salary') or '')
+        job['salary_min'], job['salary_max'], job['salary_period'] = low, high, period
+    if 'gs_grade' not in job:
+        job['gs_grade'] = (parse_grade(grade_text) if grade_text else None) \
+            or parse_grade(job.get('salary') or '') or parse_grade(job.get('title') or '')
+    return job
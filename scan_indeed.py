@@ -6,17 +6,79 @@ Uses respectful delays and user agent
 """
 
 import requests
-from bs4 import BeautifulSoup
 import time
-import re
+import http_cache
+from extraction import get_plan
+from job_record import INDEED
+from resilience import CircuitBreaker
+from salary import add_salary_fields
 
-def scan_indeed():
+# Extraction spec - Indeed's structure as of 2024/2025, fix selectors here
+# when Indeed changes its HTML (see extraction.py for the syntax)
+INDEED_SPEC = {
+    'source': INDEED,
+    'cards': [
+        'div.job_seen_beacon',
+        'td.resultContent',
+    ],
+    'fields': {
+        'job_id': {
+            'select': [(':self', 'data-jk'), ('a[id^=job_]', 'id')],
+            'post': ['remove:job_'],
+            'required': True,
+        },
+        'title': {
+            'select': [('h2.jobTitle', None), ('a.jcs-JobTitle', None)],
+            'post': ['strip_new_badge'],
+            'required': True,
+        },
+        'company': {
+            'select': [('span.companyName', None), ('span[data-testid=company-name]', None)],
+            'default': 'Company not listed',
+        },
+        'location': {
+            'select': [('div.companyLocation', None)],
+            'default': '{location}',
+        },
+        'salary': {
+            'select': [('div.salary-snippet', None), ('span.estimated-salary', None)],
+            'default': 'See posting',
+        },
+    },
+    'output': {
+        'id': 'indeed_{job_id}',
+        'title': '{title}',
+        'agency': '{company}',
+        'location': '{location}',
+        'url': 'https://www.indeed.com/viewjob?jk={job_id}',
+        'salary': '{salary}',
+        'posted': 'Within 7 days',
+        'source': INDEED,
+    },
+}
+
+# Cards kept per search query
+CARDS_PER_QUERY = 15
+
+def extract_indeed_jobs(html, location, limit=CARDS_PER_QUERY):
+    """
+    Parse one Indeed search results page into Jobs
+    location is used when a card has no location of its own
+    """
+    jobs = get_plan(INDEED_SPEC).extract(html, {'location': location}, limit)
+    return [add_salary_fields(job) for job in jobs]
+
+def scan_indeed(results=None, deadline=None):
     """
     Scan Indeed for grants management jobs
-    Returns list of job dictionaries
+    Returns list of Jobs
+
+    results:  optional list that raw jobs are appended to as they are found,
+              so the caller can keep partial results if the scan is cut short
+    deadline: optional time.monotonic() value; no new queries start after it
     """
     
-                queries = [
+    queries = [
         'grants management',
         'grants consultant',
         'capital grants manager',
@@ -30,109 +92,55 @@ def scan_indeed():
         'Remote'
     ]
     
-    all_results = []
+    all_results = [] if results is None else results
     
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
         'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate',
-        'Connection': 'keep-alive',
     }
     
+    breaker = CircuitBreaker.load(INDEED)
+    
     for query in queries:
         for location in locations:
+            if deadline and time.monotonic() >= deadline:
+                break
+            if not breaker.allow():
+                break
+            
             try:
                 # Build Indeed URL
                 query_encoded = query.replace(' ', '+')
                 location_encoded = location.replace(' ', '+')
                 url = f'https://www.indeed.com/jobs?q={query_encoded}&l={location_encoded}&sort=date&fromage=7'
                 
-                response = requests.get(url, headers=headers, timeout=15)
+                response = http_cache.cached_get(url, headers=headers)
                 
                 if response.status_code != 200:
                     print(f"   ⚠ Indeed returned {response.status_code}")
+                    breaker.record_failure()
                     continue
                 
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Find job cards - Indeed's structure as of 2024/2025
-                # Note: This may need updates if Indeed changes their HTML
-                job_cards = soup.find_all('div', class_='job_seen_beacon')
-                
-                if not job_cards:
-                    # Try alternative structure
-                    job_cards = soup.find_all('td', class_='resultContent')
+                breaker.record_success()
                 
-                for card in job_cards[:15]:  # Limit per search
-                    try:
-                        # Extract job ID
-                        job_id = card.get('data-jk', '')
-                        if not job_id:
-                            # Try alternative location
-                            link = card.find('a', id=lambda x: x and x.startswith('job_'))
-                            if link:
-                                job_id = link.get('id', '').replace('job_', '')
-                        
-                        if not job_id:
-                            continue
-                        
-                        # Extract title
-                        title_elem = card.find('h2', class_='jobTitle')
-                        if not title_elem:
-                            title_elem = card.find('a', class_='jcs-JobTitle')
-                        
-                        if not title_elem:
-                            continue
-                        
-                        title = title_elem.get_text(strip=True)
-                        
-                        # Remove "new" badge if present
-                        title = re.sub(r'^(new|New)\s*', '', title)
-                        
-                        # Extract company
-                        company_elem = card.find('span', class_='companyName')
-                        if not company_elem:
-                            company_elem = card.find('span', {'data-testid': 'company-name'})
-                        
-                        company = company_elem.get_text(strip=True) if company_elem else 'Company not listed'
-                        
-                        # Extract location
-                        location_elem = card.find('div', class_='companyLocation')
-                        job_location = location_elem.get_text(strip=True) if location_elem else location
-                        
-                        # Extract salary if available
-                        salary_elem = card.find('div', class_='salary-snippet')
-                        if not salary_elem:
-                            salary_elem = card.find('span', class_='estimated-salary')
-                        salary = salary_elem.get_text(strip=True) if salary_elem else 'See posting'
-                        
-                        result = {
-                            'id': f'indeed_{job_id}',
-                            'title': title,
-                            'agency': company,
-                            'location': job_location,
-                            'url': f'https://www.indeed.com/viewjob?jk={job_id}',
-                            'salary': salary,
-                            'posted': 'Within 7 days',
-                            'source': 'Indeed'
-                        }
-                        
-                        all_results.append(result)
-                        
-                    except Exception as e:
-                        continue
-                
-                # Be respectful - wait between requests
-                time.sleep(3)
+                all_results.extend(extract_indeed_jobs(response.text, location))
                 
             except requests.exceptions.RequestException as e:
                 print(f"   ⚠ Indeed network error: {e}")
+                breaker.record_failure()
                 continue
             except Exception as e:
                 print(f"   ⚠ Indeed parsing error: {e}")
+                # A half-open probe that failed this way has no outcome
+                breaker.release()
                 continue
     
+    breaker.save()
+    
+    if deadline and time.monotonic() >= deadline:
+        print("   ⏱ Indeed deadline reached, stopping early")
+    
     # Remove duplicates
     seen = set()
     unique_results = []
@@ -6,15 +6,83 @@ No authentication required for public listings
 """
 
 import requests
-from bs4 import BeautifulSoup
 import urllib.parse
 import time
-import re
+import http_cache
+from extraction import get_plan
+from job_record import LINKEDIN
+from resilience import CircuitBreaker
+from salary import add_salary_fields
 
-def scan_linkedin():
+# Extraction spec - fix selectors here when LinkedIn changes its HTML
+# (see extraction.py for the selector and post-processor syntax)
+LINKEDIN_SPEC = {
+    'source': LINKEDIN,
+    'cards': [
+        'div.base-card',
+        'li[class*=jobs-search-results__list-item]',
+    ],
+    'fields': {
+        'title': {
+            'select': [('h3.base-search-card__title', None), ('a[class*=job-card-list__title]', None)],
+            'required': True,
+        },
+        'company': {
+            'select': [('h4.base-search-card__subtitle', None), ('a[class*=job-card-container__company-name]', None)],
+            'default': 'Company not listed',
+        },
+        'location': {
+            'select': [('span.job-search-card__location', None)],
+            'default': '{location}',
+        },
+        'href': {
+            'select': [('a.base-card__full-link', 'href'), ('a[href*=/jobs/view/]', 'href')],
+            'required': True,
+        },
+        'job_id': {
+            'from': 'href',
+            'post': [r'regex_or_last_segment:/jobs/view/(\d+)'],
+        },
+        'url': {
+            'from': 'href',
+            'post': ['absolute_url:https://www.linkedin.com'],
+        },
+        'posted': {
+            'select': [('time.job-search-card__listdate', 'datetime'), ('time', 'datetime')],
+            'default': 'Recent',
+        },
+    },
+    'output': {
+        'id': 'linkedin_{job_id}',
+        'title': '{title}',
+        'agency': '{company}',
+        'location': '{location}',
+        'url': '{url}',
+        'salary': 'See posting',
+        'posted': '{posted}',
+        'source': LINKEDIN,
+    },
+}
+
+# Cards kept per search query
+CARDS_PER_QUERY = 15
+
+def extract_linkedin_jobs(html, location, limit=CARDS_PER_QUERY):
+    """
+    Parse one LinkedIn search results page into Jobs
+    location is used when a card has no location of its own
+    """
+    jobs = get_plan(LINKEDIN_SPEC).extract(html, {'location': location}, limit)
+    return [add_salary_fields(job) for job in jobs]
+
+def scan_linkedin(results=None, deadline=None):
     """
     Scan LinkedIn for grants management jobs
-    Returns list of job dictionaries
+    Returns list of Jobs
+
+    results:  optional list that raw jobs are appended to as they are found,
+              so the caller can keep partial results if the scan is cut short
+    deadline: optional time.monotonic() value; no new queries start after it
     """
     
     queries = [
@@ -31,7 +99,7 @@ def scan_linkedin():
         'United States'  # Remote
     ]
     
-    all_results = []
+    all_results = [] if results is None else results
     
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -39,8 +107,15 @@ def scan_linkedin():
         'Accept-Language': 'en-US,en;q=0.5',
     }
     
+    breaker = CircuitBreaker.load(LINKEDIN)
+    
     for query in queries:
         for location in locations:
+            if deadline and time.monotonic() >= deadline:
+                break
+            if not breaker.allow():
+                break
+            
             try:
                 # Build LinkedIn job search URL
                 params = {
@@ -52,98 +127,32 @@ def scan_linkedin():
                 
                 url = 'https://www.linkedin.com/jobs/search?' + urllib.parse.urlencode(params)
                 
-                response = requests.get(url, headers=headers, timeout=15)
+                response = http_cache.cached_get(url, headers=headers)
                 
                 if response.status_code != 200:
                     print(f"   ⚠ LinkedIn returned {response.status_code}")
+                    breaker.record_failure()
                     continue
                 
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Find job cards
-                job_cards = soup.find_all('div', class_='base-card')
-                
-                if not job_cards:
-                    # Try alternative selector
-                    job_cards = soup.find_all('li', class_=lambda x: x and 'jobs-search-results__list-item' in x)
+                breaker.record_success()
                 
-                for card in job_cards[:15]:  # Limit per search
-                    try:
-                        # Extract title
-                        title_elem = card.find('h3', class_='base-search-card__title')
-                        if not title_elem:
-                            title_elem = card.find('a', class_=lambda x: x and 'job-card-list__title' in x)
-                        
-                        if not title_elem:
-                            continue
-                        
-                        title = title_elem.get_text(strip=True)
-                        
-                        # Extract company
-                        company_elem = card.find('h4', class_='base-search-card__subtitle')
-                        if not company_elem:
-                            company_elem = card.find('a', class_=lambda x: x and 'job-card-container__company-name' in x)
-                        
-                        company = company_elem.get_text(strip=True) if company_elem else 'Company not listed'
-                        
-                        # Extract location
-                        location_elem = card.find('span', class_='job-search-card__location')
-                        job_location = location_elem.get_text(strip=True) if location_elem else location
-                        
-                        # Extract job URL and ID
-                        link_elem = card.find('a', class_='base-card__full-link')
-                        if not link_elem:
-                            link_elem = card.find('a', href=lambda x: x and '/jobs/view/' in x)
-                        
-                        if not link_elem:
-                            continue
-                        
-                        job_url = link_elem.get('href', '')
-                        
-                        # Extract job ID from URL
-                        job_id_match = re.search(r'/jobs/view/(\d+)', job_url)
-                        if job_id_match:
-                            job_id = job_id_match.group(1)
-                        else:
-                            # Fallback: use last part of URL
-                            job_id = job_url.split('/')[-1].split('?')[0]
-                        
-                        # Clean URL
-                        if not job_url.startswith('http'):
-                            job_url = 'https://www.linkedin.com' + job_url
-                        
-                        # Extract posted date if available
-                        time_elem = card.find('time', class_='job-search-card__listdate')
-                        if not time_elem:
-                            time_elem = card.find('time')
-                        posted = time_elem.get('datetime', 'Recent') if time_elem else 'Recent'
-                        
-                        result = {
-                            'id': f'linkedin_{job_id}',
-                            'title': title,
-                            'agency': company,
-                            'location': job_location,
-                            'url': job_url,
-                            'salary': 'See posting',
-                            'posted': posted,
-                            'source': 'LinkedIn'
-                        }
-                        
-                        all_results.append(result)
-                        
-                    except Exception as e:
-                        continue
-                
-                # Be respectful - wait between requests
-                time.sleep(3)
+                all_results.extend(extract_linkedin_jobs(response.text, location))
                 
             except requests.exceptions.RequestException as e:
                 print(f"   ⚠ LinkedIn network error: {e}")
+                breaker.record_failure()
                 continue
             except Exception as e:
                 print(f"   ⚠ LinkedIn parsing error: {e}")
+                # A half-open probe that failed this way has no outcome
+                breaker.release()
                 continue
     
+    breaker.save()
+    
+    if deadline and time.monotonic() >= deadline:
+        print("   ⏱ LinkedIn deadline reached, stopping early")
+    
     # Remove duplicates
     seen = set()
     unique_results = []
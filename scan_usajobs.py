@@ -6,110 +6,318 @@ API docs: https://developer.usajobs.gov/
 """
 
 import requests
+import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import http_cache
+from resilience import CircuitBreaker
+import metrics
+import profiling
+from job_record import USAJOBS, Job
+from salary import GS_PAY_PLANS, RATE_INTERVAL_CODES, add_salary_fields, format_salary, parse_amount, parse_grade
 
-def scan_usajobs():
+USAJOBS_SEARCH_URL = 'https://data.usajobs.gov/api/search'
+
+# Search parameters
+SEARCH_TERMS = [
+    'grants management',
+    'grants consultant',
+    'capital grants',
+    'capital program manager',
+    'federal grants specialist',
+    'grant compliance'
+]
+
+# Max term queries in flight at once. Keep this low to stay inside
+# USAJobs' rate limits; 1 restores the old one-at-a-time behaviour.
+DEFAULT_CONCURRENCY = 3
+
+RESULTS_PER_PAGE = 50
+
+# Safety cap on pages per term (USAJOBS_MAX_PAGES overrides)
+DEFAULT_MAX_PAGES = 10
+
+# Stop paging a term after this many already-seen postings in a row
+SEEN_RUN_LIMIT = 5
+
+# The API's DatePosted filter only goes back 60 days
+MAX_DATE_POSTED_DAYS = 60
+
+WATERMARKS_FILE = 'data/usajobs_watermarks.json'
+
+def get_concurrency():
+    """Read USAJOBS_CONCURRENCY, falling back to DEFAULT_CONCURRENCY"""
+    try:
+        return max(1, int(os.getenv('USAJOBS_CONCURRENCY', DEFAULT_CONCURRENCY)))
+    except ValueError:
+        return DEFAULT_CONCURRENCY
+
+def get_max_pages():
+    """Read USAJOBS_MAX_PAGES, falling back to DEFAULT_MAX_PAGES"""
+    try:
+        return max(1, int(os.getenv('USAJOBS_MAX_PAGES', DEFAULT_MAX_PAGES)))
+    except ValueError:
+        return DEFAULT_MAX_PAGES
+
+def map_usajobs_item(item):
+    """
+    Convert one SearchResultItems entry into a Job
+    Raises KeyError/IndexError/TypeError on malformed items
+    """
+    job = item['MatchedObjectDescriptor']
+
+    # Extract salary info (the API returns amounts as numeric strings)
+    pay = (job.get('PositionRemuneration') or [{}])[0]
+    salary_min = parse_amount(pay.get('MinimumRange'))
+    salary_max = parse_amount(pay.get('MaximumRange'))
+    salary_period = RATE_INTERVAL_CODES.get(pay.get('RateIntervalCode'), 'year') \
+        if salary_min is not None or salary_max is not None else None
+
+    # Grade: the pay plan's grade range when it is on the GS scale
+    pay_plan = job.get('JobGrade', [{}])[0].get('Code', 'N/A') if job.get('JobGrade') else 'N/A'
+    details = (job.get('UserArea') or {}).get('Details') or {}
+    gs_grade = parse_grade(f"GS-{details.get('LowGrade')}-{details.get('HighGrade')}") \
+        if pay_plan in GS_PAY_PLANS else None
+
+    mapped = Job(
+        id=item['MatchedObjectId'],
+        title=job.get('PositionTitle', 'Unknown Position'),
+        agency=job.get('OrganizationName', 'Unknown Agency'),
+        location=job.get('PositionLocationDisplay', 'Location not specified'),
+        url=job.get('PositionURI', ''),
+        salary=format_salary(salary_min, salary_max, salary_period),
+        salary_min=salary_min,
+        salary_max=salary_max,
+        salary_period=salary_period,
+        posted=job.get('PublicationStartDate', ''),
+        closes=job.get('ApplicationCloseDate', ''),
+        grade=pay_plan,
+        source=USAJOBS
+    )
+    if gs_grade is not None:
+        mapped['gs_grade'] = gs_grade
+    return add_salary_fields(mapped)
+
+def load_watermarks():
+    """Load the newest PublicationStartDate seen per search term"""
+    try:
+        with open(WATERMARKS_FILE, 'r') as f:
+            return json.load(f).get('terms', {})
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"   ⚠ Error loading USAJobs watermarks: {e}")
+        return {}
+
+def save_watermarks(watermarks):
+    """Save per-term watermarks so the next run only asks for the delta"""
+    try:
+        os.makedirs(os.path.dirname(WATERMARKS_FILE), exist_ok=True)
+        with open(WATERMARKS_FILE, 'w') as f:
+            json.dump({
+                'terms': watermarks,
+                'last_updated': datetime.now().isoformat()
+            }, f, indent=2)
+    except Exception as e:
+        print(f"   ⚠ Error saving USAJobs watermarks: {e}")
+
+def date_posted_days(watermark):
+    """
+    Turn a PublicationStartDate watermark into the API's DatePosted value
+    (days back from today, 0-60). One extra day is added so postings
+    published later on the watermark day are not missed.
+    """
+    if not watermark:
+        return None
+    try:
+        newest = datetime.fromisoformat(watermark[:19])
+    except ValueError:
+        return None
+    days = (datetime.now() - newest).days + 1
+    return min(max(days, 0), MAX_DATE_POSTED_DAYS)
+
+def fetch_page(term, page, headers, date_posted=None, breaker=None):
+    """
+    Fetch one results page for a keyword search
+    Returns the SearchResult dict, or None on errors / empty results
+    or when the source's circuit breaker is open
+    """
+    params = {
+        'Keyword': term,
+        'ResultsPerPage': RESULTS_PER_PAGE,
+        'Page': page,
+        'SortField': 'PostingDate',
+        'SortOrder': 'Descending'
+    }
+    if date_posted is not None:
+        params['DatePosted'] = date_posted
+
+    if breaker and not breaker.allow():
+        return None
+
+    try:
+        response = http_cache.cached_get(
+            USAJOBS_SEARCH_URL,
+            params=params,
+            headers=headers
+        )
+
+        if response.status_code != 200:
+            print(f"   ⚠ API returned {response.status_code} for '{term}' (page {page})")
+            if breaker:
+                breaker.record_failure()
+            return None
+
+        if breaker:
+            breaker.record_success()
+        start = time.perf_counter()
+        data = response.json()
+        metrics.inc('parse_seconds_total', time.perf_counter() - start, source='USAJobs')
+
+    except requests.exceptions.RequestException as e:
+        print(f"   ⚠ Network error for '{term}' (page {page}): {e}")
+        if breaker:
+            breaker.record_failure()
+        return None
+
+    finally:
+        # Any other error (e.g. from the HTTP cache) must not leave a
+        # half-open probe outstanding, or the other terms wait on it forever
+        if breaker:
+            breaker.release()
+
+    if 'SearchResult' not in data or not data['SearchResult']:
+        return None
+
+    return data['SearchResult']
+
+def iter_term_jobs(term, headers, seen_ids=None, watermarks=None, deadline=None, breaker=None):
+    """
+    Walk Page=1..N for one search term, yielding job dicts one at a time
+
+    Paging stops once SEEN_RUN_LIMIT consecutive postings are already in
+    seen_ids (results are newest first, so the rest are old news), when the
+    last page is reached, or when the deadline passes. If the term was
+    crawled to a natural stop, watermarks[term] is advanced to the newest
+    PublicationStartDate seen.
+    """
+    if seen_ids is None:
+        seen_ids = set()
+    watermarks = {} if watermarks is None else watermarks
+    date_posted = date_posted_days(watermarks.get(term))
+    max_pages = get_max_pages()
+    newest = watermarks.get(term, '')
+    seen_run = 0
+    complete = False
+
+    for page in range(1, max_pages + 1):
+        if deadline and time.monotonic() >= deadline:
+            # Cut short - leave the watermark alone so nothing is skipped
+            return
+
+        result = fetch_page(term, page, headers, date_posted, breaker)
+        if result is None:
+            return
+
+        items = result.get('SearchResultItems', [])
+
+        for item in items:
+            try:
+                job = map_usajobs_item(item)
+            except (KeyError, IndexError, TypeError):
+                continue
+
+            if job['posted'] > newest:
+                newest = job['posted']
+
+            yield job
+
+            if job['id'] in seen_ids:
+                seen_run += 1
+                if seen_run >= SEEN_RUN_LIMIT:
+                    break
+            else:
+                seen_run = 0
+
+        if seen_run >= SEEN_RUN_LIMIT:
+            complete = True
+            break
+
+        try:
+            number_of_pages = int(result.get('UserArea', {}).get('NumberOfPages', page))
+        except (TypeError, ValueError):
+            number_of_pages = page
+        if page >= number_of_pages or len(items) < RESULTS_PER_PAGE:
+            complete = True
+            break
+
+    # Only move the watermark when everything newer than it was read;
+    # hitting the page cap means older unseen postings may remain
+    if complete and newest:
+        watermarks[term] = newest
+
+def scan_usajobs(results=None, deadline=None, concurrency=None, seen_ids=None, watermarks=None):
     """
     Scan USAJobs.gov for grants management and consultant roles
-    Returns list of job dictionaries
+    Returns list of Jobs
+
+    results:     optional list that raw jobs are appended to as they are found,
+                 so the caller can keep partial results if the scan is cut short
+    deadline:    optional time.monotonic() value; no new pages are fetched after it
+    concurrency: max terms crawled at once (default: USAJOBS_CONCURRENCY or 3)
+    seen_ids:    IDs already notified; paging a term stops at a run of these
+    watermarks:  per-term watermarks (default: loaded from WATERMARKS_FILE),
+                 advanced in place for terms crawled to a natural stop. They
+                 are not saved here: the caller saves them with
+                 save_watermarks() once the jobs have been recorded as seen,
+                 so a crash or a missed deadline never skips postings
     """
-    
+
     # Get credentials from environment
     api_key = os.getenv('USAJOBS_API_KEY')
     email = os.getenv('USAJOBS_EMAIL')
-    
+
     if not api_key or not email:
         print("   ⚠ USAJobs API credentials not configured")
         return []
-    
+
     headers = {
         'Authorization-Key': api_key,
         'User-Agent': email
     }
-    
-    # Search parameters
-    search_terms = [
-        'grants management',
-        'grants consultant',
-        'capital grants',
-    'capital program manager',
-    'federal grants specialist',
-    'grant compliance'
-    ]
-    
-    all_results = []
-    
-    for term in search_terms:
-        params = {
-            'Keyword': term,
-            'ResultsPerPage': 50,
-            'SortField': 'PostingDate',
-            'SortOrder': 'Descending'
-        }
-        
-        try:
-            response = requests.get(
-                'https://data.usajobs.gov/api/search',
-                params=params,
-                headers=headers,
-                timeout=15
-            )
-            
-            if response.status_code != 200:
-                print(f"   ⚠ API returned {response.status_code} for '{term}'")
-                continue
-            
-            data = response.json()
-            
-            if 'SearchResult' not in data or not data['SearchResult']:
-                continue
-            
-            items = data['SearchResult'].get('SearchResultItems', [])
-            
-            for item in items:
-                try:
-                    job = item['MatchedObjectDescriptor']
-                    
-                    # Extract salary info
-                    salary_min = 'Not listed'
-                    salary_max = 'Not listed'
-                    if 'PositionRemuneration' in job and job['PositionRemuneration']:
-                        salary_min = job['PositionRemuneration'][0].get('MinimumRange', 'Not listed')
-                        salary_max = job['PositionRemuneration'][0].get('MaximumRange', 'Not listed')
-                    
-                    salary_display = f"${salary_min:,} - ${salary_max:,}" if isinstance(salary_min, (int, float)) else salary_min
-                    
-                    result = {
-                        'id': item['MatchedObjectId'],
-                        'title': job.get('PositionTitle', 'Unknown Position'),
-                        'agency': job.get('OrganizationName', 'Unknown Agency'),
-                        'location': job.get('PositionLocationDisplay', 'Location not specified'),
-                        'url': job.get('PositionURI', ''),
-                        'salary': salary_display,
-                        'posted': job.get('PublicationStartDate', ''),
-                        'closes': job.get('ApplicationCloseDate', ''),
-                        'grade': job.get('JobGrade', [{}])[0].get('Code', 'N/A') if job.get('JobGrade') else 'N/A',
-                        'source': 'USAJobs'
-                    }
-                    
-                    all_results.append(result)
-                    
-                except (KeyError, IndexError, TypeError) as e:
-                    continue
-            
-        except requests.exceptions.RequestException as e:
-            print(f"   ⚠ Network error for '{term}': {e}")
-            continue
-    
-    # Remove duplicates by ID
+
+    all_results = [] if results is None else results
+    by_term = {term: [] for term in SEARCH_TERMS}
+    watermarks = load_watermarks() if watermarks is None else watermarks
+    breaker = CircuitBreaker.load('USAJobs')
+
+    def crawl(term):
+        # Stream each job into the shared results as soon as it is parsed
+        for job in iter_term_jobs(term, headers, seen_ids, watermarks, deadline, breaker):
+            by_term[term].append(job)
+            all_results.append(job)
+
+    with ThreadPoolExecutor(max_workers=concurrency or get_concurrency()) as pool:
+        for future in [pool.submit(profiling.wrap(crawl), term) for term in SEARCH_TERMS]:
+            future.result()
+
+    breaker.save()
+
+    if deadline and time.monotonic() >= deadline:
+        print("   ⏱ USAJobs deadline reached, stopping early")
+
+    # Remove duplicates by ID, in search term order so the first
+    # match wins exactly as it did when terms ran one at a time
     seen = set()
     unique_results = []
-    for job in all_results:
-        if job['id'] not in seen:
-            seen.add(job['id'])
-            unique_results.append(job)
-    
+    for term in SEARCH_TERMS:
+        for job in by_term[term]:
+            if job['id'] not in seen:
+                seen.add(job['id'])
+                unique_results.append(job)
+
     return unique_results
 
 if __name__ == '__main__':
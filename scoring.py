@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Job Scoring
+Priority (High / Medium / Low) and type (Federal Capital, Infrastructure,
+Contract, Federal General) for every job, computed once in the main
+pipeline so email, Discord, the archive and Notion all use the same
+scores. The agency and keyword lists are compiled into one regex each at
+import, so scoring a job is a few regex scans instead of one substring
+scan per list entry.
+
+Matching keeps the original substring semantics ("va" matches anywhere
+in the agency name). Salary and grade come from the numeric fields the
+scanners fill in (see salary.py): the salary is compared as a yearly
+amount, so hourly and monthly rates score fairly, and the grade is the
+top of the posting's GS range.
+"""
+
+import re
+
+from salary import add_salary_fields, annual_salary
+
+TARGET_AGENCIES = [
+    "dod", "defense", "army", "navy", "air force",
+    "va", "veterans affairs", "gsa", "general services",
+    "dhs", "homeland security", "hhs", "health and human services",
+    "doe", "energy", "dot", "transportation", "usaid",
+    "census", "noaa", "reclamation"
+]
+
+HIGH_PRIORITY_KEYWORDS = [
+    "capital", "infrastructure", "construction",
+    "senior", "lead", "manager", "director", "portfolio"
+]
+
+# Type keywords, checked in this order; the first type with a match wins
+TYPE_KEYWORDS = [
+    ("Federal Capital", ["capital", "construction"]),
+    ("Infrastructure", ["infrastructure"]),
+    ("Contract", ["contract", "contractor"]),
+]
+DEFAULT_TYPE = "Federal General"
+
+HIGH_SALARY = 120000
+MEDIUM_SALARY = 90000
+
+HIGH_GRADE = 14
+MEDIUM_GRADE = 12
+
+PRIORITY_RANK = {"High": 0, "Medium": 1, "Low": 2}
+
+def _alternation(words):
+    # Longest first so overlapping alternatives all get a chance to match
+    return "|".join(re.escape(w) for w in sorted(set(words), key=len, reverse=True))
+
+AGENCY_PATTERN = re.compile(_alternation(TARGET_AGENCIES))
+KEYWORD_PATTERN = re.compile(_alternation(HIGH_PRIORITY_KEYWORDS))
+
+_TYPE_GROUPS = [f"t{n}" for n in range(len(TYPE_KEYWORDS))]
+TYPE_PATTERN = re.compile("|".join(
+    f"(?P<{group}>{_alternation(words)})" for group, (_, words) in zip(_TYPE_GROUPS, TYPE_KEYWORDS)
+))
+
+def score_priority(job):
+    title = job.get("title", "").lower()
+    agency = job.get("agency", "").lower()
+    add_salary_fields(job)  # no-op for jobs a scanner already parsed
+    salary = annual_salary(job)
+    grade = job.get("gs_grade")
+
+    if (salary is not None and salary >= HIGH_SALARY) \
+            or (grade is not None and grade >= HIGH_GRADE) \
+            or AGENCY_PATTERN.search(agency) \
+            or KEYWORD_PATTERN.search(title):
+        return "High"
+
+    if grade is not None and grade >= MEDIUM_GRADE:
+        return "Medium"
+    if salary is not None and salary >= MEDIUM_SALARY:
+        return "Medium"
+    return "Low"
+
+def classify_type(job):
+    text = f"{job.get('title', '')} {job.get('description', '')}".lower()
+    found = {m.lastgroup for m in TYPE_PATTERN.finditer(text)}
+    for group, (job_type, _) in zip(_TYPE_GROUPS, TYPE_KEYWORDS):
+        if group in found:
+            return job_type
+    return DEFAULT_TYPE
+
+def score_jobs(jobs):
+    """Add 'priority' and 'type' to every job in one pass; returns jobs"""
+    for job in jobs:
+        job["priority"] = score_priority(job)
+        job["type"] = classify_type(job)
+    return jobs
+
+def rank_jobs(jobs):
+    """Jobs ordered High -> Medium -> Low, keeping their order within a priority"""
+    return sorted(jobs, key=lambda job: PRIORITY_RANK.get(job.get("priority"), len(PRIORITY_RANK)))
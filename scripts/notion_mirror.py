@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Local Notion Mirror
+SQLite copy (data/notion_mirror.db) of the Notion job database's pages,
+keeping only the properties the sync needs: Job Hash, Status, Priority,
+URL, page id and last_edited_time. The data_source_id and the data
+source's property schema are kept alongside, so a routine sync is one
+delta query for pages edited since the last sync plus the page writes.
+
+push_to_notion.py does the fetching; this module only stores pages.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Set
+
+MIRROR_DB_FILE = 'data/notion_mirror.db'
+
+
+def _plain_text(prop: Dict) -> str:
+    return "".join(part.get("plain_text", "") for part in prop.get("rich_text", []))
+
+
+def _option_name(prop: Dict, kind: str) -> Optional[str]:
+    value = prop.get(kind)
+    return value.get("name") if value else None
+
+
+def page_row(page: Dict) -> tuple:
+    """(page_id, job_hash, status, priority, url, last_edited_time) for one Notion page"""
+    props = page.get("properties", {})
+    return (
+        page["id"],
+        _plain_text(props.get("Job Hash", {})),
+        _option_name(props.get("Status", {}), "status"),
+        _option_name(props.get("Priority", {}), "select"),
+        props.get("URL", {}).get("url"),
+        page.get("last_edited_time", ""),
+    )
+
+
+class NotionMirror:
+    """Pages and metadata of one Notion data source. Safe to share between threads."""
+
+    def __init__(self, path=MIRROR_DB_FILE):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    page_id TEXT PRIMARY KEY,
+                    job_hash TEXT NOT NULL,
+                    status TEXT,
+                    priority TEXT,
+                    url TEXT,
+                    last_edited_time TEXT NOT NULL
+                ) WITHOUT ROWID
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS pages_job_hash ON pages (job_hash)")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            """)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value)
+            )
+
+    def data_source_id(self, database_id: str) -> Optional[str]:
+        """Cached data_source_id, if it was discovered for this database"""
+        if self.get_meta("database_id") != database_id:
+            return None
+        return self.get_meta("data_source_id")
+
+    def save_data_source(self, database_id: str, data_source_id: str, schema: Optional[Dict] = None):
+        """
+        Remember the data source for a database. Switching to another
+        database or data source empties the mirror, since its pages belong
+        to the old one.
+        """
+        if self.get_meta("data_source_id") not in (None, data_source_id):
+            self.clear()
+        self.set_meta("database_id", database_id)
+        self.set_meta("data_source_id", data_source_id)
+        if schema is not None:
+            self.set_meta("schema", json.dumps(schema))
+
+    @property
+    def schema(self) -> Dict:
+        """Property name -> type of the data source, as last saved"""
+        return json.loads(self.get_meta("schema") or "{}")
+
+    def upsert_pages(self, pages: Iterable[Dict]) -> int:
+        """Insert or refresh pages; in-trash pages are removed. Returns pages written."""
+        rows, removed = [], []
+        for page in pages:
+            if page.get("in_trash") or page.get("archived"):
+                removed.append((page["id"],))
+            else:
+                rows.append(page_row(page))
+        with self._lock, self._conn:
+            self._conn.executemany("""
+                INSERT INTO pages (page_id, job_hash, status, priority, url, last_edited_time)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(page_id) DO UPDATE SET
+                    job_hash = excluded.job_hash,
+                    status = excluded.status,
+                    priority = excluded.priority,
+                    url = excluded.url,
+                    last_edited_time = excluded.last_edited_time
+            """, rows)
+            self._conn.executemany("DELETE FROM pages WHERE page_id = ?", removed)
+        return len(rows)
+
+    def replace_pages(self, pages: Iterable[Dict]) -> int:
+        """Full sync: the mirror becomes exactly these pages (drops pages deleted in Notion)"""
+        rows = [page_row(page) for page in pages if not (page.get("in_trash") or page.get("archived"))]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO pages (page_id, job_hash, status, priority, url, last_edited_time) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        self.set_meta("last_full_sync", datetime.now(timezone.utc).isoformat(timespec="seconds"))
+        return len(rows)
+
+    def hashes(self) -> Set[str]:
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT job_hash FROM pages WHERE job_hash != ''")}
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.execute(
+                "DELETE FROM meta WHERE key IN ('last_sync', 'last_full_sync', 'synced_through', 'schema')"
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
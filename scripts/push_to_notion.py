@@ -2,14 +2,27 @@
 """
 Job Monitor → Notion Integration
 UPGRADED TO API VERSION 2025-09-03 (Multi-source database support)
+
+    python scripts/push_to_notion.py --profile   # profiles per stage to data/profile/notion_*
 """
+import argparse
 import os
 import sys
 import json
 import hashlib
-import requests
-from datetime import datetime
-from typing import Dict, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import http_client
+import metrics
+import profiling
+import rate_limit
+import scoring
+from job_record import to_jobs
+from notion_mirror import NotionMirror, page_row
 
 NOTION_TOKEN = os.getenv("NOTION_TOKEN")
 NOTION_DB_ID = os.getenv("NOTION_DB_ID")
@@ -24,18 +37,16 @@ HEADERS = {
 # Cache for data_source_id to avoid repeated API calls
 DATA_SOURCE_ID_CACHE = None
 
-TARGET_AGENCIES = [
-    "dod", "defense", "army", "navy", "air force",
-    "va", "veterans affairs", "gsa", "general services",
-    "dhs", "homeland security", "hhs", "health and human services",
-    "doe", "energy", "dot", "transportation", "usaid",
-    "census", "noaa", "reclamation"
-]
+# Local copy of the database's pages (see notion_mirror.py), opened in main()
+MIRROR: Optional[NotionMirror] = None
 
-HIGH_PRIORITY_KEYWORDS = [
-    "capital", "infrastructure", "construction",
-    "senior", "lead", "manager", "director", "portfolio"
-]
+# Re-read the whole data source this often, so pages deleted in Notion
+# are dropped from the mirror; other runs only fetch recent edits
+FULL_SYNC_DAYS = 7
+
+# Pages created in parallel (NOTION_CONCURRENCY). Request pacing is set by
+# the api.notion.com entry in rate_limit.HOST_LIMITS, not by this number
+DEFAULT_CONCURRENCY = 4
 
 
 def get_data_source_id() -> Optional[str]:
@@ -48,9 +59,15 @@ def get_data_source_id() -> Optional[str]:
     if DATA_SOURCE_ID_CACHE:
         return DATA_SOURCE_ID_CACHE
     
+    # Saved by an earlier run in the local mirror
+    if MIRROR is not None:
+        DATA_SOURCE_ID_CACHE = MIRROR.data_source_id(NOTION_DB_ID)
+        if DATA_SOURCE_ID_CACHE:
+            return DATA_SOURCE_ID_CACHE
+    
     try:
         # Get Database returns data_sources array in 2025-09-03
-        response = requests.get(
+        response = http_client.get(
             f"https://api.notion.com/v1/databases/{NOTION_DB_ID}",
             headers=HEADERS,
             timeout=10
@@ -67,6 +84,8 @@ def get_data_source_id() -> Optional[str]:
         # Use the first data source (most databases will have only one initially)
         DATA_SOURCE_ID_CACHE = data_sources[0]["id"]
         print(f"✓ Retrieved data_source_id: {DATA_SOURCE_ID_CACHE}")
+        if MIRROR is not None:
+            MIRROR.save_data_source(NOTION_DB_ID, DATA_SOURCE_ID_CACHE, fetch_schema(DATA_SOURCE_ID_CACHE))
         return DATA_SOURCE_ID_CACHE
         
     except Exception as e:
@@ -91,11 +110,12 @@ def check_duplicate(job_hash: str) -> bool:
     
     try:
         # STEP 3: Changed from /v1/databases/:database_id/query to /v1/data_sources/:data_source_id/query
-        response = requests.post(
+        response = http_client.post(
             f"https://api.notion.com/v1/data_sources/{data_source_id}/query",
             headers=HEADERS, 
             json=query, 
-            timeout=10
+            timeout=10,
+            idempotent=True  # read-only query, safe to retry
         )
         response.raise_for_status()
         return len(response.json().get("results", [])) > 0
@@ -103,65 +123,121 @@ def check_duplicate(job_hash: str) -> bool:
         return False
 
 
-def calculate_priority(job_data: Dict) -> str:
-    title = job_data.get("title", "").lower()
-    agency = job_data.get("agency", "").lower()
-    salary_str = str(job_data.get("salary", ""))
-    
-    high_signals = []
-    
-    if "$" in salary_str:
-        try:
-            nums = ''.join(filter(str.isdigit, salary_str.replace(",", "")))
-            if nums and int(nums[:6]) >= 120000:
-                high_signals.append("salary")
-        except:
-            pass
-    
-    if "gs-14" in salary_str.lower() or "gs-15" in salary_str.lower():
-        high_signals.append("gs_level")
-    
-    if any(target in agency for target in TARGET_AGENCIES):
-        high_signals.append("agency")
+def fetch_schema(data_source_id: str) -> Optional[Dict]:
+    """Property name -> type of the data source, or None if it can't be read"""
+    try:
+        response = http_client.get(
+            f"https://api.notion.com/v1/data_sources/{data_source_id}",
+            headers=HEADERS,
+            timeout=10
+        )
+        response.raise_for_status()
+        return {name: prop.get("type") for name, prop in response.json().get("properties", {}).items()}
+    except Exception as e:
+        print(f"⚠️  Could not read data source schema: {e}")
+        return None
+
+
+def query_pages(data_source_id: str, since: Optional[str] = None) -> Tuple[List[Dict], int]:
+    """
+    Page through the data source, oldest edit first, optionally only pages
+    edited on or after `since` (an ISO timestamp). Returns (pages, queries).
+    """
+    query = {
+        "page_size": 100,
+        "sorts": [{"timestamp": "last_edited_time", "direction": "ascending"}],
+    }
+    if since:
+        query["filter"] = {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": since}}
     
-    if any(kw in title for kw in HIGH_PRIORITY_KEYWORDS):
-        high_signals.append("keywords")
+    pages = []
+    queries = 0
+    while True:
+        response = http_client.post(
+            f"https://api.notion.com/v1/data_sources/{data_source_id}/query",
+            headers=HEADERS,
+            json=query,
+            timeout=30,
+            idempotent=True  # read-only query, safe to retry
+        )
+        response.raise_for_status()
+        data = response.json()
+        queries += 1
+        pages.extend(data.get("results", []))
+        
+        if not data.get("has_more") or not data.get("next_cursor"):
+            return pages, queries
+        query["start_cursor"] = data["next_cursor"]
+
+
+def needs_full_sync() -> bool:
+    if os.getenv("NOTION_MIRROR_FULL") == "1":
+        return True
+    last_full = MIRROR.get_meta("last_full_sync")
+    if not last_full:
+        return True
+    age = datetime.now(timezone.utc) - datetime.fromisoformat(last_full)
+    return age > timedelta(days=FULL_SYNC_DAYS)
+
+
+def fetch_existing_hashes() -> Optional[Set[str]]:
+    """
+    Bring the local mirror up to date and return every "Job Hash" in it,
+    so duplicates are checked locally instead of with one query per job.
+    Routine runs only fetch pages edited since the last sync;
+    every FULL_SYNC_DAYS (or with NOTION_MIRROR_FULL=1) the whole data
+    source is re-read so pages deleted in Notion drop out of the mirror.
+    Returns None if the index could not be loaded.
+    """
+    data_source_id = get_data_source_id()
+    if not data_source_id:
+        return None
     
-    if len(high_signals) >= 1:
-        return "High"
+    full = MIRROR is None or needs_full_sync()
+    since = None if full else MIRROR.get_meta("synced_through")
     
-    if "gs-12" in salary_str.lower() or "gs-13" in salary_str.lower():
-        return "Medium"
+    try:
+        pages, queries = query_pages(data_source_id, since)
+    except Exception as e:
+        print(f"⚠️  Could not sync Job Hash index: {e}")
+        return None
     
-    if "$" in salary_str:
-        try:
-            nums = ''.join(filter(str.isdigit, salary_str.replace(",", "")))
-            if nums and 90000 <= int(nums[:6]) < 120000:
-                return "Medium"
-        except:
-            pass
+    if MIRROR is None:
+        hashes = {page_row(page)[1] for page in pages} - {""}
+        print(f"✓ Loaded {len(hashes)} existing job hashes ({queries} queries)")
+        return hashes
     
-    return "Low"
+    if full:
+        MIRROR.replace_pages(pages)
+        print(f"✓ Mirror rebuilt: {len(pages)} pages ({queries} queries)")
+    else:
+        MIRROR.upsert_pages(pages)
+        print(f"✓ Mirror synced: {len(pages)} pages changed since {since or 'the start'} "
+              f"({queries} queries, {len(MIRROR)} mirrored)")
+    # Resume from the newest edit Notion returned, not from pages this run
+    # creates, so edits made in between are still picked up next time
+    newest = max((page.get("last_edited_time", "") for page in pages), default="")
+    if newest and newest > (since or ""):
+        MIRROR.set_meta("synced_through", newest)
+    MIRROR.set_meta("last_sync", datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    return MIRROR.hashes()
+
+
+def calculate_priority(job_data: Dict) -> str:
+    """Priority computed by the scanner run (scoring.py), or scored now for older job files"""
+    return job_data.get("priority") or scoring.score_priority(job_data)
 
 
 def classify_type(job_data: Dict) -> str:
-    title = job_data.get("title", "").lower()
-    description = job_data.get("description", "").lower()
-    combined = f"{title} {description}"
-    
-    if "capital" in combined or "construction" in combined:
-        return "Federal Capital"
-    elif "infrastructure" in combined:
-        return "Infrastructure"
-    elif "contract" in combined or "contractor" in combined:
-        return "Contract"
-    else:
-        return "Federal General"
+    return job_data.get("type") or scoring.classify_type(job_data)
 
 
-def create_notion_page(job_data: Dict, debug: bool = False) -> bool:
+def create_notion_page(job_data: Dict, debug: bool = False,
+                       existing_hashes: Optional[Set[str]] = None) -> bool:
     """
     STEP 2: Updated to use data_source_id when creating pages
+    existing_hashes: prefetched Job Hash index; checked locally and updated
+    when the page is created. Without it each job is queried individually.
     """
     # Get data_source_id for this database
     data_source_id = get_data_source_id()
@@ -175,7 +251,12 @@ def create_notion_page(job_data: Dict, debug: bool = False) -> bool:
         job_data.get("location", "Remote")
     )
     
-    if check_duplicate(job_hash):
+    if existing_hashes is not None:
+        duplicate = job_hash in existing_hashes
+    else:
+        duplicate = check_duplicate(job_hash)
+    
+    if duplicate:
         print(f"⏭️  Skipped (duplicate): {job_data['title']}")
         return False
     
@@ -228,7 +309,7 @@ def create_notion_page(job_data: Dict, debug: bool = False) -> bool:
         print(json.dumps(payload, indent=2))
     
     try:
-        response = requests.post(
+        response = http_client.post(
             "https://api.notion.com/v1/pages",
             headers=HEADERS,
             json=payload,
@@ -246,6 +327,10 @@ def create_notion_page(job_data: Dict, debug: bool = False) -> bool:
                 print(response.text)
             return False
         
+        if existing_hashes is not None:
+            existing_hashes.add(job_hash)
+        if MIRROR is not None:
+            MIRROR.upsert_pages([response.json()])
         print(f"✅ Created: {job_data['title']} [Priority: {priority}, Type: {job_type}]")
         return True
         
@@ -254,7 +339,30 @@ def create_notion_page(job_data: Dict, debug: bool = False) -> bool:
         return False
 
 
-def main():
+def get_concurrency() -> int:
+    try:
+        return max(1, int(os.getenv("NOTION_CONCURRENCY", DEFAULT_CONCURRENCY)))
+    except ValueError:
+        return DEFAULT_CONCURRENCY
+
+
+def sync_job(job: Dict, job_hash: str, debug: bool, existing_hashes: Optional[Set[str]]) -> str:
+    """Create one page from a worker thread; returns 'created', 'skipped' or 'failed'"""
+    if create_notion_page(job, debug=debug, existing_hashes=existing_hashes):
+        return "created"
+    if existing_hashes is None and check_duplicate(job_hash):
+        return "skipped"
+    return "failed"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create Notion pages for the jobs in jobs_output.json")
+    parser.add_argument("--profile", action="store_true",
+                        help="profile each stage (cProfile + tracemalloc) into data/profile/")
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.enable()
+    
     if not NOTION_TOKEN or not NOTION_DB_ID:
         print("❌ Missing NOTION_TOKEN or NOTION_DB_ID")
         sys.exit(1)
@@ -272,7 +380,7 @@ def main():
     
     try:
         with open(jobs_file, 'r') as f:
-            jobs = json.load(f)
+            jobs = to_jobs(json.load(f))
     except json.JSONDecodeError as e:
         print(f"❌ Invalid JSON: {e}")
         sys.exit(1)
@@ -283,38 +391,85 @@ def main():
     
     print(f"\n🔄 Processing {len(jobs)} opportunities...\n")
     
+    global MIRROR
+    MIRROR = NotionMirror()
+    
+    # One delta query against the local mirror instead of 1-2 queries per job
+    with metrics.stage("mirror_sync"), profiling.stage("mirror_sync"):
+        existing_hashes = fetch_existing_hashes()
+    if existing_hashes is None:
+        print("⚠️  Falling back to one duplicate query per job")
+    
     created = 0
     skipped = 0
     failed = 0
     
-    # Process first job with debug output
-    debug_first = True
-    
-    for idx, job in enumerate(jobs):
+    # Hash every job up front so duplicates (already in Notion, or repeated
+    # within this batch) never reach the worker pool
+    queued_hashes = set()
+    to_create = []
+    for job in jobs:
         if not job.get("title"):
             print("⚠️  Skipped job with no title")
             failed += 1
             continue
         
-        result = create_notion_page(job, debug=debug_first and idx == 0)
-        
-        if result:
-            created += 1
-        else:
-            job_hash = generate_job_hash(
-                job.get("agency", "Unknown"),
-                job["title"],
-                job.get("location", "Remote")
-            )
-            if check_duplicate(job_hash):
+        job_hash = generate_job_hash(
+            job.get("agency", "Unknown"),
+            job["title"],
+            job.get("location", "Remote")
+        )
+        if job_hash in queued_hashes or (existing_hashes is not None and job_hash in existing_hashes):
+            print(f"⏭️  Skipped (duplicate): {job['title']}")
+            skipped += 1
+            continue
+        queued_hashes.add(job_hash)
+        to_create.append((job, job_hash))
+    
+    # Pages are created in parallel; http_client paces api.notion.com to
+    # Notion's average limit and a 429's Retry-After pauses every worker
+    start = time.monotonic()
+    with metrics.stage("create_pages"), profiling.stage("create_pages"), \
+            ThreadPoolExecutor(max_workers=get_concurrency()) as pool:
+        sync = profiling.wrap(sync_job)
+        futures = [
+            # Process first job with debug output
+            pool.submit(sync, job, job_hash, idx == 0, existing_hashes)
+            for idx, (job, job_hash) in enumerate(to_create)
+        ]
+        for future in as_completed(futures):
+            outcome = future.result()
+            if outcome == "created":
+                created += 1
+            elif outcome == "skipped":
                 skipped += 1
             else:
                 failed += 1
+    elapsed = time.monotonic() - start
+    metrics.inc("notion_pages_total", created, outcome="created")
+    metrics.inc("notion_pages_total", skipped, outcome="skipped")
+    metrics.inc("notion_pages_total", failed, outcome="failed")
     
     print(f"\n📊 Summary:")
     print(f"   ✅ Created: {created}")
     print(f"   ⏭️  Skipped (duplicates): {skipped}")
     print(f"   ❌ Failed: {failed}")
+    if to_create:
+        print(f"   ⚡ {created / elapsed if elapsed else 0:.2f} pages/s "
+              f"({len(to_create)} writes in {elapsed:.1f}s, {get_concurrency()} workers)")
+        notion = rate_limit.limiter_stats().get("api.notion.com")
+        if notion:
+            print(f"   🚦 Rate-limit wait: {notion['waited']:.1f}s in total across workers, "
+                  f"{notion['paused']:.1f}s of it paused by Retry-After after "
+                  f"{notion['throttled']} 429 responses")
+    
+    http_client.print_connection_stats()
+    MIRROR.close()
+    if metrics.write("notion", "data/notion_metrics"):
+        print("📈 Metrics written to data/notion_metrics.json and data/notion_metrics.prom")
+    profile = profiling.write("notion")
+    if profile:
+        print(f"🔬 Profile written to {profile[0]} and {profile[1]}")
     
     if failed > 0 and created == 0:
         sys.exit(1)
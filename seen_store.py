@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Seen-Job Store
+SQLite-backed record of every job ID already notified, replacing
+data/seen_jobs.json. Lookups hit the primary-key index, each run only
+writes the IDs it touched, and every write is one atomic transaction.
+
+Optionally a scalable Bloom filter (SEEN_BLOOM=1) sits in front of the
+store: IDs the filter has never seen are answered as new without touching
+SQLite, and only possible hits are checked against the exact store.
+
+Settings (environment variables):
+    SEEN_BLOOM=1              enable the Bloom filter
+    SEEN_BLOOM_FP_RATE        target false-positive rate (default 0.001)
+    SEEN_BLOOM_CAPACITY       IDs in the first filter slice (default 10000)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from bloom_filter import ScalableBloomFilter
+
+SEEN_DB_FILE = 'data/seen_jobs.db'
+LEGACY_JSON_FILE = 'data/seen_jobs.json'
+BLOOM_FILE = 'data/seen_jobs.bloom'
+
+DEFAULT_BLOOM_FP_RATE = 0.001
+DEFAULT_BLOOM_CAPACITY = 10000
+
+# IDs per IN (...) query; stays under SQLite's bound-parameter limit
+BATCH_SIZE = 500
+
+class SeenStore:
+    """
+    Set-like store of seen job IDs with first/last-seen timestamps
+
+    `job_id in store` is an indexed lookup, so the store can be passed
+    anywhere a set of seen IDs was used before. Safe to share between threads.
+    """
+
+    def __init__(self, path=SEEN_DB_FILE, bloom=None):
+        self.path = path
+        self.bloom = bloom
+        self.bloom_stats = {'lookups': 0, 'filtered': 0, 'store_checks': 0, 'false_positives': 0}
+        # Lookups come from scanner worker threads, so the counters get their own lock
+        self._stats_lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS seen_jobs (
+                    id TEXT PRIMARY KEY,
+                    first_seen TEXT NOT NULL,
+                    last_seen TEXT NOT NULL
+                ) WITHOUT ROWID
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            """)
+
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for key, n in deltas.items():
+                self.bloom_stats[key] += n
+
+    def __contains__(self, job_id):
+        if self.bloom is not None:
+            if job_id not in self.bloom:
+                self._count(lookups=1, filtered=1)
+                return False
+            self._count(lookups=1, store_checks=1)
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM seen_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+
+        if row is None and self.bloom is not None:
+            self._count(false_positives=1)
+        return row is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM seen_jobs").fetchone()[0]
+
+    def filter_new(self, job_ids):
+        """Return the subset of job_ids not in the store, checked in batches"""
+        candidates = set(job_ids)
+        definitely_new = set()
+        if self.bloom is not None:
+            definitely_new = {job_id for job_id in candidates if job_id not in self.bloom}
+            self._count(lookups=len(candidates), filtered=len(definitely_new),
+                        store_checks=len(candidates) - len(definitely_new))
+
+        pending = list(candidates - definitely_new)
+        known = set()
+        with self._lock:
+            for i in range(0, len(pending), BATCH_SIZE):
+                batch = pending[i:i + BATCH_SIZE]
+                placeholders = ','.join('?' * len(batch))
+                known.update(row[0] for row in self._conn.execute(
+                    f"SELECT id FROM seen_jobs WHERE id IN ({placeholders})", batch
+                ))
+        if self.bloom is not None:
+            self._count(false_positives=len(pending) - len(known))
+        return definitely_new | (set(pending) - known)
+
+    def record(self, job_ids, when=None):
+        """
+        Insert new IDs and bump last_seen on known ones, in one transaction
+        A crash mid-write leaves the store exactly as it was before the call
+        """
+        when = when or datetime.now().isoformat()
+        rows = [(job_id, when, when) for job_id in set(job_ids)]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("""
+                INSERT INTO seen_jobs (id, first_seen, last_seen) VALUES (?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET last_seen = excluded.last_seen
+            """, rows)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_updated', ?)", (when,)
+            )
+        if self.bloom is not None:
+            for job_id, _, _ in rows:
+                self.bloom.add(job_id)
+
+    def timestamps(self, job_id):
+        """(first_seen, last_seen) for an ID, or None if it was never seen"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT first_seen, last_seen FROM seen_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+
+    def iter_ids(self):
+        """Stream every stored ID without loading them all at once"""
+        with self._lock:
+            cursor = self._conn.execute("SELECT id FROM seen_jobs")
+            while True:
+                rows = cursor.fetchmany(BATCH_SIZE)
+                if not rows:
+                    return
+                for row in rows:
+                    yield row[0]
+
+    def attach_bloom(self, error_rate=DEFAULT_BLOOM_FP_RATE, capacity=DEFAULT_BLOOM_CAPACITY,
+                     bloom_path=BLOOM_FILE):
+        """
+        Put a Bloom filter in front of the store. A saved filter is reused
+        if it matches the store and settings; otherwise one is rebuilt by
+        streaming the stored IDs.
+        """
+        rows = len(self)
+        bloom = None
+        if os.path.exists(bloom_path):
+            try:
+                saved, meta = ScalableBloomFilter.load(bloom_path)
+                if (meta.get('rows') == rows and saved.error_rate == error_rate
+                        and saved.initial_capacity == capacity):
+                    bloom = saved
+            except (OSError, ValueError, KeyError) as e:
+                print(f"   ⚠ Ignoring unreadable bloom filter: {e}")
+
+        if bloom is None:
+            bloom = ScalableBloomFilter(capacity, error_rate)
+            for job_id in self.iter_ids():
+                bloom.add(job_id)
+
+        self.bloom = bloom
+        self._bloom_path = bloom_path
+
+    def bloom_report(self):
+        """Memory use, configured vs expected error rate and lookup counters"""
+        if self.bloom is None:
+            return None
+        return {
+            'items': len(self.bloom),
+            'slices': len(self.bloom.slices),
+            'memory_bytes': self.bloom.memory_bytes(),
+            'target_fp_rate': self.bloom.error_rate,
+            'expected_fp_rate': self.bloom.current_error_rate(),
+            **self._stats_snapshot(),
+        }
+
+    def _stats_snapshot(self):
+        with self._stats_lock:
+            return dict(self.bloom_stats)
+
+    def print_bloom_report(self):
+        report = self.bloom_report()
+        if report is None:
+            return
+        print("\n🌸 Seen-ID filter:")
+        print(f"   {report['items']} IDs in {report['slices']} slice(s), "
+              f"{report['memory_bytes'] / 1024:.1f} KB")
+        print(f"   FP rate: target {report['target_fp_rate']:.4%}, expected {report['expected_fp_rate']:.4%}")
+        print(f"   {report['lookups']} lookups, {report['filtered']} answered by filter alone, "
+              f"{report['store_checks']} checked in store ({report['false_positives']} false positives)")
+
+    def get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def migrate_from_json(self, json_path=LEGACY_JSON_FILE):
+        """
+        One-time import of the old seen_jobs.json. Imported IDs get the file's
+        last_updated time as both timestamps. Returns the number imported.
+        """
+        if self.get_meta('migrated_from_json') or not os.path.exists(json_path):
+            return 0
+
+        with open(json_path, 'r') as f:
+            data = json.load(f)
+        job_ids = data.get('job_ids', [])
+        when = data.get('last_updated') or datetime.now().isoformat()
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen_jobs (id, first_seen, last_seen) VALUES (?, ?, ?)",
+                [(job_id, when, when) for job_id in job_ids]
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_from_json', ?)",
+                (datetime.now().isoformat(),)
+            )
+        return len(job_ids)
+
+    def close(self):
+        if self.bloom is not None:
+            try:
+                self.bloom.save(self._bloom_path, meta={'rows': len(self)})
+            except OSError as e:
+                print(f"Error saving bloom filter: {e}")
+        with self._lock:
+            self._conn.close()
+
+def open_seen_store(path=SEEN_DB_FILE, legacy_json=LEGACY_JSON_FILE):
+    """Open the store, importing the legacy JSON file the first time"""
+    store = SeenStore(path)
+    try:
+        imported = store.migrate_from_json(legacy_json)
+        if imported:
+            print(f"   ✓ Migrated {imported} seen job IDs from {legacy_json}")
+    except Exception as e:
+        print(f"Error migrating seen jobs: {e}")
+
+    if os.getenv('SEEN_BLOOM') == '1':
+        try:
+            store.attach_bloom(
+                error_rate=float(os.getenv('SEEN_BLOOM_FP_RATE', DEFAULT_BLOOM_FP_RATE)),
+                capacity=int(os.getenv('SEEN_BLOOM_CAPACITY', DEFAULT_BLOOM_CAPACITY)),
+            )
+        except ValueError as e:
+            print(f"   ⚠ Bloom filter disabled, bad setting: {e}")
+    return store
@@ -0,0 +1,108 @@
+"""Scalable Bloom filter in front of the seen store (bloom_filter.py)"""
+
+import threading
+
+import pytest
+
+from bloom_filter import FILE_MAGIC, ScalableBloomFilter
+from seen_store import SeenStore
+
+
+def filled(n, capacity=1000, error_rate=0.01):
+    bloom = ScalableBloomFilter(capacity, error_rate)
+    for i in range(n):
+        bloom.add(f'job-{i}')
+    return bloom
+
+
+def test_no_false_negatives_and_fp_rate_under_target():
+    bloom = filled(5000)
+    assert all(f'job-{i}' in bloom for i in range(5000))
+    probes = 20000
+    false_positives = sum(f'other-{i}' in bloom for i in range(probes))
+    # Generous margin over the 1% target so the check is not flaky
+    assert false_positives / probes < 0.02
+    assert bloom.current_error_rate() < bloom.error_rate
+
+
+def test_slices_grow_with_tighter_error_rates():
+    bloom = filled(7000)
+    capacities = [s.capacity for s in bloom.slices]
+    assert capacities == [1000, 2000, 4000]
+    rates = [s.error_rate for s in bloom.slices]
+    assert rates[0] > rates[1] > rates[2]
+    assert sum(rates) < bloom.error_rate
+    assert all(s.count <= s.capacity for s in bloom.slices)
+
+
+def test_add_reports_an_existing_item():
+    bloom = ScalableBloomFilter(100, 0.001)
+    assert bloom.add('a') is True
+    assert bloom.add('a') is False
+    assert len(bloom) == 1
+
+
+def test_save_load_round_trip(tmp_path):
+    path = str(tmp_path / 'seen.bloom')
+    bloom = filled(2500)
+    bloom.save(path, meta={'rows': 2500})
+    loaded, meta = ScalableBloomFilter.load(path)
+    assert meta == {'rows': 2500}
+    assert (loaded.initial_capacity, loaded.error_rate) == (1000, 0.01)
+    assert len(loaded) == len(bloom)
+    assert [s.bits for s in loaded.slices] == [s.bits for s in bloom.slices]
+    assert all(f'job-{i}' in loaded for i in range(2500))
+
+
+def test_truncated_file_is_a_value_error(tmp_path):
+    path = tmp_path / 'seen.bloom'
+    filled(2500).save(str(path))
+    path.write_bytes(path.read_bytes()[:-10])
+    with pytest.raises(ValueError, match='truncated'):
+        ScalableBloomFilter.load(str(path))
+
+
+def test_not_a_filter_file_is_a_value_error(tmp_path):
+    path = tmp_path / 'seen.bloom'
+    path.write_bytes(b'{"job_ids": []}\n')
+    with pytest.raises(ValueError):
+        ScalableBloomFilter.load(str(path))
+    path.write_bytes(FILE_MAGIC + b'not json\n')
+    with pytest.raises(ValueError):
+        ScalableBloomFilter.load(str(path))
+
+
+def test_store_rebuilds_from_a_truncated_file(tmp_path):
+    bloom_path = tmp_path / 'seen.bloom'
+    store = SeenStore(str(tmp_path / 'seen.db'))
+    store.record([f'job-{i}' for i in range(300)])
+    store.attach_bloom(capacity=100, bloom_path=str(bloom_path))
+    store.close()
+    bloom_path.write_bytes(bloom_path.read_bytes()[:-1])
+
+    store = SeenStore(str(tmp_path / 'seen.db'))
+    try:
+        store.attach_bloom(capacity=100, bloom_path=str(bloom_path))
+        assert all(f'job-{i}' in store for i in range(300))
+    finally:
+        store.close()
+
+
+def test_lookup_counters_are_exact_across_threads(tmp_path):
+    store = SeenStore(str(tmp_path / 'seen.db'))
+    store.record([f'job-{i}' for i in range(100)])
+    store.attach_bloom(capacity=100, bloom_path=str(tmp_path / 'seen.bloom'))
+
+    def look():
+        for i in range(2000):
+            f'job-{i}' in store
+
+    threads = [threading.Thread(target=look) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    report = store.bloom_report()
+    store.close()
+    assert report['lookups'] == 8 * 2000
+    assert report['lookups'] == report['filtered'] + report['store_checks']
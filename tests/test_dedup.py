@@ -0,0 +1,77 @@
+"""Cross-source near-duplicate detection (dedup.py)"""
+
+import dedup
+
+TITLE = 'Grants Management Specialist'
+AGENCIES = [
+    'Department of Homeland Security',
+    'Department of Transportation',
+    'Department of Veterans Affairs',
+    'Department of Defense',
+    'Department of Energy',
+    'Department of the Interior',
+    'Department of the Treasury',
+]
+
+
+def job(job_id, title=TITLE, agency='Department of Homeland Security',
+        location='Washington, DC', source='USAJobs'):
+    return {'id': job_id, 'title': title, 'agency': agency, 'location': location, 'source': source}
+
+
+def select(jobs, index=None):
+    index = dedup.NearDuplicateIndex() if index is None else index
+    return dedup.select_new_jobs(jobs, {j['id'] for j in jobs}, index=index)
+
+
+def test_same_title_at_different_agencies_is_kept():
+    jobs = [job(f'a{n}', agency=agency) for n, agency in enumerate(AGENCIES)]
+    assert [j['id'] for j in select(jobs)] == [j['id'] for j in jobs]
+
+
+def test_same_title_in_different_cities_is_kept():
+    jobs = [
+        job('denver', agency='Department of Energy', location='Denver, Colorado'),
+        job('denton', agency='Department of Energy', location='Denton, Texas'),
+    ]
+    assert [j['id'] for j in select(jobs)] == ['denver', 'denton']
+
+
+def test_cross_source_repost_is_merged():
+    jobs = [
+        job('usa-1', agency='Department of Homeland Security', location='Washington, District of Columbia'),
+        job('li-1', title='Grants Mgmt Specialist', agency='U.S. Department of Homeland Security',
+            location='Washington, DC', source='LinkedIn'),
+    ]
+    selected = select(jobs)
+    assert [j['id'] for j in selected] == ['usa-1']
+    assert selected[0]['duplicate_ids'] == ['li-1']
+
+
+def test_matching_is_not_transitive():
+    # Each title is close to its neighbour, but the third is not close to the first
+    titles = [
+        'Grants Management Specialist',
+        'Grants Management Specialist II',
+        'Grants Management Specialist II Supervisory',
+        'Senior Grants Management Specialist II Supervisory',
+    ]
+    jobs = [job(f't{n}', title=title) for n, title in enumerate(titles)]
+    clusters, archived = dedup.cluster(jobs)
+    assert clusters == [[0, 1], [2, 3]]
+    assert archived == set()
+    for members in clusters:
+        first = dedup.signature(dedup.shingles(jobs[members[0]]))
+        for i in members[1:]:
+            score = dedup.similarity(first, dedup.signature(dedup.shingles(jobs[i])))
+            assert score >= dedup.SIMILARITY_THRESHOLD
+
+
+def test_archived_posting_suppresses_repost_only_in_its_block():
+    index = dedup.NearDuplicateIndex()
+    archived = job('old-1')
+    index.add_if_new(archived['id'], dedup.signature(dedup.shingles(archived)), dedup.block(archived))
+
+    repost = job('li-2', source='LinkedIn')
+    other_agency = job('dot-2', agency='Department of Transportation')
+    assert [j['id'] for j in select([repost, other_agency], index)] == ['dot-2']
@@ -0,0 +1,92 @@
+"""Discord webhook packing and delivery (discord_webhook.py)"""
+
+import pytest
+import requests
+
+import discord_webhook
+from discord_webhook import MAX_EMBED_CHARS_PER_MESSAGE, embed_chars, job_embed, pack_embeds
+
+URL = 'https://discord.com/api/webhooks/1/token'
+
+
+def job(n, title='Grants Management Specialist', **extra):
+    return {'id': str(n), 'title': title, 'agency': 'Department of Energy',
+            'location': 'Washington, DC', 'source': 'USAJobs', 'url': f'https://example.com/{n}', **extra}
+
+
+def test_pack_respects_the_embed_count_limit():
+    embeds = [job_embed(job(n)) for n in range(25)]
+    assert [len(m) for m in pack_embeds(embeds)] == [10, 10, 5]
+    assert pack_embeds([]) == []
+
+
+def test_pack_respects_the_character_budget():
+    embeds = [job_embed(job(n, title='x' * 200, agency='a' * 1000)) for n in range(12)]
+    messages = pack_embeds(embeds)
+    assert all(sum(embed_chars(e) for e in m) <= MAX_EMBED_CHARS_PER_MESSAGE for m in messages)
+    assert sum(len(m) for m in messages) == 12
+    assert [e['url'] for m in messages for e in m] == [e['url'] for e in embeds]
+    assert len(messages) > 2
+
+
+def test_oversized_fields_are_clipped():
+    embed = job_embed(job(1, title='t' * 1000, salary='s' * 2000))
+    assert len(embed['title']) == discord_webhook.MAX_TITLE
+    assert all(len(f['value']) <= discord_webhook.MAX_FIELD_VALUE for f in embed['fields'])
+
+
+def reply(status, body=None, **headers):
+    r = requests.Response()
+    r.status_code = status
+    r._content = b'{}' if body is None else body
+    r.headers.update(headers)
+    return r
+
+
+@pytest.fixture
+def post(monkeypatch):
+    """Replaces http_client.post; queue responses or exceptions in post.replies"""
+    calls = []
+
+    def fake_post(url, json=None, **kwargs):
+        calls.append(json)
+        result = fake_post.replies.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    fake_post.replies = []
+    fake_post.calls = calls
+    monkeypatch.setattr(discord_webhook.http_client, 'post', fake_post)
+    monkeypatch.setattr(discord_webhook.time, 'sleep', lambda seconds: None)
+    return fake_post
+
+
+def test_server_error_is_not_retried(post):
+    post.replies = [reply(502), reply(204)]
+    response = discord_webhook.DiscordWebhook(URL).send({'content': 'hi'})
+    assert response.status_code == 502
+    assert len(post.calls) == 1
+
+
+def test_rate_limit_is_retried_after_waiting(post):
+    post.replies = [reply(429, b'{"retry_after": 1.5}'), reply(204)]
+    webhook = discord_webhook.DiscordWebhook(URL)
+    assert webhook.send({'content': 'hi'}).status_code == 204
+    assert len(post.calls) == 2
+    assert webhook.stats['rate_limited'] == 1 and webhook.stats['waited'] == 1.5
+
+
+def test_connection_that_never_opened_is_retried(post):
+    post.replies = [requests.exceptions.ConnectTimeout(), reply(204)]
+    assert discord_webhook.DiscordWebhook(URL).send({'content': 'hi'}).status_code == 204
+    assert len(post.calls) == 2
+
+
+def test_failed_message_does_not_stop_the_rest(post):
+    post.replies = [requests.exceptions.ReadTimeout(), reply(500), reply(204)]
+    sent, failed, _ = discord_webhook.send_jobs(URL, [job(n) for n in range(25)], heading='New jobs')
+    assert (sent, failed) == (1, 2)
+    assert len(post.calls) == 3
+    assert post.calls[0]['content'] == 'New jobs'
+    assert 'content' not in post.calls[1]
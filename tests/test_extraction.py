@@ -0,0 +1,28 @@
+"""Compiled card extraction (extraction.py) on pages with no usable HTML"""
+
+import pytest
+
+from extraction import get_plan
+from scan_indeed import INDEED_SPEC
+from scan_linkedin import LINKEDIN_SPEC
+
+
+@pytest.fixture(params=[LINKEDIN_SPEC, INDEED_SPEC], ids=['linkedin', 'indeed'])
+def plan(request):
+    return get_plan(request.param)
+
+
+@pytest.mark.parametrize('html', ['', '   \n\t '], ids=['empty', 'whitespace'])
+def test_blank_page_has_no_cards(plan, html):
+    assert plan.find_cards(html, 15) == []
+    assert plan.extract(html, {'location': 'Washington, DC'}, 15) == []
+
+
+def test_unparseable_page_has_no_cards(plan):
+    # lxml raises XMLSyntaxError for a page that is only a NUL byte
+    assert plan.find_cards('\x00', 15) == []
+
+
+def test_page_without_a_document_has_no_cards(plan):
+    # lxml's close() returns None when the page holds no elements
+    assert plan.find_cards('<!-- throttled -->', 15) == []
@@ -0,0 +1,142 @@
+"""On-disk HTTP response cache (http_cache.py)"""
+
+import pytest
+import requests
+
+import http_cache
+
+URL = 'https://data.usajobs.gov/api/search'
+
+
+def response(body=b'{"ok": true}', status=200, **headers):
+    r = requests.Response()
+    r.status_code = status
+    r._content = body
+    r.headers.update({'Content-Type': 'application/json', **headers})
+    return r
+
+
+class FakeServer:
+    """Stands in for http_client.get; replies from a queue and records requests"""
+
+    def __init__(self):
+        self.replies = []
+        self.requests = []
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        self.requests.append((url, params, dict(headers or {})))
+        return self.replies.pop(0)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_cache, 'CACHE_FILE', str(tmp_path / 'http_cache.db'))
+    monkeypatch.setattr(http_cache, '_conn', None)
+    monkeypatch.setattr(http_cache, '_stats', dict.fromkeys(http_cache._stats, 0))
+    for name in ('HTTP_CACHE', 'HTTP_CACHE_TTL', 'HTTP_CACHE_HTML_TTL', 'HTTP_CACHE_MAX_MB'):
+        monkeypatch.delenv(name, raising=False)
+    fake = FakeServer()
+    monkeypatch.setattr(http_cache.http_client, 'get', fake.get)
+    yield fake
+    if http_cache._conn is not None:
+        http_cache._conn.close()
+
+
+def test_fresh_entry_is_served_from_disk(server):
+    server.replies.append(response(b'{"page": 1}'))
+    http_cache.cached_get(URL, params={'Page': 1})
+    second = http_cache.cached_get(URL, params={'Page': 1})
+    assert len(server.requests) == 1
+    assert second.status_code == 200 and second.json() == {'page': 1}
+    assert second.url == http_cache.normalize_url(URL, {'Page': 1})
+    assert http_cache.cache_stats()['hits'] == 1
+
+
+def test_stale_entry_is_fetched_again(server):
+    server.replies += [response(b'old'), response(b'new')]
+    http_cache.cached_get(URL, ttl=0)
+    assert http_cache.cached_get(URL, ttl=0).content == b'new'
+    assert len(server.requests) == 2
+
+
+def test_html_without_validators_has_a_shorter_lifetime(server, monkeypatch):
+    page = 'https://www.linkedin.com/jobs/search'
+    server.replies += [response(b'<html>1</html>', **{'Content-Type': 'text/html'}),
+                       response(b'{"n": 1}')]
+    http_cache.cached_get(page)
+    http_cache.cached_get(URL)
+    # Ten minutes later the HTML page is stale but the JSON is still fresh
+    now = http_cache.time.time() + 600
+    monkeypatch.setattr(http_cache.time, 'time', lambda: now)
+    server.replies.append(response(b'<html>2</html>', **{'Content-Type': 'text/html'}))
+    assert http_cache.cached_get(page).content == b'<html>2</html>'
+    assert http_cache.cached_get(URL).content == b'{"n": 1}'
+    assert len(server.requests) == 3
+
+
+def test_max_age_overrides_the_default_lifetime(server):
+    server.replies += [response(b'a', **{'Cache-Control': 'max-age=0, public'})]
+    http_cache.cached_get(URL)
+    server.replies += [response(b'b', **{'Cache-Control': 'public, max-age=600'})]
+    assert http_cache.cached_get(URL, ttl=0).content == b'b'
+    assert http_cache.cached_get(URL, ttl=0).content == b'b'
+    assert len(server.requests) == 2
+
+
+def test_not_modified_reuses_the_stored_body(server):
+    server.replies += [response(b'{"v": 1}', ETag='"abc"', **{'Last-Modified': 'Mon, 01 Jun 2026 00:00:00 GMT'}),
+                       response(b'', status=304)]
+    http_cache.cached_get(URL)
+    again = http_cache.cached_get(URL)
+    sent = server.requests[1][2]
+    assert sent['If-None-Match'] == '"abc"'
+    assert sent['If-Modified-Since'] == 'Mon, 01 Jun 2026 00:00:00 GMT'
+    assert again.status_code == 200 and again.content == b'{"v": 1}'
+    assert http_cache.cache_stats()['revalidated'] == 1
+
+
+def test_no_store_is_never_cached(server):
+    server.replies += [response(b'a', **{'Cache-Control': 'no-store'}),
+                       response(b'b', **{'Cache-Control': 'no-cache'}),
+                       response(b'c')]
+    assert http_cache.cached_get(URL).content == b'a'
+    assert http_cache.cached_get(URL).content == b'b'
+    assert http_cache.cached_get(URL).content == b'c'
+    assert http_cache.cache_stats()['stored'] == 1
+
+
+def test_errors_are_not_cached(server):
+    server.replies += [response(b'busy', status=503), response(b'ok')]
+    assert http_cache.cached_get(URL).status_code == 503
+    assert http_cache.cached_get(URL).content == b'ok'
+
+
+def test_key_includes_api_key_and_user_agent(server):
+    alice = {'Authorization-Key': 'key-a', 'User-Agent': 'a@example.com'}
+    bob = {'Authorization-Key': 'key-b', 'User-Agent': 'a@example.com'}
+    server.replies += [response(b'alice'), response(b'bob')]
+    assert http_cache.cached_get(URL, headers=alice).content == b'alice'
+    assert http_cache.cached_get(URL, headers=bob).content == b'bob'
+    assert http_cache.cached_get(URL, headers=alice).content == b'alice'
+    assert len(server.requests) == 2
+    key = http_cache.cache_key(URL, headers=alice)
+    assert 'key-a' not in key
+    assert http_cache.cache_key(URL, headers={'authorization-key': 'key-a', 'User-Agent': 'a@example.com'}) == key
+
+
+def test_least_recently_used_entries_are_evicted(server, monkeypatch):
+    monkeypatch.setattr(http_cache, 'get_max_bytes', lambda: 250)
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(http_cache.time, 'time', lambda: next(clock))
+    for page in (1, 2):
+        server.replies.append(response(b'x' * 100))
+        http_cache.cached_get(URL, params={'Page': page})
+    http_cache.cached_get(URL, params={'Page': 1})      # page 1 is now the most recent
+    server.replies.append(response(b'y' * 100))
+    http_cache.cached_get(URL, params={'Page': 3})      # over 250 bytes: page 2 goes
+    assert http_cache.cache_stats()['evicted'] == 1
+    assert len(server.requests) == 3
+
+    server.replies.append(response(b'x' * 100))
+    http_cache.cached_get(URL, params={'Page': 2})
+    assert len(server.requests) == 4
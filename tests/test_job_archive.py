@@ -0,0 +1,111 @@
+"""Segmented job archive (job_archive.py)"""
+
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+import job_archive
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    directory = tmp_path / 'archive'
+    monkeypatch.setattr(job_archive, 'ARCHIVE_DIR', str(directory))
+    monkeypatch.setattr(job_archive, 'INDEX_FILE', str(directory / 'index.json'))
+    monkeypatch.setattr(job_archive, 'LEGACY_PATTERN', str(tmp_path / 'jobs_archive_*.json'))
+    return tmp_path
+
+
+def job(job_id, source='USAJobs', agency='Department of the Army', title='Grants Specialist'):
+    return {'id': job_id, 'source': source, 'agency': agency, 'title': title}
+
+
+def ids(jobs):
+    return [j['id'] for j in jobs]
+
+
+def fill(days=('2025-07-01', '2025-07-02', '2025-07-03')):
+    for n, day in enumerate(days):
+        when = datetime.strptime(day, '%Y-%m-%d')
+        job_archive.append_jobs([job(f'usa-{n}'), job(f'li-{n}', source='LinkedIn', agency='FEMA')], when)
+
+
+def test_query_selects_segments_by_date(archive):
+    fill()
+    assert ids(job_archive.query()) == ['usa-0', 'li-0', 'usa-1', 'li-1', 'usa-2', 'li-2']
+    assert ids(job_archive.query(since='2025-07-02')) == ['usa-1', 'li-1', 'usa-2', 'li-2']
+    assert ids(job_archive.query(until='2025-07-01')) == ['usa-0', 'li-0']
+    assert ids(job_archive.query(since='2025-07-02', until='2025-07-02')) == ['usa-1', 'li-1']
+    assert ids(job_archive.query(since='2025-08-01')) == []
+
+
+def test_query_filters_on_source_and_agency(archive):
+    fill()
+    assert ids(job_archive.query(source='LinkedIn', since='2025-07-03')) == ['li-2']
+    assert ids(job_archive.query(agency='army', until='2025-07-02')) == ['usa-0', 'usa-1']
+    index = job_archive.load_index()
+    assert job_archive.select_segments(index, source='Indeed') == []
+
+
+def test_records_keep_their_archive_time(archive):
+    job_archive.append_jobs([job('a')], datetime(2025, 7, 1, 9, 30))
+    assert next(job_archive.query())['archived_at'] == '2025-07-01T09:30:00'
+
+
+def write_legacy(archive, stamp, jobs):
+    path = archive / f'jobs_archive_{stamp}.json'
+    path.write_text(json.dumps(jobs))
+    return path
+
+
+def test_migrate_skips_files_already_imported(archive):
+    write_legacy(archive, '20250601_120000', [job('old-1'), job('old-2')])
+    write_legacy(archive, '20250602_120000', [job('old-3')])
+    assert job_archive.migrate_legacy() == (2, 3)
+    assert job_archive.migrate_legacy() == (0, 0)
+
+    write_legacy(archive, '20250603_120000', [job('old-4')])
+    assert job_archive.migrate_legacy(remove=True) == (1, 1)
+    assert list(archive.glob('jobs_archive_*.json')) == []
+    assert ids(job_archive.query()) == ['old-1', 'old-2', 'old-3', 'old-4']
+    assert [s['date'] for _, s in sorted(job_archive.load_index()['segments'].items())] == \
+        ['2025-06-01', '2025-06-02', '2025-06-03']
+
+
+def test_migrate_skips_unreadable_files(archive):
+    (archive / 'jobs_archive_20250601_120000.json').write_text('{not json')
+    (archive / 'jobs_archive_badstamp.json').write_text('[]')
+    assert job_archive.migrate_legacy() == (0, 0)
+
+
+def test_index_catches_up_after_a_crash_before_it_was_written(archive, monkeypatch):
+    when = datetime(2025, 7, 1)
+    job_archive.append_jobs([job('a')], when)
+
+    save_index = job_archive.save_index
+    def crash(index):
+        raise OSError('disk full')
+    monkeypatch.setattr(job_archive, 'save_index', crash)
+    with pytest.raises(OSError):
+        job_archive.append_jobs([job('b', source='Indeed'), job('c')], when)
+    monkeypatch.setattr(job_archive, 'save_index', save_index)
+
+    # The stale index says the segment has no Indeed jobs
+    assert job_archive.load_index()['segments']['jobs-2025-07-01.jsonl.gz']['count'] == 1
+    assert ids(job_archive.query(source='Indeed')) == ['b']
+    entry = job_archive.load_index()['segments']['jobs-2025-07-01.jsonl.gz']
+    assert entry['count'] == 3
+    assert entry['sources'] == {'USAJobs': 2, 'Indeed': 1}
+
+
+def test_segments_missing_from_the_index_are_scanned(archive):
+    fill()
+    os.remove(job_archive.INDEX_FILE)
+    index = job_archive.current_index()
+    assert sorted(e['count'] for e in index['segments'].values()) == [2, 2, 2]
+
+    os.remove(os.path.join(job_archive.ARCHIVE_DIR, job_archive.segment_name('2025-07-02')))
+    assert job_archive.refresh_index(index) == ['jobs-2025-07-02.jsonl.gz']
+    assert len(index['segments']) == 2
@@ -0,0 +1,74 @@
+"""Slotted job records (job_record.py)"""
+
+import json
+import pickle
+
+import pytest
+
+from job_record import FIELDS, Job, json_default, to_jobs
+
+RECORD = {
+    'id': 'usa-1', 'title': 'Grants Management Specialist', 'agency': 'Department of Energy',
+    'location': 'Washington, DC', 'salary': '$85,000 - $110,000', 'salary_min': 85000,
+    'salary_max': 110000, 'salary_period': 'year', 'gs_grade': 13, 'source': 'USAJobs',
+    'duplicate_ids': ['li-1'],
+}
+
+
+def test_dict_round_trip_keeps_field_order_and_extras():
+    data = {'custom': 1, **RECORD, 'extra': {'nested': True}}
+    job = Job.from_dict(data)
+    assert job.to_dict() == data
+    assert list(job.to_dict()) == [k for k in FIELDS if k in data] + ['custom', 'extra']
+    assert Job.from_dict(job) is job
+    assert Job.from_dict(job.to_dict()) == job
+
+
+def test_a_key_named_extra_is_an_ordinary_key():
+    job = Job({'id': 'x', 'extra': 'value'})
+    assert job['extra'] == 'value'
+    assert 'extra' in job
+    assert dict(job) == {'id': 'x', 'extra': 'value'}
+    del job['extra']
+    assert 'extra' not in job and dict(job) == {'id': 'x'}
+
+
+def test_json_round_trip(tmp_path):
+    jobs = to_jobs([RECORD, {'id': 'li-1', 'title': 'Program Analyst', 'extra': [1, 2], 'seen_on': 'LinkedIn'}])
+    text = json.dumps(jobs, default=json_default)
+    assert json.loads(text) == [j.to_dict() for j in jobs]
+    assert to_jobs(json.loads(text)) == jobs
+    with pytest.raises(TypeError):
+        json.dumps({'when': object()}, default=json_default)
+
+
+def test_iteration_and_length_match_to_dict():
+    job = Job(RECORD, note='x')
+    assert list(job) == list(job.to_dict())
+    assert len(job) == len(job.to_dict()) == len(RECORD) + 1
+    assert len(Job()) == 0 and list(Job()) == []
+    del job['note']
+    assert len(job) == len(RECORD)
+
+
+def test_dict_behaviour():
+    job = Job(RECORD)
+    assert job['title'] == RECORD['title']
+    assert job.get('closes') is None and job.get('closes', 'n/a') == 'n/a'
+    assert 'closes' not in job
+    with pytest.raises(KeyError):
+        job['closes']
+    job['priority'] = 'High'
+    assert job.copy() == job and job.copy() is not job
+    assert dict(job) == {**RECORD, 'priority': 'High'}
+
+
+def test_repeated_values_are_interned():
+    a = Job({'agency': ''.join(['Department of ', 'Energy'])})
+    b = Job({'agency': ''.join(['Department ', 'of Energy'])})
+    assert a['agency'] is b['agency']
+
+
+def test_pickle_round_trip():
+    job = Job(RECORD, extra='kept')
+    assert pickle.loads(pickle.dumps(job)) == job
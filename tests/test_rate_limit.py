@@ -0,0 +1,49 @@
+"""Per-host token buckets (rate_limit.py)"""
+
+import pytest
+
+import rate_limit
+from rate_limit import TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_pacing_wait_is_not_counted_as_a_pause(clock):
+    bucket = TokenBucket(rate=2.0, burst=1)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.stats['waited'] == pytest.approx(0.5)
+    assert bucket.stats['paused'] == 0.0
+
+
+def test_retry_after_pause_is_counted_separately(clock):
+    bucket = TokenBucket(rate=2.0, burst=2)
+    bucket.observe(429, retry_after=10)
+    assert bucket.stats['throttled'] == 1
+    assert bucket.rate == 1.0
+    wait = bucket.reserve()
+    assert wait == pytest.approx(10)
+    # Pacing alone would have meant a 1s wait at the halved rate
+    assert bucket.stats['paused'] == pytest.approx(9)
+    assert bucket.stats['waited'] == pytest.approx(10)
+
+
+def test_retry_after_is_capped(clock):
+    bucket = TokenBucket(rate=1.0, burst=1)
+    bucket.observe(429, retry_after=10_000)
+    assert bucket.reserve() == pytest.approx(rate_limit.MAX_RETRY_AFTER)
+
+
+def test_successes_win_the_rate_back(clock):
+    bucket = TokenBucket(rate=4.0, burst=4)
+    bucket.observe(429)
+    bucket.observe(429)
+    assert bucket.rate == 1.0
+    for _ in range(20):
+        bucket.observe(200)
+    assert bucket.rate == 4.0
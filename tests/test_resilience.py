@@ -0,0 +1,108 @@
+"""Circuit breakers and retry decisions (resilience.py)"""
+
+import json
+import threading
+
+import pytest
+import requests
+
+import resilience
+from resilience import CircuitBreaker, RetryPolicy
+
+
+@pytest.fixture(autouse=True)
+def breaker_file(tmp_path, monkeypatch):
+    path = tmp_path / 'circuit_breakers.json'
+    monkeypatch.setattr(resilience, 'BREAKER_FILE', str(path))
+    return path
+
+
+def test_closed_opens_after_threshold_and_probes_next_run(breaker_file):
+    breaker = CircuitBreaker.load('LinkedIn', threshold=2)
+    assert breaker.state == 'closed'
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert breaker.allow() is False and breaker.allow() is False
+    assert breaker.skipped == 2
+    breaker.save()
+    saved = json.loads(breaker_file.read_text())['LinkedIn']
+    assert saved['state'] == 'open' and saved['opened_at']
+    assert 'failures' not in saved
+
+    probe = CircuitBreaker.load('LinkedIn', threshold=2)
+    assert probe.state == 'half_open'
+    assert probe.opened_at == saved['opened_at']
+    assert probe.allow() is True
+    probe.record_success()
+    assert probe.state == 'closed' and probe.opened_at is None
+    probe.save()
+    assert CircuitBreaker.load('LinkedIn').state == 'closed'
+
+
+def test_failed_probe_opens_again():
+    breaker = CircuitBreaker('Indeed', state='half_open')
+    assert breaker.allow() is True
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert breaker.allow() is False
+
+
+def test_failures_of_a_closed_breaker_do_not_carry_over(breaker_file):
+    breaker = CircuitBreaker.load('USAJobs', threshold=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.save()
+    # One more failure in the next run must not be enough to open it
+    breaker = CircuitBreaker.load('USAJobs', threshold=3)
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+
+
+def test_older_files_with_failure_counts_load_closed(breaker_file):
+    breaker_file.write_text(json.dumps({'USAJobs': {'state': 'closed', 'failures': 2}}))
+    breaker = CircuitBreaker.load('USAJobs')
+    assert (breaker.state, breaker.failures) == ('closed', 0)
+
+
+def test_release_hands_the_probe_to_a_waiting_caller():
+    breaker = CircuitBreaker('LinkedIn', state='half_open')
+    assert breaker.allow() is True
+    allowed = []
+    waiter = threading.Thread(target=lambda: allowed.append(breaker.allow()))
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive(), "second caller should wait for the probe"
+
+    # The probe ended in an unexpected error: no outcome, but the next caller may probe
+    breaker.release()
+    waiter.join(2)
+    assert allowed == [True]
+    assert breaker.state == 'half_open'
+    breaker.record_success()
+    assert breaker.state == 'closed'
+
+
+def test_release_outside_a_probe_does_nothing():
+    breaker = CircuitBreaker('LinkedIn')
+    breaker.allow()
+    breaker.release()
+    assert breaker.state == 'closed' and breaker.failures == 0
+
+
+@pytest.mark.parametrize('idempotent, status, error, retry', [
+    (True, 503, None, True),
+    (True, 404, None, False),
+    (True, None, requests.exceptions.ReadTimeout(), True),
+    (False, 503, None, False),
+    (False, 429, None, True),
+    (False, None, requests.exceptions.ReadTimeout(), False),
+    (False, None, requests.exceptions.ConnectTimeout(), True),
+])
+def test_should_retry(idempotent, status, error, retry):
+    policy = RetryPolicy(attempts=3)
+    assert policy.should_retry(1, idempotent, status_code=status, error=error) is retry
+    assert policy.should_retry(3, idempotent, status_code=status, error=error) is False
@@ -0,0 +1,73 @@
+"""Salary and grade parsing (salary.py)"""
+
+import pytest
+
+from salary import NO_SALARY, SalaryRange, format_salary, parse_grade, parse_salary
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('$120,000 - $150,000 Kansas City', SalaryRange(120000, 150000, 'year')),
+    ('$95,000 Knoxville, TN', SalaryRange(95000, 95000, 'year')),
+    ('$85K - $110K', SalaryRange(85000, 110000, 'year')),
+    ('$85k-$110k a year', SalaryRange(85000, 110000, 'year')),
+    ('$85 K/yr', SalaryRange(85000, 85000, 'year')),
+])
+def test_k_suffix_is_a_whole_word(text, expected):
+    assert parse_salary(text) == expected
+
+
+@pytest.mark.parametrize('text, period', [
+    ('$38.75', 'hour'),
+    ('$999', 'hour'),
+    ('$25 - $40', 'hour'),
+    ('$1,000', 'year'),
+    ('$40 - $1,200', 'year'),
+    ('$6,000 a month', 'month'),
+])
+def test_period_guess_without_a_period_word(text, period):
+    assert parse_salary(text).period == period
+
+
+def test_up_to_has_no_minimum():
+    assert parse_salary('Up to $32.50/hr') == SalaryRange(None, 32.5, 'hour')
+    assert format_salary(None, 32.5, 'hour') == 'Up to $32.50 per hour'
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('From $6,000 a month', SalaryRange(6000, None, 'month')),
+    ('Starting at $70,000', SalaryRange(70000, None, 'year')),
+    ('$120,000+', SalaryRange(120000, None, 'year')),
+    ('$120K+ per year', SalaryRange(120000, None, 'year')),
+])
+def test_lower_bound_only_has_no_maximum(text, expected):
+    assert parse_salary(text) == expected
+
+
+def test_plus_between_amounts_is_not_a_lower_bound():
+    assert parse_salary('$60,000 + benefits') == SalaryRange(60000, 60000, 'year')
+
+
+def test_lower_bound_formats_with_a_plus():
+    assert format_salary(120000, None, 'year') == '$120,000+'
+    assert format_salary(6000, None, 'month') == '$6,000+ per month'
+
+
+@pytest.mark.parametrize('text', [None, '', 'Competitive', 'See posting'])
+def test_no_amount(text):
+    assert parse_salary(text) == NO_SALARY
+
+
+@pytest.mark.parametrize('text, grade', [
+    ('GS-12/13', 13),
+    ('GS-11 to GS-13', 13),
+    ('gs 9 to 11', 11),
+    ('GS 15', 15),
+    ('Grants Specialist (GS-0501-14)', 14),
+    ('GS-0501-09', 9),
+    ('GG-13', 13),
+    ('GS-17', None),
+    ('Senior Manager', None),
+    ('', None),
+])
+def test_grade(text, grade):
+    assert parse_grade(text) == grade
@@ -0,0 +1,122 @@
+"""Paging and watermarks for one USAJobs search term (scan_usajobs.py)"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+import scan_usajobs
+from scan_usajobs import RESULTS_PER_PAGE, SEEN_RUN_LIMIT, iter_term_jobs
+
+OLD_MARK = '2026-09-01T00:00:00'
+
+
+def posting(n):
+    # Newest first, like the API's PublicationStartDate ordering
+    posted = datetime(2026, 10, 1) - timedelta(minutes=n)
+    return {'id': f'job-{n}', 'posted': posted.isoformat()}
+
+
+class FakeAPI:
+    """Serves pages of `total` postings and records which pages were asked for"""
+
+    def __init__(self, total, number_of_pages=None):
+        self.items = [posting(n) for n in range(total)]
+        self.number_of_pages = number_of_pages or max(1, -(-total // RESULTS_PER_PAGE))
+        self.pages = []
+
+    def fetch_page(self, term, page, headers, date_posted=None, breaker=None):
+        self.pages.append(page)
+        start = (page - 1) * RESULTS_PER_PAGE
+        items = self.items[start:start + RESULTS_PER_PAGE]
+        if not items:
+            return None
+        return {'SearchResultItems': items, 'UserArea': {'NumberOfPages': str(self.number_of_pages)}}
+
+
+@pytest.fixture
+def api(monkeypatch):
+    def install(total, **kwargs):
+        fake = FakeAPI(total, **kwargs)
+        monkeypatch.setattr(scan_usajobs, 'fetch_page', fake.fetch_page)
+        monkeypatch.setattr(scan_usajobs, 'map_usajobs_item', dict)
+        return fake
+    monkeypatch.delenv('USAJOBS_MAX_PAGES', raising=False)
+    return install
+
+
+def crawl(**kwargs):
+    watermarks = {'grants': OLD_MARK}
+    jobs = list(iter_term_jobs('grants', {}, watermarks=watermarks, **kwargs))
+    return [j['id'] for j in jobs], watermarks['grants']
+
+
+def test_stops_at_the_last_page_and_advances_the_watermark(api):
+    fake = api(RESULTS_PER_PAGE * 2 + 7)
+    ids, mark = crawl()
+    assert fake.pages == [1, 2, 3]
+    assert len(ids) == RESULTS_PER_PAGE * 2 + 7
+    assert mark == posting(0)['posted']
+
+
+def test_full_last_page_stops_on_number_of_pages(api):
+    fake = api(RESULTS_PER_PAGE * 2)
+    crawl()
+    assert fake.pages == [1, 2]
+
+
+def test_stops_after_a_run_of_seen_postings(api):
+    fake = api(RESULTS_PER_PAGE * 4)
+    seen = {f'job-{n}' for n in range(60, 200)}
+    ids, mark = crawl(seen_ids=seen)
+    assert fake.pages == [1, 2]
+    assert ids == [f'job-{n}' for n in range(60 + SEEN_RUN_LIMIT)]
+    assert mark == posting(0)['posted']
+
+
+def test_scattered_seen_postings_do_not_stop_paging(api):
+    fake = api(RESULTS_PER_PAGE * 2 + 1)
+    seen = {f'job-{n}' for n in range(0, RESULTS_PER_PAGE * 2, SEEN_RUN_LIMIT)}
+    crawl(seen_ids=seen)
+    assert fake.pages == [1, 2, 3]
+
+
+def test_page_cap_leaves_the_watermark_alone(api, monkeypatch):
+    monkeypatch.setenv('USAJOBS_MAX_PAGES', '2')
+    fake = api(RESULTS_PER_PAGE * 5)
+    ids, mark = crawl()
+    assert fake.pages == [1, 2]
+    assert len(ids) == RESULTS_PER_PAGE * 2
+    assert mark == OLD_MARK
+
+
+def test_deadline_leaves_the_watermark_alone(api, monkeypatch):
+    fake = api(RESULTS_PER_PAGE * 3)
+    clock = iter([0.0, 100.0])
+    monkeypatch.setattr(scan_usajobs.time, 'monotonic', lambda: next(clock))
+    ids, mark = crawl(deadline=50.0)
+    assert fake.pages == [1]
+    assert len(ids) == RESULTS_PER_PAGE
+    assert mark == OLD_MARK
+
+
+def test_failed_page_leaves_the_watermark_alone(api, monkeypatch):
+    fake = api(RESULTS_PER_PAGE * 3)
+    fetch = fake.fetch_page
+    monkeypatch.setattr(scan_usajobs, 'fetch_page',
+                        lambda term, page, *args: None if page == 2 else fetch(term, page, *args))
+    ids, mark = crawl()
+    assert len(ids) == RESULTS_PER_PAGE
+    assert mark == OLD_MARK
+
+
+def test_malformed_items_are_skipped(api, monkeypatch):
+    api(3)
+
+    def strict(item):
+        if item['id'] == 'job-1':
+            raise KeyError('PositionTitle')
+        return dict(item)
+    monkeypatch.setattr(scan_usajobs, 'map_usajobs_item', strict)
+    ids, mark = crawl()
+    assert ids == ['job-0', 'job-2']
+    assert mark == posting(0)['posted']
@@ -0,0 +1,86 @@
+"""SQLite seen-job store (seen_store.py)"""
+
+import json
+
+import pytest
+
+import seen_store
+from seen_store import SeenStore
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'seen_jobs.db')
+
+
+@pytest.fixture
+def store(db_path):
+    store = SeenStore(db_path)
+    yield store
+    store.close()
+
+
+def test_filter_new_spans_several_batches(store, monkeypatch):
+    monkeypatch.setattr(seen_store, 'BATCH_SIZE', 3)
+    store.record([f'old-{n}' for n in range(10)], when='2026-01-01T00:00:00')
+    candidates = [f'old-{n}' for n in range(0, 10, 2)] + [f'new-{n}' for n in range(7)]
+    assert store.filter_new(candidates) == {f'new-{n}' for n in range(7)}
+    assert store.filter_new([]) == set()
+
+
+def test_record_inserts_and_bumps_last_seen(store):
+    store.record(['a', 'b'], when='2026-01-01T00:00:00')
+    store.record(['b', 'b', 'c'], when='2026-02-01T00:00:00')
+    assert len(store) == 3
+    assert 'a' in store and 'c' in store and 'z' not in store
+    assert store.timestamps('a') == ('2026-01-01T00:00:00', '2026-01-01T00:00:00')
+    assert store.timestamps('b') == ('2026-01-01T00:00:00', '2026-02-01T00:00:00')
+    assert store.timestamps('c') == ('2026-02-01T00:00:00', '2026-02-01T00:00:00')
+    assert store.timestamps('z') is None
+    assert store.get_meta('last_updated') == '2026-02-01T00:00:00'
+
+
+def test_migrate_from_json_runs_once(store, tmp_path):
+    legacy = tmp_path / 'seen_jobs.json'
+    legacy.write_text(json.dumps({'job_ids': ['x', 'y'], 'last_updated': '2025-12-01T00:00:00'}))
+    assert store.migrate_from_json(str(legacy)) == 2
+    assert store.timestamps('x') == ('2025-12-01T00:00:00', '2025-12-01T00:00:00')
+    assert store.get_meta('migrated_from_json')
+
+    # A file that reappears (or grows) after the import is not read again
+    legacy.write_text(json.dumps({'job_ids': ['x', 'y', 'z']}))
+    assert store.migrate_from_json(str(legacy)) == 0
+    assert len(store) == 2
+
+
+def test_migrate_without_legacy_file(store, tmp_path):
+    assert store.migrate_from_json(str(tmp_path / 'missing.json')) == 0
+    assert store.get_meta('migrated_from_json') is None
+
+
+def test_reopened_database_keeps_ids(db_path, tmp_path):
+    legacy = tmp_path / 'seen_jobs.json'
+    legacy.write_text(json.dumps({'job_ids': ['x']}))
+    first = seen_store.open_seen_store(db_path, str(legacy))
+    first.record(['a'], when='2026-01-01T00:00:00')
+    first.close()
+
+    second = seen_store.open_seen_store(db_path, str(legacy))
+    try:
+        assert second._conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        assert set(second.iter_ids()) == {'a', 'x'}
+        assert second.timestamps('a') == ('2026-01-01T00:00:00', '2026-01-01T00:00:00')
+    finally:
+        second.close()
+
+
+def test_bloom_filter_answers_like_the_store(store, tmp_path):
+    store.record([f'id-{n}' for n in range(50)])
+    store.attach_bloom(capacity=20, bloom_path=str(tmp_path / 'seen.bloom'))
+    store.record(['late'])
+    assert 'id-7' in store and 'late' in store and 'never' not in store
+    assert store.filter_new(['id-3', 'late', 'fresh']) == {'fresh'}
+    report = store.bloom_report()
+    # An ID the filter already (falsely) matched is not counted again
+    assert 0 < report['items'] <= len(store) == 51
+    assert report['lookups'] == report['filtered'] + report['store_checks']